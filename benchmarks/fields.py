@@ -0,0 +1,38 @@
+"""
+Benchmark of ``TimerField`` parsing: one by one ``to_internal_value``
+against batch ``to_internal_values``.
+
+Usage: ``python -m benchmarks.fields [count]``
+"""
+import random
+import sys
+import time
+
+from django.conf import settings
+
+settings.configure()
+
+from fox_tools.serializers import TimerField
+
+
+def bench(label, func, *args):
+    start = time.perf_counter()
+    func(*args)
+    print('{:<28} {:.3f}s'.format(label, time.perf_counter() - start))
+
+
+def main(count=1000000):
+    values = ["{}'{}\"{}".format(random.randint(0, 99), random.randint(0, 59),
+                                 random.randint(0, 999))
+              for _ in range(count)]
+    field = TimerField()
+    print('{} values'.format(count))
+    bench('to_internal_value', lambda: [field.to_internal_value(v)
+                                        for v in values])
+    bench('to_internal_values', field.to_internal_values, values)
+    bench('to_internal_values (1 bad)', field.to_internal_values,
+          values[:-1] + ['x'])
+
+
+if __name__ == '__main__':
+    main(*map(int, sys.argv[1:]))
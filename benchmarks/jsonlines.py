@@ -0,0 +1,45 @@
+"""
+Benchmark of ``jsonlines`` readers over the same records, as JSON Lines
+and concatenated JSON files.
+
+Usage: ``python -m benchmarks.jsonlines [count]``
+"""
+import json
+import os
+import sys
+import tempfile
+import time
+
+from fox_tools import jsonlines
+
+
+def bench(label, func, *args):
+    start = time.perf_counter()
+    count = sum(1 for _ in func(*args))
+    print('{:<20} {:.3f}s ({} values)'.format(
+        label, time.perf_counter() - start, count))
+
+
+def main(count=200000):
+    with tempfile.TemporaryDirectory() as dir:
+        lines = [json.dumps({'id': i, 'name': 'item-{}'.format(i),
+                             'tags': ['a', 'b']})
+                 for i in range(count)]
+        paths = {}
+        for format, sep in (('jsonl', '\n'), ('concat', ' ')):
+            paths[format] = os.path.join(dir, 'values.' + format)
+            with open(paths[format], 'w') as file:
+                file.write(sep.join(lines))
+        print('{} records, {:.1f} MB'.format(
+            count, os.path.getsize(paths['jsonl']) / 2 ** 20))
+        for backend in ('json', 'orjson'):
+            if backend == 'orjson' and jsonlines.orjson is None:
+                continue
+            jsonlines.set_backend(backend)
+            bench('jsonl ({})'.format(backend), jsonlines.iter_jsonl,
+                  paths['jsonl'])
+        bench('concat', jsonlines.iter_concatenated, paths['concat'])
+
+
+if __name__ == '__main__':
+    main(*map(int, sys.argv[1:]))
@@ -0,0 +1,49 @@
+"""
+Benchmark of ``Reader.get_serializer`` with cached fields (see
+``Reader.cache_fields``) against DRF's fields building, using test
+serializers.
+
+Usage: ``python -m benchmarks.reader [count]``
+"""
+import os
+import sys
+import time
+
+import django
+
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'tests.test_settings')
+django.setup()
+
+from rest_framework import serializers
+
+from fox_tools.data import Reader
+from tests.serializers import NameValueSerializer, TestSerializer
+
+
+class TagsSerializer(serializers.Serializer):
+    name = serializers.CharField()
+    tags = serializers.ListField(child=serializers.CharField())
+    scores = serializers.DictField(child=serializers.IntegerField())
+
+
+def bench(label, reader, count):
+    start = time.perf_counter()
+    for _ in range(count):
+        reader.get_serializer({}).fields
+    print('{:<42} {:.3f}s'.format(label, time.perf_counter() - start))
+
+
+def main(count=10000):
+    print('{} serializers'.format(count))
+    for serializer_class in (TestSerializer, NameValueSerializer,
+                             TagsSerializer):
+        reader = Reader(serializer_class=serializer_class)
+        for cache_fields in (False, True):
+            reader.cache_fields = cache_fields
+            bench('{} (cache_fields={})'.format(serializer_class.__name__,
+                                                cache_fields),
+                  reader, count)
+
+
+if __name__ == '__main__':
+    main(*map(int, sys.argv[1:]))
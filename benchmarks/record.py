@@ -0,0 +1,61 @@
+"""
+Benchmark of ``Record`` against ``CompactRecord``: instances memory and
+attribute access times.
+
+Usage: ``python -m benchmarks.record [count]``
+"""
+import sys
+import time
+import tracemalloc
+
+from django.conf import settings
+settings.configure()
+
+from fox_tools.data import Record
+
+
+def bench(label, func, *args):
+    start = time.perf_counter()
+    func(*args)
+    print('{:<24} {:.3f}s'.format(label, time.perf_counter() - start))
+
+
+def create(record_class, count):
+    return [record_class(name='item', value=i) for i in range(count)]
+
+
+def measure(record_class, count):
+    tracemalloc.start()
+    records = create(record_class, count)
+    for record in records:
+        record.data
+    size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return size
+
+
+def read(records):
+    for record in records:
+        record.name
+        record.value
+
+
+def write(records):
+    for record in records:
+        record.value = 0
+
+
+def main(count=100000):
+    compact_class = Record.compact(('name', 'value'))
+    for label, record_class in (('Record', Record),
+                                ('CompactRecord', compact_class)):
+        print('{}: {:.1f} MB for {} records'.format(
+            label, measure(record_class, count) / 2 ** 20, count))
+        records = create(record_class, count)
+        bench('  getattr', read, records)
+        bench('  setattr', write, records)
+        bench('  data', lambda: [r.data for r in records])
+
+
+if __name__ == '__main__':
+    main(*map(int, sys.argv[1:]))
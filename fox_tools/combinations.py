@@ -78,6 +78,19 @@ class Variable:
         return (func for func in (getattr(cls, k) for k in dir(cls))
                     if hasattr(func, 'var_type'))
 
+    def count(self):
+        """
+        Return number of values, or None if unknown. It uses count method
+        of provided type if any (``count_typename()``).
+        """
+        count = getattr(self, 'count_' + self.typ, None)
+        return count() if count else None
+
+    def count_list(self):
+        return len(self.args)
+
+    count_ints = count_floats = count_list
+
     @var_type
     def list(self):
         """ Return all provided items. """
@@ -107,6 +120,9 @@ class Variable:
         """ Iterate over a range of integers. Args: [start,end,step] """
         return iter(range(*self.args))
 
+    def count_range(self):
+        return len(range(*self.args))
+
     def init_date_range(self, start, end=None, step=1, strftime='%Y-%m-%d'):
         self.start = date(*(int(a) for a in start.split('-',3)))
         self.end = date(*(int(a) for a in end.split('-',3))) \
@@ -126,6 +142,11 @@ class Variable:
             yield start.strftime(self.strftime)
             start += self.step
 
+    def count_date_range(self):
+        if self.start >= self.end:
+            return 0
+        return -(-(self.end - self.start).days // self.step.days)
+
 
 class Combinations:
     """
@@ -140,10 +161,30 @@ class Combinations:
         self.variables = variables
         self.consts = consts or {}
 
+    def count(self):
+        """
+        Return number of generated values, or None if a variable's count
+        is unknown.
+        """
+        count = len(self.inputs)
+        for variable in self.variables or ():
+            var_count = variable.count()
+            if var_count is None:
+                return None
+            count *= var_count
+        return count
+
+    def __len__(self):
+        count = self.count()
+        if count is None:
+            raise TypeError('combinations count is unknown')
+        return count
+
     def iter(self):
         """ Return an iterator generating all inputs combinations. """
         if not self.variables:
-            return [input.format(**self.consts) for input in self.inputs]
+            yield from (input.format(**self.consts) for input in self.inputs)
+            return
 
         values = self.consts.copy()
         for output in iter_dfs(self.variables):
@@ -1,9 +1,12 @@
 from .reader import as_json_path, Reader
 from .readers import *
 from .pool import *
+from .index import *
+from .overlay import *
 from .record import *
 from .record_set import *
 from .relation import *
 
 from .model_record_set import *
+from .column_record_set import *
 
@@ -0,0 +1,446 @@
+from collections.abc import MutableMapping
+from datetime import date, datetime, timezone
+from itertools import repeat
+
+from django.db import models
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+from .record import Record
+from .record_set import RecordSet
+
+
+__all__ = ('as_array', 'ColumnRecord', 'ColumnRecords', 'ColumnRecordSet')
+
+
+def _utc(value):
+    """ Return naive UTC datetime of an aware one (None is kept). """
+    if value is None:
+        return None
+    if value.tzinfo is None:
+        raise TypeError('can not mix naive and aware datetimes')
+    return value.astimezone(timezone.utc).replace(tzinfo=None)
+
+
+def as_array(values):
+    """
+    Return a numpy array for provided values: typed for numeric, boolean
+    and datetime values, object array otherwise. Timezone aware datetimes
+    are converted to UTC.
+    """
+    if np is None:
+        raise ImportError('numpy is required for columns bulk operations')
+    array = np.asarray(values)
+    if array.dtype.kind in 'biufM':
+        return array
+    sample = next((v for v in values if v is not None), None)
+    if isinstance(sample, date):
+        try:
+            if isinstance(sample, datetime) and sample.tzinfo is not None:
+                values = [_utc(v) for v in values]
+            return np.array(values, dtype='datetime64[us]')
+        except (TypeError, ValueError):
+            pass
+    if array.dtype.kind != 'O':
+        array = np.empty(len(values), dtype=object)
+        array[:] = values
+    return array
+
+
+_int64 = (-2 ** 63, 2 ** 63 - 1)
+
+
+def column_dtype(value):
+    """
+    Return numpy dtype used to store a column whose first value is the
+    provided one: typed for bool, int, float, date and naive datetime
+    values, object otherwise.
+    """
+    kind = type(value)
+    if kind is bool:
+        return 'bool'
+    if kind is int:
+        return 'int64' if _int64[0] <= value <= _int64[1] else object
+    if kind is float:
+        return 'float64'
+    if kind is date:
+        return 'datetime64[D]'
+    if kind is datetime and value.tzinfo is None:
+        return 'datetime64[us]'
+    return object
+
+
+def column_accepts(column, value):
+    """
+    Return True if value can be stored in column without changing its
+    type (or losing information).
+    """
+    kind = column.dtype.kind
+    if kind == 'O':
+        return True
+    if kind == 'M':
+        if value is None:
+            return True
+        if column.dtype == 'datetime64[D]':
+            return type(value) is date
+        return type(value) is datetime and value.tzinfo is None
+    return column_dtype(value) == column.dtype
+
+
+def _item(value):
+    """ Return Python value of a column's item. """
+    return value.item() if isinstance(value, np.generic) else value
+
+
+class ColumnRecord(Record):
+    """
+    Row view over `ColumnRecords`: attributes are read from and written
+    to the columns.
+    """
+    def __init__(self, records, row):
+        object.__setattr__(self, '_records', records)
+        object.__setattr__(self, '_row', row)
+
+    @property
+    def data(self):
+        return self._records.row_data(self._row)
+
+    @property
+    def _pool_updated(self):
+        return self._row in self._records.updated
+
+    @_pool_updated.setter
+    def _pool_updated(self, value):
+        self._records.set_updated(self._row, value)
+
+    def clone(self):
+        """ Return a detached `Record` with the same data. """
+        return Record(**self.data)
+
+    def __getattr__(self, key):
+        column = self._records.columns.get(key)
+        if column is None:
+            raise AttributeError("'{}' object has no attribute '{}'"
+                                 .format(type(self).__name__, key))
+        return _item(column[self._row])
+
+    def __setattr__(self, key, value):
+        if hasattr(type(self), key):
+            object.__setattr__(self, key, value)
+        else:
+            self._records.set_value(self._row, key, value)
+
+    def __eq__(self, other):
+        if isinstance(other, ColumnRecord):
+            return self._records is other._records and self._row == other._row
+        return NotImplemented
+
+    def __hash__(self):
+        return hash((id(self._records), self._row))
+
+
+class ColumnRecords(MutableMapping):
+    """
+    Mapping of records by key stored as columns (a numpy array per
+    field). Rows are accessed through ``ColumnRecord`` views.
+
+    Columns are typed (see ``column_dtype``) as long as their values
+    share the type of the first one, and converted to object arrays
+    otherwise. Fields missing on a row have a ``None`` value.
+
+    Copies share columns and rows with their source (see ``copy``), each
+    side copying them on its first write.
+    """
+    columns = None
+    """
+    Columns values by field, as `{field: array}`. Arrays are allocated
+    by ``capacity``: only their first ``len(keys_)`` items are used.
+    """
+    capacity = 0
+    """ Allocated rows. """
+    keys_ = None
+    """ Records key by row. """
+    rows = None
+    """ Row by record key. """
+    updated = None
+    """ Updated rows. """
+    shared = None
+    """ Fields whose column is shared with a copy. """
+    shared_rows = False
+    """ ``keys_``, ``rows`` and ``updated`` are shared with a copy. """
+
+    def __init__(self):
+        if np is None:
+            raise ImportError('numpy is required by ColumnRecords')
+        self.columns = {}
+        self.keys_ = []
+        self.rows = {}
+        self.updated = set()
+        self.shared = set()
+        self._arrays = {}
+
+    def row_data(self, row):
+        """ Return data of provided row as dict. """
+        return {field: _item(column[row])
+                for field, column in self.columns.items()}
+
+    def unshare_rows(self):
+        """ Copy rows shared with a copy, before modifying them. """
+        if self.shared_rows:
+            self.keys_ = list(self.keys_)
+            self.rows = dict(self.rows)
+            self.updated = set(self.updated)
+            self.shared_rows = False
+
+    def set_updated(self, row, updated=True):
+        """ Flag provided row as updated or not. """
+        if bool(updated) != (row in self.updated):
+            self.unshare_rows()
+            if updated:
+                self.updated.add(row)
+            else:
+                self.updated.discard(row)
+
+    def set_value(self, row, field, value):
+        """ Set value of field for provided row. """
+        column = self.columns.get(field)
+        if column is None:
+            dtype = column_dtype(value)
+            if len(self.keys_) > 1 and np.dtype(dtype).kind != 'M':
+                # other rows have no value
+                dtype = object
+            column = self.columns[field] = np.empty(self.capacity, dtype)
+            if column.dtype.kind == 'M':
+                column[:] = np.datetime64('NaT')
+        elif not column_accepts(column, value):
+            column = self.columns[field] = column.astype(object)
+            self.shared.discard(field)
+        elif field in self.shared:
+            # copy on write: column is shared with a copy
+            column = self.columns[field] = column.copy()
+            self.shared.discard(field)
+        column[row] = value
+        self._arrays.pop(field, None)
+
+    def grow(self):
+        """ Allocate more rows to columns. """
+        self.capacity = max(16, self.capacity * 2)
+        count = len(self.keys_)
+        for field, column in self.columns.items():
+            array = np.empty(self.capacity, column.dtype)
+            array[:count] = column[:count]
+            self.columns[field] = array
+        self.shared.clear()
+
+    def array(self, field):
+        """
+        Return field's values for all rows (deleted ones included) as
+        numpy array. Typed columns are returned as is (not copied), object
+        ones are converted by ``as_array`` (cached until field's column
+        is updated).
+        """
+        count = len(self.keys_)
+        column = self.columns.get(field)
+        if column is not None and column.dtype.kind != 'O':
+            return column[:count]
+        array = self._arrays.get(field)
+        if array is None:
+            values = [None] * count if column is None else \
+                     column[:count].tolist()
+            array = self._arrays[field] = as_array(values)
+        return array
+
+    def index_array(self):
+        """ Return rows of current records as numpy array. """
+        array = self._arrays.get(None)
+        if array is None:
+            array = self._arrays[None] = np.fromiter(
+                self.rows.values(), dtype=np.intp, count=len(self.rows))
+        return array
+
+    def take(self, rows, fields=None):
+        """ Return new ``ColumnRecords`` for provided rows and fields. """
+        rows = np.asarray(rows, dtype=np.intp)
+        records = type(self)()
+        keys = self.keys_
+        records.keys_ = list(map(keys.__getitem__, rows.tolist()))
+        records.rows = {key: row for row, key in enumerate(records.keys_)}
+        records.capacity = len(rows)
+        records.columns = {
+            field: column[rows] for field, column in self.columns.items()
+            if fields is None or field in fields
+        }
+        updated = self.updated
+        records.updated = {i for i, row in enumerate(rows.tolist())
+                           if row in updated}
+        return records
+
+    def copy(self):
+        """
+        Return a copy-on-write copy of self: columns and rows are shared
+        until either side modifies them.
+        """
+        records = type(self)()
+        records.columns = dict(self.columns)
+        records.capacity = self.capacity
+        records.keys_, records.rows, records.updated = \
+            self.keys_, self.rows, self.updated
+        records.shared = set(self.columns)
+        records.shared_rows = True
+        self.shared.update(self.columns)
+        self.shared_rows = True
+        return records
+
+    def __getitem__(self, key):
+        return ColumnRecord(self, self.rows[key])
+
+    def __setitem__(self, key, item):
+        data = RecordSet.get_item_data(item)
+        self.unshare_rows()
+        row = self.rows.get(key)
+        if row is None:
+            row = len(self.keys_)
+            if row >= self.capacity:
+                self.grow()
+            self.rows[key] = row
+            self.keys_.append(key)
+            self._arrays.clear()
+        for field in list(self.columns.keys() - data.keys()):
+            self.set_value(row, field, None)
+        for field, value in data.items():
+            self.set_value(row, field, value)
+        if getattr(item, '_pool_updated', False):
+            self.updated.add(row)
+
+    def __delitem__(self, key):
+        self.unshare_rows()
+        row = self.rows.pop(key)
+        self.updated.discard(row)
+        self._arrays.pop(None, None)
+
+    def __iter__(self):
+        return iter(self.rows)
+
+    def __len__(self):
+        return len(self.rows)
+
+    def __contains__(self, key):
+        return key in self.rows
+
+    def __str__(self):
+        return 'ColumnRecords({})'.format(list(self.columns))
+
+
+class ColumnRecordSet(RecordSet):
+    """
+    RecordSet storing records' values by column instead of instances,
+    providing vectorised bulk operations using numpy (required for
+    ``filter``, ``diff``, ``array``).
+
+    Records are returned as ``ColumnRecord`` views over the columns. Model
+    must be a ``Record`` class. Concurrent mode is not supported.
+    """
+    def __init__(self, index, model=Record, records=None, **kwargs):
+        if issubclass(model, models.Model):
+            raise ValueError('ColumnRecordSet does not support django models')
+        if kwargs.get('concurrent'):
+            raise ValueError('ColumnRecordSet does not support concurrent mode')
+        super().__init__(index, model, **kwargs)
+        self.records = ColumnRecords()
+        if records:
+            self.update(records)
+
+    @property
+    def columns(self):
+        """ Columns' names """
+        return self.records.columns.keys()
+
+    def array(self, field):
+        """ Return values of the field as numpy array, by record. """
+        return self.records.array(field)[self.records.index_array()]
+
+    def keys_array(self):
+        """ Return records' keys as numpy array. """
+        keys = np.empty(len(self.records), dtype=object)
+        keys[:] = list(self.records.keys())
+        return keys
+
+    def filter(self, func=None, **values):
+        """
+        Return a new record set with records matching provided conditions.
+
+        :param callable func: `func(record_set) -> bool array`
+        :param **values: field values to match.
+        """
+        mask = np.ones(len(self.records), dtype=bool)
+        for field, value in values.items():
+            mask &= self.array(field) == value
+        if func is not None:
+            mask &= func(self)
+        return self.clone(self.records.take(self.records.index_array()[mask]))
+
+    def select(self, *fields):
+        """ Return a new record set with only provided fields. """
+        return self.clone(self.records.take(self.records.index_array(),
+                                            fields))
+
+    def diff(self, other):
+        """
+        Compare with provided record set, considered as previous version
+        of self. Missing values (``None``, NaN, NaT) are equal.
+
+        :param ColumnRecordSet other: records set to compare to.
+        :returns tuple of keys lists: `(created, updated, deleted)`.
+        """
+        records, other_records = self.records, other.records
+        rows, other_rows = records.rows, other_records.rows
+        keys, other_keys = records.keys_, other_records.keys_
+
+        index = records.index_array()
+        other_index = np.fromiter(map(other_rows.get, rows, repeat(-1)),
+                                  np.intp, len(rows))
+        common = other_index >= 0
+        created = list(map(keys.__getitem__, index[~common].tolist()))
+        deleted = np.fromiter(map(rows.get, other_rows, repeat(-1)),
+                              np.intp, len(other_rows)) < 0
+        deleted = list(map(other_keys.__getitem__,
+                           other_records.index_array()[deleted].tolist()))
+        if not common.any():
+            return created, [], deleted
+
+        index, other_index = index[common], other_index[common]
+        changed = np.zeros(len(index), dtype=bool)
+        for field in self.columns | other.columns:
+            a = records.array(field)[index]
+            b = other_records.array(field)[other_index]
+            if a.dtype.kind == 'O' or b.dtype.kind == 'O' or \
+                    a.dtype.kind != b.dtype.kind:
+                a, b = a.astype(object), b.astype(object)
+            # NaN and NaT are the only values not equal to themselves
+            changed |= (a != b) & ~((a != a) & (b != b))
+        return created, list(map(keys.__getitem__, index[changed].tolist())), \
+            deleted
+
+    def clone(self, records=None):
+        """
+        Clone self. Columns are shared copy-on-write with the clone (see
+        ``ColumnRecords.copy``).
+
+        :param records: if provided, use those ``ColumnRecords`` or \
+            `(key, record)` instead of self's ones.
+        """
+        if isinstance(records, ColumnRecords):
+            clone = super().clone(())
+            clone.records = records
+            clone.indexes and clone.reindex()
+            return clone
+        return super().clone(records)
+
+    def __str__(self):
+        return 'ColumnRecordSet({}, {})'.format(self.index, self.records)
+
+    def __repr__(self):
+        return 'ColumnRecordSet({}, {})'.format(self.index, self.records)
@@ -0,0 +1,154 @@
+import threading
+
+from .overlay import fork, Overlay
+from .record import Record
+
+
+__all__ = ('key_getter', 'Index')
+
+
+def key_getter(key):
+    """
+    Return a function extracting a key value from items (dict, record or
+    any object), in order to avoid checking key's type on each item.
+
+    :param key: attribute name, tuple of keys (composite value), callable \
+        (taking a record, dict items being wrapped into a ``Record``) or \
+        None (value is always None).
+
+    Dict items are wrapped into a ``Record`` created once by getter and
+    thread, which callables must not keep.
+    """
+    if key is None:
+        return lambda item: None
+    if callable(key):
+        local = threading.local()
+        def getter(item):
+            if not isinstance(item, dict):
+                return key(item)
+            record = getattr(local, 'record', None)
+            if record is None:
+                record = local.record = Record()
+            record.data = item
+            value = key(record)
+            record.data = None
+            return value
+    elif isinstance(key, (tuple, list)):
+        getters = tuple(key_getter(k) for k in key)
+        def getter(item):
+            return tuple(get(item) for get in getters)
+    else:
+        def getter(item):
+            if isinstance(item, dict):
+                return item.get(key)
+            return getattr(item, key, None)
+    return getter
+
+
+class Index:
+    """
+    Secondary index of a ``RecordSet``, mapping an index value to the
+    key(s) of matching records in the set.
+
+    Index value is read from records using ``key``, which can be an
+    attribute name, a tuple of attribute names (composite value) or a
+    callable. Records with a ``None`` index value are not indexed.
+
+    For unique indexes, the last indexed record wins.
+    """
+    key = None
+    """ Attribute name, tuple of attribute names, or callable. """
+    unique = True
+    """ If False, multiple records can have the same index value. """
+    entries = None
+    """
+    Index entries, as `{value: record_key}` when unique, otherwise as
+    `{value: {record_key: None}}`.
+    """
+    shared = False
+    """ Entries are shared with a copy (see ``copy``). """
+
+    def __init__(self, key, unique=True):
+        self.key = key
+        self.unique = unique
+        self.entries = {}
+        self._value_of = key_getter(key)
+
+    def value_of(self, item):
+        """ Return index value for provided item (record or dict). """
+        return self._value_of(item)
+
+    def add(self, key, item):
+        """ Index record ``item`` stored at ``key``. """
+        value = self.value_of(item)
+        if value is None:
+            return
+        self.shared and self.unshare()
+        if self.unique:
+            self.entries[value] = key
+            return
+        keys = self._get_keys(value)
+        if keys is None:
+            self.entries[value] = {key: None}
+        else:
+            keys[key] = None
+
+    def remove(self, key, item):
+        """ Remove record ``item`` stored at ``key`` from index. """
+        value = self.value_of(item)
+        if value is None:
+            return
+        self.shared and self.unshare()
+        if self.unique:
+            if self.entries.get(value) == key:
+                del self.entries[value]
+            return
+        keys = self._get_keys(value)
+        if keys is not None:
+            keys.pop(key, None)
+            if not keys:
+                del self.entries[value]
+
+    def unshare(self):
+        """ Stop writing to entries shared with a copy. """
+        self.entries = fork(self.entries)
+        self.shared = False
+
+    def _get_keys(self, value):
+        """
+        Return keys for value of a non-unique index, to be modified (copy
+        it when shared with another index).
+        """
+        keys = self.entries.get(value)
+        if keys is not None and isinstance(self.entries, Overlay) and \
+                not self.entries.owns(value):
+            keys = self.entries[value] = dict(keys)
+        return keys
+
+    def get(self, value):
+        """
+        Return record key for the provided value (None if not found). If
+        not unique, return a list of keys.
+        """
+        if self.unique:
+            return self.entries.get(value)
+        return list(self.entries.get(value, ()))
+
+    def copy(self):
+        """
+        Return a copy-on-write copy of self. Self keeps its entries until
+        it is updated.
+        """
+        index = type(self)(self.key, self.unique)
+        index.entries = fork(self.entries)
+        self.shared = self.shared or index.entries.base is self.entries
+        return index
+
+    def __len__(self):
+        return len(self.entries)
+
+    def __contains__(self, value):
+        return value in self.entries
+
+    def __repr__(self):
+        return 'Index({}, unique={})'.format(self.key, self.unique)
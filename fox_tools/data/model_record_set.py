@@ -65,7 +65,8 @@ class ModelRecordSet(RecordSet):
             return items
 
         queryset = self.get_queryset(items=items)
-        in_db = {self.index_of(item): item for item in queryset}
+        index_of = self.index_of
+        in_db = {index_of(item): item for item in queryset}
 
         # change list in place
         for i in range(0,len(items)):
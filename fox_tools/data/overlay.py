@@ -0,0 +1,122 @@
+from collections.abc import MutableMapping
+
+
+__all__ = ('Overlay', 'fork')
+
+
+_missing = object()
+
+
+class Overlay(MutableMapping):
+    """
+    Copy-on-write mapping over a base mapping: inserts, updates and
+    deletes are recorded by the overlay, base mapping is never modified.
+    """
+    max_depth = 8
+    """ [class attribute] Maximum overlays chain length (see ``fork``). """
+    base = None
+    """ Base mapping (read only). """
+    changes = None
+    """ Inserted or updated items. """
+    added = None
+    """ Keys of ``changes`` that are not in base. """
+    deleted = None
+    """ Keys of base that have been deleted. """
+
+    def __init__(self, base=None):
+        self.base = {} if base is None else base
+        self.changes = {}
+        self.added = set()
+        self.deleted = set()
+
+    @property
+    def depth(self):
+        """ Overlays chain length. """
+        base = self.base
+        return base.depth + 1 if isinstance(base, Overlay) else 1
+
+    @property
+    def changed(self):
+        """ True if overlay has been modified. """
+        return bool(self.changes or self.deleted)
+
+    def owns(self, key):
+        """ Return True if value for key is stored by the overlay. """
+        return key in self.changes
+
+    def get(self, key, default=None):
+        value = self.changes.get(key, _missing)
+        if value is not _missing:
+            return value
+        if key in self.deleted:
+            return default
+        return self.base.get(key, default)
+
+    def copy(self):
+        """ Return a new dict with overlay's items. """
+        return dict(self.items())
+
+    def __getitem__(self, key):
+        value = self.get(key, _missing)
+        if value is _missing:
+            raise KeyError(key)
+        return value
+
+    def __setitem__(self, key, value):
+        if key in self.base:
+            self.deleted.discard(key)
+        else:
+            self.added.add(key)
+        self.changes[key] = value
+
+    def __delitem__(self, key):
+        if key in self.changes:
+            del self.changes[key]
+            if key in self.base:
+                self.deleted.add(key)
+            else:
+                self.added.discard(key)
+        elif key in self.base and key not in self.deleted:
+            self.deleted.add(key)
+        else:
+            raise KeyError(key)
+
+    def __contains__(self, key):
+        return key in self.changes or \
+            (key in self.base and key not in self.deleted)
+
+    def __iter__(self):
+        deleted, added = self.deleted, self.added
+        for key in self.base:
+            if key not in deleted:
+                yield key
+        for key in self.changes:
+            if key in added:
+                yield key
+
+    def __len__(self):
+        return len(self.base) - len(self.deleted) + len(self.added)
+
+    def __repr__(self):
+        return 'Overlay({})'.format(dict(self.items()))
+
+
+def fork(mapping):
+    """
+    Return a copy-on-write copy of provided mapping, as an ``Overlay``
+    over it. Provided mapping is left in place, but must not be modified
+    anymore once shared (when it is the copy's ``base``): its owner
+    replaces it with ``fork(mapping)`` before writing.
+
+    Unchanged overlays are skipped, and chains reaching
+    ``Overlay.max_depth`` flattened. Mappings other than dict and
+    ``Overlay`` are copied using their ``copy()`` method.
+    """
+    if isinstance(mapping, Overlay):
+        if not mapping.changed:
+            return Overlay(mapping.base)
+        if mapping.depth >= mapping.max_depth:
+            return Overlay(dict(mapping.items()))
+    elif not isinstance(mapping, dict):
+        return mapping.copy()
+    return Overlay(mapping)
@@ -1,3 +1,6 @@
+from contextlib import nullcontext
+import threading
+
 from .record_set import RecordSet
 
 
@@ -8,15 +11,42 @@ class Pool:
     """
     A Pool handle records indexed by a model-key and a record-key.
     A Record is either a `Record` instance or django model's one.
+
+    In concurrent mode, registration is atomic and registered record sets
+    are switched to concurrent mode (see ``RecordSet.set_concurrent``), so
+    the pool can be shared by multiple threads.
     """
-    def __init__(self, record_sets=None):
-        self.record_sets = dict(record_sets or {})
+    concurrent = False
+    """ Concurrent mode, as bool or number of record sets' lock stripes. """
+
+    def __init__(self, record_sets=None, concurrent=False):
+        self.concurrent = concurrent
+        self.lock = threading.Lock() if concurrent else nullcontext()
+        self.record_sets = {}
+        for key, records in (record_sets or {}).items():
+            self.register(key, records)
 
     def register(self, key, records, force=False):
         """ Register RecordSet for a specific key """
-        if not force and key in self.record_sets:
-            raise RuntimeError('there is already a records registered for key {}'
-                                .format(key))
+        with self.lock:
+            if not force and key in self.record_sets:
+                raise RuntimeError('there is already a records registered for key {}'
+                                    .format(key))
+            self._register(key, records)
+
+    def setdefault(self, key, records):
+        """
+        Register record set if there is none for key, as an atomic
+        operation. Return the record set registered for key.
+        """
+        with self.lock:
+            if key not in self.record_sets:
+                self._register(key, records)
+            return self.record_sets[key]
+
+    def _register(self, key, records):
+        if self.concurrent and records.locks is None:
+            records.set_concurrent(self.concurrent)
         self.record_sets[key] = records
 
     def get(self, key, pk=None):
@@ -26,6 +56,16 @@ class Pool:
             return None
         return record_set if pk is None else record_set.get(pk)
 
+    def get_by(self, key, index, value, default=None):
+        """ Get object(s) from pool using record set's secondary index. """
+        return self.record_sets[key].get_by(index, value, default)
+
+    def clone(self):
+        """ Return a copy of self with cloned (copy-on-write) record sets. """
+        return type(self)({key: record_set.clone()
+                           for key, record_set in self.record_sets.items()},
+                          concurrent=self.concurrent)
+
     def index_of(self, key, item):
         return self.record_sets[key].index_of(item)
 
@@ -1,12 +1,17 @@
+import copy
+
 from django.db import models
 from jsonpath2.path import Path as JSONPath
+from rest_framework.serializers import BaseSerializer, ModelSerializer, \
+    Serializer
+from rest_framework.utils.serializer_helpers import BindingDict
 
 
 from .record import Record
 from .record_set import RecordSet
 
 
-__all__ = ('as_json_path', 'BaseReader', 'Reader')
+__all__ = ('as_json_path', 'copy_field', 'BaseReader', 'Reader')
 
 
 def as_json_path(path, allow_none=False):
@@ -20,6 +25,28 @@ def as_json_path(path, allow_none=False):
     raise ValueError('invalid path {} (type: {})'.format(path, type(path)))
 
 
+def copy_field(field):
+    """
+    Return a copy of provided serializer field, cheaper than a deep copy:
+    the field is shallow copied, its children fields (``child``,
+    ``child_relation``) being copied and re-parented to the copy (they are
+    already bound). Serializers are deep copied.
+    """
+    if isinstance(field, BaseSerializer):
+        return copy.deepcopy(field)
+    field = copy.copy(field)
+    for attr in ('child', 'child_relation'):
+        child = field.__dict__.get(attr)
+        if child is not None:
+            child = copy_field(child)
+            child.parent = field
+            setattr(field, attr, child)
+    return field
+
+
+_default_get_fields = (Serializer.get_fields, ModelSerializer.get_fields)
+
+
 class BaseReader:
     """
     Base class for data reader.
@@ -79,6 +106,19 @@ class Reader(BaseReader):
     """ Init arguments to pass to serializer instanciation"""
     record_set_class = RecordSet
     """ RecordSet class. """
+    cache_fields = None
+    """
+    If True, serializer's fields are built once by serializer class, and
+    serializer instances get copies of them (see ``copy_field``) instead
+    of deep copies of declared fields. If None (default), only for
+    serializers not overriding DRF's ``get_fields``, which may depend on
+    instance or context (see ``is_cacheable``).
+    """
+    field_plans = {}
+    """
+    [class attribute] Prototype fields by serializer class. Readers with
+    ``serializer_kwargs`` keep their own.
+    """
 
     def __init__(self, path=None, serializer_class=None, many=False, 
                     record_set_class=RecordSet, **serializer_kwargs):
@@ -132,5 +172,46 @@ class Reader(BaseReader):
             if self.serializer_kwargs:
                 kwargs.update((k, v) for k,v in self.serializer_kwargs.items()
                                 if k not in kwargs)
-            return serializer_class(data=data, **kwargs)
+            serializer = serializer_class(data=data, **kwargs)
+            target = getattr(serializer, 'child', serializer)
+            if self.is_cacheable(type(target)):
+                self.set_fields(target)
+            return serializer
         return None
+
+    def is_cacheable(self, serializer_class):
+        """
+        Return True if fields of provided serializer class are built from
+        a field plan (see ``cache_fields``).
+        """
+        if self.cache_fields is not None:
+            return self.cache_fields
+        return serializer_class.get_fields in _default_get_fields
+
+    def get_field_plan(self, serializer_class):
+        """
+        Return prototype fields of provided serializer class instantiated
+        with ``serializer_kwargs``, as `{name: field}`. They are built once
+        and must not be modified.
+        """
+        kwargs = {k: v for k, v in (self.serializer_kwargs or {}).items()
+                  if k not in ('many', 'data', 'instance')}
+        plans = self.__dict__.setdefault('field_plans', {}) if kwargs else \
+                self.field_plans
+        plan = plans.get(serializer_class)
+        if plan is None:
+            plan = plans.setdefault(serializer_class,
+                                    serializer_class(**kwargs).get_fields())
+        return plan
+
+    def set_fields(self, serializer):
+        """
+        Set serializer's fields from field plan: fields are copies of
+        prototypes (see ``copy_field``) bound to the serializer.
+        """
+        if 'fields' in serializer.__dict__:
+            return
+        fields = BindingDict(serializer)
+        for key, field in self.get_field_plan(type(serializer)).items():
+            fields[key] = copy_field(field)
+        serializer.__dict__['fields'] = fields
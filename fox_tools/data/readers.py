@@ -109,11 +109,12 @@ class Readers(Reader):
 
         Flowchart (if key not in pool):
         - ``get_record_set(pool)``
-        - ``pool.register(key, record_set)``
+        - ``pool.setdefault(key, record_set)``
         """
         if key not in pool:
             record_set = self.get_record_set(key)
-            record_set is not None and pool.register(key, record_set)
+            if record_set is not None:
+                return pool.setdefault(key, record_set)
         return pool[key]
 
     def get_record_set(self, key):
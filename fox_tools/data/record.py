@@ -1,19 +1,55 @@
-
-
-__all__ = ('Record',)
+__all__ = ('Record', 'CompactRecord')
 
 
 class Record:
-    """ Pool record when no object is provided. """
-    data = None
-    _pool_updated = False
+    """
+    Pool record when no object is provided. Values are stored in
+    ``data`` dict. Record has slots, so that subclasses can declare
+    theirs without getting an instance dict (see ``CompactRecord``).
+    """
+    __slots__ = ('data', '_pool_updated')
 
     def __init__(self, data=None, **attrs):
+        self._pool_updated = False
         if attrs:
             self.data = attrs
             data and self.data.update(data)
-        elif data:
-            self.data = data
+        else:
+            self.data = data or None
+
+    @classmethod
+    def compact(cls, fields, name=None):
+        """
+        Return a `CompactRecord` subclass storing provided fields in slots.
+        Generated classes are cached by fields, so record sets sharing a
+        schema share a class.
+
+        :param [str] fields: known fields names
+        :param str name: generated class name
+        :raises ValueError: a field name is reserved (record's attribute \
+            or method, e.g. ``data``).
+        """
+        fields = tuple(fields)
+        base = cls if issubclass(cls, CompactRecord) else CompactRecord
+        reserved = [f for f in fields
+                    if f not in base._fields and hasattr(base, f)]
+        if reserved:
+            raise ValueError('reserved record field names: {}'
+                             .format(', '.join(reserved)))
+        cache = base.__dict__.get('_compact_classes')
+        if cache is None:
+            cache = {}
+            setattr(base, '_compact_classes', cache)
+
+        record_class = cache.get(fields)
+        if record_class is None:
+            slots = tuple(f for f in fields if f not in base._fields)
+            record_class = type(name or base.__name__, (base,), {
+                '__slots__': slots,
+                '_fields': base._fields + slots,
+            })
+            cache[fields] = record_class
+        return record_class
 
     def clone(self):
         """ Clone record """
@@ -29,6 +65,57 @@ class Record:
         return super().__getattr__(key)
 
     def __setattr__(self, key, value):
-        if not hasattr(type(self), key):
+        if hasattr(type(self), key):
+            super().__setattr__(key, value)
+        else:
             self.data[key] = value
-        return super().__setattr__(key, value)
+
+
+class CompactRecord(Record):
+    """
+    Record storing known fields (``_fields``) into slots instead of a
+    per-instance dict. Use ``Record.compact(fields)`` to get a class for
+    a specific set of fields.
+
+    Unknown fields are still accepted, and stored in a dict allocated on
+    first use (``_extra``): instances have no ``__dict__``.
+    """
+    __slots__ = ('_extra',)
+    _fields = ()
+    """ [class attribute] Fields stored in slots. """
+
+    def __init__(self, data=None, **attrs):
+        self._pool_updated = False
+        self._extra = None
+        if data:
+            attrs.update(data)
+        for key, value in attrs.items():
+            self.__setattr__(key, value)
+
+    @property
+    def data(self):
+        """ Record's data as a new dict. """
+        data = {}
+        for key in self._fields:
+            try:
+                data[key] = object.__getattribute__(self, key)
+            except AttributeError:
+                pass
+        if self._extra:
+            data.update(self._extra)
+        return data
+
+    def __getattr__(self, key):
+        extra = object.__getattribute__(self, '_extra')
+        if extra is not None and key in extra:
+            return extra[key]
+        raise AttributeError("'{}' object has no attribute '{}'"
+                             .format(type(self).__name__, key))
+
+    def __setattr__(self, key, value):
+        if hasattr(type(self), key):
+            object.__setattr__(self, key, value)
+        elif self._extra is None:
+            self._extra = {key: value}
+        else:
+            self._extra[key] = value
@@ -1,5 +1,12 @@
+from contextlib import nullcontext
 import copy
+import threading
+
 from django.db import models, transaction
+
+from ..locks import StripedLock
+from .index import key_getter, Index
+from .overlay import fork, Overlay
 from .record import Record
 
 
@@ -11,17 +18,89 @@ class RecordSet:
     Set of indexed records with commit system used to keep instances
     of provided model (django's `Model` or `Record`). Provide interface
     similar to dict and manipulation facilities.
+
+    Set operators return new record sets (operands are left unchanged):
+    - ``a | b``: records of both, ``b``'s ones taking precedence;
+    - ``a & b``: records of ``a`` whose key is in ``b``;
+    - ``a - b``: records of ``a`` whose key is not in ``b``;
+    - ``a + b``: records of both, ``b``'s data being committed over ``a``'s
+      records (updating their attributes).
+
+    In concurrent mode, records are locked by key using lock striping
+    (see ``locks.StripedLock``), making commit, removal and
+    ``get_or_create`` atomic for a key, while secondary indexes updates are
+    serialized.
+    """
+    locks = None
+    """ Records' striped locks, in concurrent mode. """
+    shared = False
+    """
+    Records are shared with a clone, and must not be modified in place
+    anymore (see ``clone``).
     """
-    # TODO: override operators: + - | & 
     
-    def __init__(self, index, model=Record, records=None, relations=None):
+    @property
+    def index(self):
+        """ Records' index, as attribute name, tuple of those, or callable. """
+        return self._index
+
+    @index.setter
+    def index(self, index):
+        self._index = index
+        self._index_of = key_getter(index)
+
+    def __init__(self, index, model=Record, records=None, relations=None,
+                 fields=None, indexes=None, concurrent=False):
+        """
+        :param index: records' index, as attribute name or callable
+        :param model: records' class (django Model or Record)
+        :param records: initial records
+        :param relations: relations to resolve on commit
+        :param [str] fields: if provided, use a compact record class \
+            storing those fields (see ``Record.compact``).
+        :param dict indexes: secondary indexes by name, as ``Index`` \
+            instances or unique index's key (see ``Index``).
+        :param bool|int concurrent: enable concurrent mode, using \
+            provided number of lock stripes if an int.
+        """
+        if fields:
+            if not issubclass(model, Record):
+                raise ValueError('fields can only be provided for Record '
+                                 'models')
+            model = model.compact(fields)
         self.index = index
         self.model = model
         self.records = {}
         self.relations = relations
+        self.indexes = {
+            name: index if isinstance(index, Index) else Index(index)
+            for name, index in (indexes or {}).items()
+        }
+        self.set_concurrent(concurrent)
         if records:
             self.update(records)
 
+    def set_concurrent(self, concurrent=True):
+        """
+        Enable or disable concurrent mode.
+
+        :param bool|int concurrent: enable if True, using provided number \
+            of lock stripes if an int.
+        """
+        if not concurrent:
+            self.locks = None
+            self._indexes_lock = nullcontext()
+        else:
+            count = None if concurrent is True else concurrent
+            self.locks = StripedLock(count)
+            self._indexes_lock = threading.Lock()
+
+    def lock(self, key):
+        """ Return a context manager locking records for provided key. """
+        if self.locks is None:
+            return nullcontext()
+        return self.locks.lock(key)
+
     @staticmethod
     def get_item_data(item):
         """
@@ -42,6 +121,13 @@ class RecordSet:
         raise ValueError('item must be a Record, a Django Model, a dict '
                          'or an iterable of `key,value`')
 
+    @staticmethod
+    def clone_record(item):
+        """ Return a copy of provided record. """
+        if isinstance(item, Record):
+            return item.clone()
+        return copy.copy(item)
+
     @staticmethod
     def record_updated(item):
         """
@@ -61,14 +147,75 @@ class RecordSet:
         return item and self.record_updated(item)
 
     def index_of(self, item):
-        """ Return index for the provided item. """
-        if self.index == None:
-            return None
-        if isinstance(item, dict):
-            item = Record(data=item)
-        if callable(self.index):
-            return self.index(item)
-        return getattr(item, self.index, None)
+        """
+        Return index for the provided item, using key getter compiled
+        when index is set (see ``key_getter``).
+        """
+        return self._index_of(item)
+
+    def unshare(self):
+        """
+        Before modifying records shared with a clone, replace them with
+        an overlay (see ``clone``).
+        """
+        with self._indexes_lock:
+            if self.shared:
+                self.records = fork(self.records)
+                self.shared = False
+
+    def own(self, key, record):
+        """
+        Return provided record stored at ``key``, copied into self's
+        records when read from an overlay's base (see ``clone``), so that
+        it can be updated in place.
+        """
+        records = self.records
+        if not isinstance(records, Overlay) or records.owns(key):
+            return record
+        with self.lock(key):
+            self.shared and self.unshare()
+            records = self.records
+            if records.owns(key):
+                return records[key]
+            owned = self.clone_record(record)
+            setattr(owned, '_pool_updated', self.record_updated(record))
+            records[key] = owned
+            return owned
+
+    def get_by(self, index, value, default=None):
+        """
+        Get record(s) using a secondary index.
+
+        :param str index: index name
+        :param value: index value
+        :param default: value returned when no record is found (unique index)
+        :returns record, or list of records for non-unique indexes.
+        """
+        keys = self.indexes[index].get(value)
+        if isinstance(keys, list):
+            return [self[key] for key in keys]
+        if keys is None or keys not in self.records:
+            return default
+        return self[keys]
+
+    def add_to_indexes(self, key, item):
+        """ Add record stored at ``key`` to secondary indexes. """
+        with self._indexes_lock:
+            for index in self.indexes.values():
+                index.add(key, item)
+
+    def remove_from_indexes(self, key, item):
+        """ Remove record stored at ``key`` from secondary indexes. """
+        with self._indexes_lock:
+            for index in self.indexes.values():
+                index.remove(key, item)
+
+    def reindex(self):
+        """ Rebuild secondary indexes from records. """
+        for name, index in self.indexes.items():
+            index = self.indexes[name] = Index(index.key, index.unique)
+            for key, item in self.records.items():
+                index.add(key, item)
 
     def resolve(self, pool, item):
         """ Resolve relations for provided item's data """
@@ -96,32 +243,60 @@ class RecordSet:
         :param Pool pool: if provided, resolve item's relations using this pool
         :return updated/inserted item.
         """
-        key = key or self.index_of(item)
-        target = self.records.get(key)
-        if target is None or override:
-            if not isinstance(item, (models.Model,Record)):
+        if key is None:
+            key = self.index_of(item)
+        with self.lock(key):
+            target = self.records.get(key)
+            if target is None or override:
+                if not isinstance(item, (models.Model,Record)):
+                    if pool:
+                        self.resolve(pool, item)
+                    model = self.model
+                    if issubclass(model, models.Model):
+                        item = {k: v for k,v in item.items()
+                                if hasattr(model, k)}
+                    item = self.model(**item)
+                # FIXME: if model or item, clone it
+                self[key] = item
+                # stored record may differ from item (e.g. column views)
+                target = self.records[key]
+            else:
+                item = self.get_item_data(item)
                 if pool:
                     self.resolve(pool, item)
-                model = self.model
-                if issubclass(model, models.Model):
-                    item = {k: v for k,v in item.items()
-                            if hasattr(model, k)}
-                item = self.model(**item)
-            # FIXME: if model or item, clone it
-            self.records[key] = item
-            target = item
-        else:
-            item = self.get_item_data(item)
-            if pool:
-                self.resolve(pool, item)
-            try:
-                for key, value in item.items():
-                    setattr(target, key, value)
-            except:
-                print('error', self.model, key, item)
-                raise
-            setattr(target, '_pool_updated', True)
-        return target
+                # copy on write: target may be shared with other record sets
+                self.shared and self.unshare()
+                target = self.own(key, target)
+                if self.indexes:
+                    self.remove_from_indexes(key, target)
+                try:
+                    for attr, value in item.items():
+                        setattr(target, attr, value)
+                except:
+                    print('error', self.model, attr, item)
+                    raise
+                setattr(target, '_pool_updated', True)
+                if self.indexes:
+                    self.add_to_indexes(key, target)
+            return target
+
+    def get_or_create(self, item, key=None, pool=None):
+        """
+        Return record for the provided key, inserting item if there is
+        none, as an atomic operation.
+
+        :param Item item: item to insert
+        :param Key key: item's index key (default: `self.index_of(item)`)
+        :param Pool pool: if provided, resolve item's relations using this pool
+        :return a tuple of `(record, created)`.
+        """
+        if key is None:
+            key = self.index_of(item)
+        with self.lock(key):
+            target = self.records.get(key)
+            if target is not None:
+                return target, False
+            return self.commit(item, key=key, pool=pool), True
 
     def update(self, items, keyed=False, override=False, pool=None):
         """
@@ -142,7 +317,8 @@ class RecordSet:
         :param Pool pool: if provided, resolve item's relations using this pool
         """
         if not keyed and not isinstance(items, dict):
-            items = ((self.index_of(item), item) for item in items)
+            index_of = self.index_of
+            items = ((index_of(item), item) for item in items)
         if isinstance(items, dict):
             items = items.items()
         if hasattr(self, 'before_update_hook') or \
@@ -163,23 +339,27 @@ class RecordSet:
     def remove(self, item):
         """ Remove record using index of item """
         key = self.index_of(item)
-        if key in self.records:
-            del self.records[key]
+        with self.lock(key):
+            if key in self.records:
+                del self[key]
 
     def save(self, *args, **kwargs):
         """
         Save objects that have been updated or created for the provided
         model key, in a single atomic transaction.
         """
+        self.shared and self.unshare()
         with transaction.atomic():
-            for record in self.records.values():
+            for key, record in list(self.records.items()):
                 if self.record_updated(record):
+                    record = self.own(key, record)
                     record.save(*args, **kwargs)
                     setattr(record, '_pool_updated', False)
 
     # ---- dict like accessors
     def get(self, key):
-        return self.records.get(key)
+        record = self.records.get(key)
+        return record if record is None else self.own(key, record)
 
     def keys(self):
         """ Return an iterator over items' keys. """
@@ -194,13 +374,49 @@ class RecordSet:
         return self.records.items()
 
     def pop(self, key, default=None):
-        return self.records.pop(key, default)
+        with self.lock(key):
+            if key not in self.records:
+                return default
+            self.shared and self.unshare()
+            item = self.records.pop(key)
+            if self.indexes:
+                self.remove_from_indexes(key, item)
+            return item
+
+    def clone(self, records=None):
+        """
+        Clone self. Records are shared copy-on-write (see ``overlay.fork``):
+        the clone gets an overlay over self's records, which self keeps
+        until it modifies them (insert, delete, ``commit`` or ``save``).
+
+        Record sets using an overlay copy a shared record when getting it
+        (``get``, ``get_by``, ``[]``), committing or saving it. Records
+        returned by ``values()`` and ``items()`` and the ones of self are
+        still shared: update them through ``commit``.
 
-    def clone(self):
-        """ Clone self """
+        :param records: if provided, use those `(key, record)` instead \
+            of self's ones.
+        """
         clone = copy.copy(self)
-        if self.records:
-            clone.records = dict(self.records)
+        if self.locks is not None:
+            clone.set_concurrent(self.locks.count)
+        if records is not None:
+            clone.records = type(self.records)()
+            clone.shared = False
+            clone.indexes = {name: Index(index.key, index.unique)
+                             for name, index in self.indexes.items()}
+            for key, record in records:
+                clone[key] = record
+            return clone
+
+        with self.locks.lock_all() if self.locks else nullcontext():
+            clone.records = fork(self.records)
+            clone.shared = False
+            with self._indexes_lock:
+                self.shared = self.shared or \
+                    getattr(clone.records, 'base', None) is self.records
+                clone.indexes = {name: index.copy()
+                                 for name, index in self.indexes.items()}
         return clone
 
     def __iter__(self):
@@ -208,13 +424,24 @@ class RecordSet:
         return iter(self.values())
 
     def __getitem__(self, key):
-        return self.records[key]
+        return self.own(key, self.records[key])
 
     def __setitem__(self, key, value):
-        self.records[key] = value
+        with self.lock(key):
+            self.shared and self.unshare()
+            if self.indexes:
+                target = self.records.get(key)
+                if target is not None:
+                    self.remove_from_indexes(key, target)
+                self.add_to_indexes(key, value)
+            self.records[key] = value
 
     def __delitem__(self, key):
-        del self.records[key]
+        with self.lock(key):
+            self.shared and self.unshare()
+            if self.indexes:
+                self.remove_from_indexes(key, self.records[key])
+            del self.records[key]
 
     def __len__(self):
         return len(self.records)
@@ -230,5 +457,27 @@ class RecordSet:
     def __repr__(self):
         return 'RecordSet({}, {})'.format(self.index, self.records)
 
-    # ---- TODO: operators
+    # ---- operators
+    def __or__(self, other):
+        clone = self.clone()
+        for key, item in other.items():
+            clone[key] = item
+        return clone
+
+    def __and__(self, other):
+        return self.clone((k, v) for k, v in self.items() if k in other)
+
+    def __sub__(self, other):
+        return self.clone((k, v) for k, v in self.items() if k not in other)
+
+    def __add__(self, other):
+        clone = self.clone()
+        for key, item in other.items():
+            target = clone.get(key)
+            if target is None:
+                clone[key] = self.clone_record(item)
+            else:
+                clone[key] = self.clone_record(target)
+                clone.commit(item, key=key)
+        return clone
 
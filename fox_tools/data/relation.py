@@ -34,11 +34,15 @@ class Relation:
     
     Used to get the right foreign key to the reference, using provided
     pool.
+
+    When ``index`` is provided, target is looked up using this (unique)
+    secondary index of the record set instead of its main index.
     """
-    def __init__(self, key, source_field, nested_path=None):
+    def __init__(self, key, source_field, nested_path=None, index=None):
         self.key = key
         self.source_field = source_field
         self.nested_path = as_json_path(nested_path, True)
+        self.index = index
 
     def resolve(self, pool, data):
         """
@@ -51,7 +55,11 @@ class Relation:
         pk = source.get(self.source_field)
         if pk is None:
             return None
-        target = pool[self.key][pk]
+        if self.index is None:
+            return pool[self.key][pk]
+        target = pool[self.key].get_by(self.index, pk)
+        if target is None:
+            raise KeyError(pk)
         return target
 
     def get_reference_data(self, data):
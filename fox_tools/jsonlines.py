@@ -0,0 +1,136 @@
+"""
+Lazy JSON files parsing: JSON Lines (memory-mapped), concatenated JSON
+values, or single JSON document. Parsing backend can be selected at
+runtime between `orjson` (when installed) and standard `json` (used
+for concatenated values, see ``iter_concatenated``).
+"""
+import json
+import mmap
+import os
+import re
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+__all__ = ('FORMATS', 'set_backend', 'get_backend', 'loads', 'iter_lines',
+           'iter_jsonl', 'iter_concatenated', 'iter_file')
+
+
+FORMATS = ('json', 'jsonl', 'concat')
+""" Supported file formats. """
+
+_backend = None
+_whitespace = re.compile(r'[ \t\n\r]*')
+
+
+def set_backend(name=None):
+    """
+    Set JSON parsing backend: ``'orjson'``, ``'json'`` or None (`orjson`
+    if installed, standard `json` otherwise).
+    """
+    global _backend
+    if name is None:
+        name = 'json' if orjson is None else 'orjson'
+    if name == 'orjson':
+        if orjson is None:
+            raise ImportError('orjson is not installed')
+        _backend = orjson.loads
+    elif name == 'json':
+        _backend = json.loads
+    else:
+        raise ValueError('invalid JSON backend: {}'.format(name))
+
+
+def get_backend():
+    """ Return current backend's name. """
+    if _backend is None:
+        set_backend()
+    return 'orjson' if _backend is not json.loads else 'json'
+
+
+def loads(data):
+    """ Parse JSON data (str or bytes) using current backend. """
+    if _backend is None:
+        set_backend()
+    return _backend(data)
+
+
+def iter_lines(path):
+    """
+    Yield non-empty lines of file as bytes, reading it through a memory
+    map (file is not loaded in memory).
+    """
+    with open(path, 'rb') as file:
+        if not os.fstat(file.fileno()).st_size:
+            return
+        with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            start, size = 0, len(mm)
+            while start < size:
+                end = mm.find(b'\n', start)
+                if end == -1:
+                    end = size
+                line = mm[start:end]
+                if line.strip():
+                    yield line
+                start = end + 1
+
+
+def iter_jsonl(path):
+    """ Yield values of a JSON Lines file. """
+    for line in iter_lines(path):
+        yield loads(line)
+
+
+def iter_concatenated(path, chunk_size=1 << 20):
+    """
+    Yield values of a file of concatenated JSON values (optionally
+    separated by whitespaces), read by chunk. Memory is bounded by the
+    size of the largest value (plus a chunk).
+
+    Values are always parsed using standard `json` decoder, whatever the
+    selected backend: `orjson` does not provide a way to parse a value at
+    the start of a buffer, which is needed to find where it ends.
+    """
+    decoder = json.JSONDecoder()
+    skip = _whitespace.match
+    with open(path, 'r') as file:
+        buffer = ''
+        while True:
+            chunk = file.read(chunk_size)
+            buffer += chunk
+            index, size = skip(buffer).end(), len(buffer)
+            while index < size:
+                try:
+                    value, end = decoder.raw_decode(buffer, index)
+                except ValueError:
+                    break
+                # value may be truncated (e.g. a number)
+                if end == size and chunk:
+                    break
+                yield value
+                index = skip(buffer, end).end()
+            buffer = buffer[index:]
+            if not chunk:
+                if buffer:
+                    raise ValueError('invalid JSON data at end of {}'
+                                     .format(path))
+                return
+
+
+def iter_file(path, format='json'):
+    """
+    Yield values of a file of provided format: ``'json'`` (a single
+    value), ``'jsonl'`` (a value by line) or ``'concat'`` (concatenated
+    values).
+    """
+    if format == 'jsonl':
+        return iter_jsonl(path)
+    if format == 'concat':
+        return iter_concatenated(path)
+    if format == 'json':
+        with open(path, 'rb') as file:
+            return iter((loads(file.read()),))
+    raise ValueError('invalid format: {}'.format(format))
@@ -0,0 +1,73 @@
+"""
+Lock striping: a key is assigned to one lock of a fixed set of locks
+(stripes) by its hash. Distinct keys can then be used concurrently
+without a global lock, and without a lock per key.
+"""
+from contextlib import contextmanager
+import threading
+
+
+__all__ = ('StripedLock',)
+
+
+class StripedLock:
+    """
+    Set of locks by stripe, a key being assigned to a stripe by its
+    hash. Locks of multiple keys are always acquired in stripes order,
+    in order to avoid deadlocks.
+    """
+    count = 16
+    """ Number of stripes. """
+    locks = None
+    """ Locks by stripe. """
+
+    def __init__(self, count=None, lock_class=threading.RLock):
+        """
+        :param int count: number of stripes
+        :param lock_class: class of stripes' locks.
+        """
+        if count:
+            self.count = count
+        self.locks = [lock_class() for _ in range(self.count)]
+
+    def stripe(self, key):
+        """ Return stripe of provided key. """
+        return hash(key) % self.count
+
+    def stripes(self, keys):
+        """ Return sorted stripes of provided keys. """
+        return sorted({self.stripe(key) for key in keys})
+
+    def get(self, key):
+        """ Return lock for provided key. """
+        return self.locks[self.stripe(key)]
+
+    def acquire(self, keys):
+        """ Acquire locks for provided keys (in stripes order). """
+        for stripe in self.stripes(keys):
+            self.locks[stripe].acquire()
+
+    def release(self, keys):
+        """ Release locks for provided keys. """
+        for stripe in reversed(self.stripes(keys)):
+            self.locks[stripe].release()
+
+    @contextmanager
+    def lock(self, *keys):
+        """ Context manager holding locks of provided keys. """
+        self.acquire(keys)
+        try:
+            yield
+        finally:
+            self.release(keys)
+
+    @contextmanager
+    def lock_all(self):
+        """ Context manager holding all stripes' locks. """
+        for lock in self.locks:
+            lock.acquire()
+        try:
+            yield
+        finally:
+            for lock in reversed(self.locks):
+                lock.release()
@@ -1,63 +1,206 @@
 """ From data files, compile values summary. """
 import argparse
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
 import json
-import math
 import multiprocessing
 import os
 import sys
 
+import django
 from django.core.management.base import BaseCommand
-from fox_tools.data import DataReader
+from fox_tools import jsonlines
+from fox_tools.data import Reader
+from fox_tools.sketches import ValueSketch
 from fox_tools.tasks import Task, Pool
+from fox_tools.tasks.progress import ProgressDisplay
 
 
-__all__ = ('DataSummary',)
+__all__ = ('hashable', 'Summary', 'read_files', 'init_process',
+           'merge_counters', 'SummaryPool')
+
+
+def hashable(value):
+    """
+    Return value as hashable: lists and dicts are serialized to json (keys
+    being sorted).
+    """
+    if isinstance(value, (dict, list)):
+        return json.dumps(value, sort_keys=True)
+    return value
 
 
 class Summary(Task):
+    """
+    Count values read from files. Directories are listed, and their
+    content submitted to the pool as new tasks, by chunk of files.
+
+    Each task counts values into its own counters, returned as result and
+    merged by ``SummaryPool``. When ``approx`` is set, values are
+    summarized using sketches (``ValueSketch``) with bounded memory,
+    instead of being all counted.
+
+    JSON parsing is CPU-bound: when ``processes`` is provided, files are
+    read by this process executor (see ``read_files``), so that they are
+    parsed in parallel. Otherwise, they are read by pool's threads.
+    """
     files = None
+    """ Files or directories paths. """
     readers = None
-    dest = None
+    """ Readers by key. """
+    chunk_size = 64
+    """ Number of files by task. """
+    approx = None
+    """ If not None, ``ValueSketch`` init kwargs (dict). """
+    format = 'json'
+    """ Files format (see ``jsonlines.iter_file``). """
+    processes = None
+    """ Process executor reading files (optional). """
 
-    def run(self, *args, dest=None, **kwargs):
-        if dest is None:
-            dest = self.dest
+    def get_counter(self):
+        """ Return new values accumulator. """
+        if self.approx is None:
+            return Counter()
+        return ValueSketch(**self.approx)
 
+    def run(self, *args, pool=None, cancel=None, **kwargs):
+        counters = {key: self.get_counter() for key in self.readers}
+        files = []
         for path in self.files:
+            if cancel is not None:
+                cancel.raise_if_cancelled()
             if not os.path.exists(path):
                 print("[W] File does not exists:", path, file=sys.stderr)
+            elif os.path.isdir(path):
+                try:
+                    self.submit_dir(path, pool, counters, cancel)
+                except Exception as err:
+                    print('[E]', path, err, file=sys.stderr)
+            else:
+                files.append(path)
+
+        if files and self.processes is not None:
+            return merge_counters(counters, self.processes.submit(
+                read_files, files, tuple(self.readers), self.format,
+                self.approx).result())
+        for path in files:
+            if cancel is not None:
+                cancel.raise_if_cancelled()
+            self.read_file(path, counters)
+        return counters
+
+    def submit_dir(self, path, pool, counters, cancel=None):
+        """
+        Submit directory's entries to pool: a task per sub-directory, and
+        a task per chunk of files. Those are submitted to the running
+        pool's executor right away (see ``Pool.track``). Without pool,
+        read them directly.
+        """
+        with os.scandir(path) as entries:
+            dirs, files = [], []
+            for entry in entries:
+                (dirs if entry.is_dir() else files).append(entry.path)
+
+        if pool is None:
+            for p in sorted(files):
+                self.read_file(p, counters)
+            for p in dirs:
+                self.submit_dir(p, None, counters)
+            return
+
+        tasks = [self.clone(p, [p]) for p in dirs]
+        files = iter(sorted(files))
+        while True:
+            chunk = list(islice(files, self.chunk_size))
+            if not chunk:
+                break
+            tasks.append(self.clone(chunk[0], chunk))
+
+        executor = pool.executor
+        if executor is None:
+            pool.submit(tasks)
+            return
+        for task in tasks:
+            if pool.draining or task.key in pool.tasks:
                 continue
-            try:
-                if os.path.isdir(path):
-                    for p in os.listdir(path):
-                        p = os.path.join(path, p)
-                        self.read_file(p, dest)
-                else:
-                    self.read_file(path, dest)
-            except Exception as err:
-                print('[E]', path, err, file=sys.stderr)
-        return dest
-
-    def read_file(self, path, dest):
-        if not os.path.exists(path):
+            future = task.submit(executor, pool=pool, cancel=cancel)
+            pool.submit(task)
+            pool.track(future, task)
+
+    def clone(self, key, files):
+        """ Return new task for provided files. """
+        return type(self)(key, files=files, readers=self.readers,
+                          chunk_size=self.chunk_size, approx=self.approx,
+                          format=self.format, processes=self.processes)
+
+    def read_file(self, path, counters):
+        try:
+            for data in jsonlines.iter_file(path, self.format):
+                for key, reader in self.readers.items():
+                    values = reader.read(data)
+                    if not isinstance(values, (tuple,list)):
+                        values = (values,)
+                    counters[key].update(hashable(v) for v in values)
+        except Exception as err:
+            print('[E]', path, err, file=sys.stderr)
+
+
+def read_files(paths, keys, format='json', approx=None):
+    """
+    Return counters by key of values read from provided files (run by
+    ``Summary.processes`` workers).
+    """
+    task = Summary(None, files=paths, format=format, approx=approx,
+                   readers={k: Reader(k, many=True) for k in keys})
+    counters = {key: task.get_counter() for key in keys}
+    for path in paths:
+        task.read_file(path, counters)
+    return counters
+
+
+def init_process(json_backend=None):
+    """ Initialize ``read_files`` worker process. """
+    django.setup()
+    jsonlines.set_backend(json_backend)
+
+
+def merge_counters(counters, others):
+    """ Merge counters by key into ``counters`` and return it. """
+    for key, counter in others.items():
+        result = counters.get(key)
+        if result is None:
+            counters[key] = counter
+        elif isinstance(result, Counter):
+            result.update(counter)
+        else:
+            result.merge(counter)
+    return counters
+
+
+class SummaryPool(Pool):
+    """
+    Pool merging ``Summary`` results on completion. Merged results and
+    done tasks are released.
+    """
+    keep_results = False
+    max_done_tasks = 0
+    results = None
+    """ Merged counters by key. """
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.results = {}
+
+    def completed(self, future):
+        if future.cancelled() or future.exception() is not None:
             return
-        with open(path,'r') as file:
-            data = json.load(file)
-            for key, reader in self.readers.items():
-                result = dest.setdefault(key, [])
-                values = reader.read(data)
-                if isinstance(values, (tuple,list)):
-                    for value in values:
-                        if value not in result:
-                            result.append(value)
-                elif values not in result:
-                    result.append(values)
-            return dest
+        merge_counters(self.results, future.result())
 
 
 class Command(BaseCommand):
     help = __doc__
-    
+
     def add_arguments(self, parser):
         parser.formatter_class = argparse.RawTextHelpFormatter
 
@@ -66,22 +209,71 @@ class Command(BaseCommand):
             help='Path to target elements to summarize.')
         parser.add_argument('files', metavar='FILE', type=str, nargs='+',
             help='Read values from those files')
+        group.add_argument('-f', '--format', choices=jsonlines.FORMATS,
+            default='json',
+            help="Files format: 'json' (default), 'jsonl' (JSON Lines), or\n"
+                 "'concat' (concatenated JSON values)")
+        group.add_argument('--json-backend', choices=('orjson', 'json'),
+            help="JSON parser (default: orjson if installed), not used\n"
+                 "by 'concat' format which always uses json")
 
         group = parser.add_argument_group('pool')
         group.add_argument('-w', '--workers', type=int,
             default=multiprocessing.cpu_count(),
             help="Number of concurrent workers (default: cpu count)")
+        group.add_argument('-c', '--chunk-size', type=int,
+            default=Summary.chunk_size,
+            help="Number of files read by task (default: {})"
+                 .format(Summary.chunk_size))
+        group.add_argument('-p', '--processes', action='store_true',
+            help="Parse files in as many worker processes as workers.\n"
+                 "JSON parsing is CPU-bound: with threads only (default),\n"
+                 "it does not run in parallel.")
+        group.add_argument('--no-progress', action='store_false',
+            dest='progress', help="Do not display progress")
 
-    def handle(self, files, keys, workers, **kwargs):
-        readers = {k: DataReader(k, k) for k in keys}
-        results = {}
-        
-        count = math.floor(len(files) / workers) + 1
-        pool = Pool(max_workers=workers)
-        workers = (Summary(i, files=files[i*count:(i+1)*count], readers=readers,
-                            dest=results, many=True) for i in range(0, workers))
-        pool.submit(workers)
-        pool.run()
-        for k, v in results.items():
-            print(k, ': ', v)
+        group = parser.add_argument_group('approximate summary')
+        group.add_argument('-a', '--approx', action='store_true',
+            help="Summarize values using sketches with bounded memory:\n"
+                 "distinct count, top values, sample and numeric stats.")
+        group.add_argument('--top', type=int, default=20,
+            help="Number of top values (default: 20)")
+        group.add_argument('--sample', type=int, default=10,
+            help="Sample size (default: 10)")
+        group.add_argument('--precision', type=int, default=14,
+            help="Distinct count precision, between 4 and 18 (default: 14)")
 
+    def handle(self, files, keys, workers, chunk_size, approx=False, top=20,
+               sample=10, precision=14, format='json', json_backend=None,
+               progress=True, processes=False, **kwargs):
+        jsonlines.set_backend(json_backend)
+        readers = {k: Reader(k, many=True) for k in keys}
+        pool = SummaryPool(max_workers=workers)
+        approx = {'k': top * 5, 'sample': sample, 'p': precision} \
+                    if approx else None
+        if processes:
+            processes = ProcessPoolExecutor(
+                workers, initializer=init_process,
+                initargs=(jsonlines.get_backend(),))
+        root = Summary(None, readers=readers, chunk_size=chunk_size,
+                       approx=approx, format=format,
+                       processes=processes or None)
+        pool.submit(
+            root.clone(i, files[i:i+chunk_size])
+            for i in range(0, len(files), chunk_size)
+        )
+        display = progress and ProgressDisplay(pool.progress)
+        if display:
+            pool.instruments.append(display)
+        try:
+            pool.run()
+        finally:
+            if display:
+                display.close()
+            if processes:
+                processes.shutdown(cancel_futures=True)
+        for k, counter in pool.results.items():
+            if isinstance(counter, Counter):
+                print(k, ': ', dict(counter.most_common()))
+            else:
+                print(k, ': ', json.dumps(counter.summary(top), default=str))
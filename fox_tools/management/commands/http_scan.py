@@ -19,6 +19,7 @@ from fox_tools.combinations import Variable, Combinations
 from fox_tools.tasks import Pool
 from fox_tools.tasks.http_request import DownloadRequest
 from fox_tools.tasks.iter import IterTaskSet
+from fox_tools.tasks.progress import ProgressDisplay
 
 
 __all__ = ('Command',) 
@@ -61,11 +62,13 @@ class Command(BaseCommand):
         group.add_argument('-w', '--workers', type=int,
             default=multiprocessing.cpu_count(),
             help="Number of concurrent workers (default: cpu count)")
+        group.add_argument('--no-progress', action='store_false',
+            dest='progress', help="Do not display progress")
         # group.add_argument('-v', '--var', type=str, nargs='?')
 
     def handle(self, urls=None, variables=None, list_types=False,
                workers=4, timeout=None,
-               headers=None, **options):
+               headers=None, progress=True, verbosity=1, **options):
         if list_types:
             self.print_vars_types()
 
@@ -80,11 +83,22 @@ class Command(BaseCommand):
 
         iter = self.iter(urls, variables, **options)
         key = datetime.now().strftime('scan_%Y-%m-%d_%H-%M-%S')
-        task = IterTaskSet(key, iter)
-        self.pool = Pool(max_workers=workers, task_timeout=timeout)
-        self.pool.completed = lambda fut: self.completed(fut)
-        self.pool.submit(task)
-        self.pool.run(keep_alive=True)
+        self.task = IterTaskSet(key, iter, prefetch=workers * 4,
+                                background=True)
+        self.pool = Pool(max_workers=workers, task_timeout=timeout,
+                         keep_results=False)
+        self.pool.progress.total = Combinations(urls, variables).count()
+        if verbosity > 1:
+            self.pool.completed = lambda fut: self.completed(fut)
+        display = progress and ProgressDisplay(self.pool.progress)
+        if display:
+            self.pool.instruments.append(display)
+        self.pool.submit(self.task)
+        try:
+            self.pool.run()
+        finally:
+            if display:
+                display.close()
 
     def print_vars_types(self):
         for func in Variable.get_types():
@@ -96,6 +110,8 @@ class Command(BaseCommand):
                 print('  ', line.strip())
 
     def completed(self, future):
+        if future is self.task.stream:
+            return
         try:
             resp = future.result()['response']
             print('-', future.task_key, resp.status_code)
@@ -109,6 +125,7 @@ class Command(BaseCommand):
         for url in urls.iter():
             stream = self.get_stream_path(url, directory, overwrite, skip)
             if not stream:
+                self.skipped(url)
                 continue
             if session_counts >= max_session_counts:
                 session.close()
@@ -118,6 +135,12 @@ class Command(BaseCommand):
             yield req
         session.close()
 
+    def skipped(self, url):
+        """ Remove skipped url from progress' total. """
+        progress = self.pool.progress
+        if progress.total is not None:
+            progress.total -= 1
+
     def get_stream_path(self, url, directory, overwrite=False, skip=False):
         basepath = url[url.find('://')+3:].replace('/','_')
         basepath  = os.path.join(directory, basepath)
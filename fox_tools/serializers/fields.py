@@ -1,10 +1,15 @@
 import math
+import re
 
-from django.utils.functional import cached_property
 from rest_framework import serializers
 
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
 __all__ = ('Unsafe', 'is_unsafe',
-           'MapField', 'IntegerField', 'IntReprField', 'FloatField',
+           'MapTable', 'MapField', 'IntegerField', 'IntReprField', 'FloatField',
            'TimerField')
 
 
@@ -25,8 +30,67 @@ def is_unsafe(value):
     return isinstance(value, Unsafe)
 
 
+_missing = object()
+
+
+class MapTable:
+    """
+    Immutable lookup tables of a ``MapField``: forward (value to
+    representation) and reverse. A table is shared by copies of the field
+    (deep copies of declared serializer fields included), so it is built
+    only once.
+
+    Keys can be normalized using ``normalize`` (applied to string keys and
+    looked up values).
+    """
+    map = None
+    """ Values mapping as {value: representation} """
+    forward = None
+    """ Forward lookup table (normalized keys). """
+    reverse = None
+    """ Reverse lookup table (normalized keys). """
+    normalize = None
+    """ Key normalization function (e.g. ``str.casefold``) or None. """
+
+    def __init__(self, map, normalize=None):
+        self.map = map
+        self.normalize = normalize
+        if normalize is None:
+            self.forward = dict(map)
+            self.reverse = {v: k for k, v in map.items()}
+        else:
+            norm = self.norm
+            self.forward = {norm(k): v for k, v in map.items()}
+            self.reverse = {norm(v): k for k, v in map.items()}
+
+    def norm(self, key):
+        """ Return normalized key. """
+        if self.normalize is not None and isinstance(key, str):
+            return self.normalize(key)
+        return key
+
+    def get(self, value, default=None):
+        """ Return representation of provided value. """
+        return self.forward.get(self.norm(value), default)
+
+    def get_reverse(self, data, default=None):
+        """ Return value of provided representation. """
+        return self.reverse.get(self.norm(data), default)
+
+    def __deepcopy__(self, memo):
+        return self
+
+    def __copy__(self):
+        return self
+
+
 class MapField(serializers.Field):
-    """ Field mapping value to representation and vice-verse. """
+    """
+    Field mapping value to representation and vice-verse.
+
+    Map is provided at init or declared on class (``map``). Lookup tables
+    are shared by field's copies (see ``MapTable``).
+    """
     map = {}
     """ Values mapping as {value: representation} """
     keep_unsafe = False
@@ -34,26 +98,61 @@ class MapField(serializers.Field):
     Wrap values into ``Unsafe`` when not matched to map instead of
     returning default.
     """
+    table = None
+    """ Lookup tables (``MapTable``). """
 
-    def __init__(self, *args, map=None, keep_unsafe=False, **kwargs):
-        self.map = map
+    def __init__(self, *args, map=None, keep_unsafe=False, normalize=None,
+                 case_insensitive=False, **kwargs):
+        """
+        :param dict|MapTable map: values mapping (defaults to class' one).
+        :param callable normalize: key normalization function.
+        :param bool case_insensitive: shortcut for \
+            ``normalize=str.casefold``.
+        """
+        if case_insensitive and normalize is None:
+            normalize = str.casefold
+        if isinstance(map, MapTable):
+            table = map
+        elif map is None and normalize is None:
+            table = self.get_class_table()
+        else:
+            table = MapTable(type(self).map if map is None else map,
+                             normalize)
+
+        self.table = table
+        self.map = table.map
         self.keep_unsafe = keep_unsafe
+        # field's deep copies are created using init arguments
+        self._kwargs['map'] = table
+        self._kwargs.pop('normalize', None)
+        self._kwargs.pop('case_insensitive', None)
         kwargs.setdefault('default', None)
         super().__init__(*args, **kwargs)
 
-    @cached_property
+    @classmethod
+    def get_class_table(cls):
+        """ Return lookup tables for class' map. """
+        table = cls.__dict__.get('_table')
+        if table is None or table.map is not cls.map:
+            table = MapTable(cls.map)
+            setattr(cls, '_table', table)
+        return table
+
+    @property
     def reversed_map(self):
-        return {v:k for k,v in self.map.items()}
+        return self.table.reverse
 
     def to_representation(self, value):
-        if value in self.map:
-            return self.map[value]
-        return self.map.get(self.default)
+        value = self.table.get(value, _missing)
+        if value is _missing:
+            return self.table.get(self.default)
+        return value
 
     def to_internal_value(self, data):
-        if data in self.reversed_map:
-            return self.reversed_map[data]
-        return Unsafe(data) if self.keep_unsafe else self.default
+        value = self.table.get_reverse(data, _missing)
+        if value is _missing:
+            return Unsafe(data) if self.keep_unsafe else self.default
+        return value
 
 
 # class NestedField(Visitor, serializers.Field):
@@ -85,9 +184,11 @@ class IntegerField(serializers.IntegerField):
 
 
 class IntReprField(serializers.IntegerField):
+    non_digits = re.compile(r'\D+')
+
     def to_internal_value(self, value):
         if isinstance(value, str):
-            value = ''.join(c for c in value if c.isdigit())
+            value = self.non_digits.sub('', value)
         return super().to_internal_value(value)
 
 
@@ -102,7 +203,13 @@ class FloatField(serializers.FloatField):
 
 
 class TimerField(serializers.Field):
-    """ String with format like `MM"SS'MS` into milliseconds """
+    """
+    String with format like `MM'SS"MS` into milliseconds. Integers are
+    considered as already parsed.
+    """
+    column_pattern = re.compile(r'(?:[0-9]+\'[0-9]+"[0-9]+\n)*')
+    """ Joined values accepted by ``to_internal_values`` fast path. """
+
     def to_representation(self, value):
         m = math.floor(value / 60000)
         s = math.floor(value / 1000)
@@ -110,11 +217,44 @@ class TimerField(serializers.Field):
         return str(m) + "'" + str(s) + '"' + str(ms)
     
     def to_internal_value(self, data):
-        if not isinstance(data, str) or "'" not in data:
+        if not isinstance(data, str):
+            if isinstance(data, int) and not isinstance(data, bool):
+                return data
+            return
+        if "'" not in data:
             return
         m, s = data.split("'")
         s, ms = s.split('"')
         return int(m)*60*1000 + int(s)*1000 + int(ms)
 
+    def to_internal_values(self, values):
+        """
+        Batch ``to_internal_value``, returning a numpy masked array (invalid
+        values being masked).
+
+        When all values are well-formed strings, they are joined, checked
+        by a single regex pass and parsed by numpy at once. Otherwise,
+        values are parsed one by one.
+        """
+        if np is None:
+            raise ImportError('numpy is required by `to_internal_values`')
+        if all(isinstance(v, str) for v in values):
+            buffer = '\n'.join(values) + '\n'
+            if self.column_pattern.fullmatch(buffer):
+                buffer = buffer.replace("'", ' ').replace('"', ' ')
+                parts = np.fromstring(buffer, dtype='int64', sep=' ')
+                return np.ma.masked_array(
+                    parts.reshape(-1, 3) @ np.array([60*1000, 1000, 1]))
+
+        parsed = []
+        for value in values:
+            try:
+                parsed.append(self.to_internal_value(value))
+            except ValueError:
+                parsed.append(None)
+        mask = [value is None for value in parsed]
+        return np.ma.masked_array(
+            [0 if value is None else value for value in parsed],
+            mask=mask, dtype='int64')
 
 
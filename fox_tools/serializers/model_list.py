@@ -1,3 +1,6 @@
+from itertools import islice
+
+from django.core.exceptions import FieldDoesNotExist
 from rest_framework import serializers
 
 
@@ -5,38 +8,125 @@ __all__ = ('ModelListSerializer',)
 
 
 class ModelListSerializer(serializers.ListSerializer):
-    """ Bulk create/update objects from provided instance """
+    """
+    Bulk create/update objects from provided instance.
+
+    Attributes can be overridden on child serializer's Meta.
+    """
     pk_attr = None
     """ Primary key attribute on validated data. """
     pk_field = 'pk'
     """ Primary key field on instance. """
     delete = True
     """ Delete missing objects on update. """
-    
+    batch_size = 1000
+    """ Number of objects created or updated by query. """
+    returns = 'instances'
+    """
+    Value returned by ``create``: ``'instances'`` (list of created
+    objects), ``'pks'`` (list of their primary keys) or ``'count'``.
+    Objects are only kept in memory by batch when not returning
+    instances (`serializer.data` is then not available).
+    """
+
+    def get_meta(self, attr):
+        """ Return attribute from child's Meta, defaults to self's. """
+        return getattr(self.child.Meta, attr, getattr(self, attr))
+
     def create(self, validated_data):
         model = self.child.Meta.model
-        items = [model(**item) for item in validated_data]
-        return model.objects.bulk_create(items)
+        batch_size, returns = self.get_meta('batch_size'), \
+                              self.get_meta('returns')
+        if returns not in ('instances', 'pks', 'count'):
+            raise ValueError('invalid `returns` value: {}'.format(returns))
+
+        ret = 0 if returns == 'count' else []
+        items = iter(validated_data)
+        while True:
+            batch = [model(**item) for item in islice(items, batch_size)]
+            if not batch:
+                break
+            model.objects.bulk_create(batch)
+            if returns == 'instances':
+                ret.extend(batch)
+            elif returns == 'pks':
+                ret.extend(obj.pk for obj in batch)
+            else:
+                ret += len(batch)
+        return ret
 
     def update(self, instance, validated_data):
-        pk_field = getattr(self.child.Meta, 'pk_field', self.pk_field)
-        pk_attr = getattr(self.child.Meta, 'pk_attr', self.pk_attr or pk_field)
+        """
+        Update instances (queryset or iterable) from validated data, using
+        bulk operations: new objects are created, existing ones updated
+        on changed fields only, and missing ones deleted (if ``delete``).
 
-        db_map = {getattr(o, pk_field) for o in instance}
-        data_map = {d[pk_attr] for d in validated_data if pk_attr in d}
+        Objects are matched using ``pk_field`` (on instance) and
+        ``pk_attr`` (on data). Values are compared on fields' attributes
+        (e.g. ``author_id`` for ``author``), so that related objects are
+        not fetched. Many-to-many fields are not supported.
+        """
+        model = self.child.Meta.model
+        batch_size = self.get_meta('batch_size')
+        pk_field = self.get_meta('pk_field')
+        pk_attr = self.get_meta('pk_attr') or pk_field
 
-        ret = []
-        for id, data in data_map.items():
-            obj = db_map.get(id)
+        db_map = {getattr(o, pk_field): o for o in instance}
+        to_create, to_update, fields = [], [], set()
+        ret, ids, getters = [], set(), {}
+        for data in validated_data:
+            id = data.get(pk_attr)
+            obj = None if id is None else db_map.get(id)
             if obj is None:
-                ret.append(self.child.create(data))
+                obj = model(**data)
+                to_create.append(obj)
             else:
-                ret.append(self.child.update(data))
+                changed = []
+                for key, value in data.items():
+                    getter = getters.get(key)
+                    if getter is None:
+                        getter = getters[key] = self.get_value_getter(
+                            model, key)
+                    attname, get_value = getter
+                    if getattr(obj, attname) != get_value(value):
+                        changed.append(key)
+                if changed:
+                    for key in changed:
+                        setattr(obj, key, data[key])
+                    fields.update(changed)
+                    to_update.append(obj)
+                ids.add(id)
+            ret.append(obj)
 
-        if self.delete:
-            for id, obj in db_map.items():
-                if id not in data_map:
-                    obj.delete()
+        if to_create:
+            model.objects.bulk_create(to_create, batch_size)
+        if to_update:
+            model.objects.bulk_update(to_update, fields, batch_size)
+        if self.get_meta('delete'):
+            pks = [obj.pk for id, obj in db_map.items() if id not in ids]
+            if pks:
+                model.objects.filter(pk__in=pks).delete()
         return ret
 
+    def get_value_getter(self, model, key):
+        """
+        Return `(attname, get_value)` used to compare data's ``key`` value
+        to instance's one: instance's attribute name and function
+        returning the data value as stored in this attribute (related
+        object's key for foreign keys).
+        """
+        try:
+            field = model._meta.get_field(key)
+        except FieldDoesNotExist:
+            return key, _identity
+        if not field.concrete:
+            return key, _identity
+        if field.many_to_one or field.one_to_one:
+            target = field.target_field.attname
+            return field.attname, lambda value: \
+                getattr(value, target, value) if value is not None else None
+        return field.attname, _identity
+
 
+def _identity(value):
+    return value
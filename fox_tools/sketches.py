@@ -0,0 +1,319 @@
+"""
+Bounded memory and mergeable summaries of values streams (sketches):
+approximate distinct count, heavy hitters, samples and numeric stats.
+
+Sketches of the same parameters can be merged (e.g. computed by
+multiple workers or processes, as they can be pickled).
+"""
+from collections import Counter
+from hashlib import blake2b
+import heapq
+from itertools import count as counter
+import math
+import random
+
+
+__all__ = ('HyperLogLog', 'SpaceSaving', 'Reservoir', 'NumericStats',
+           'ValueSketch')
+
+
+def hash64(value):
+    """ Return a stable (not salted by process) 64 bits hash of value. """
+    data = value if isinstance(value, bytes) else repr(value).encode()
+    return int.from_bytes(blake2b(data, digest_size=8).digest(), 'big')
+
+
+class HyperLogLog:
+    """ Approximate distinct count (standard error ~ `1.04/sqrt(2**p)`). """
+    p = 14
+    """ Precision: number of registers is ``2**p``. """
+    registers = None
+    """ Registers as bytearray. """
+
+    def __init__(self, p=None):
+        if p is not None:
+            if not 4 <= p <= 18:
+                raise ValueError('precision must be between 4 and 18')
+            self.p = p
+        self.registers = bytearray(1 << self.p)
+
+    def add(self, value):
+        h = hash64(value)
+        p = self.p
+        index = h >> (64 - p)
+        rest = h & ((1 << (64 - p)) - 1)
+        rank = (64 - p) - rest.bit_length() + 1
+        if rank > self.registers[index]:
+            self.registers[index] = rank
+
+    def update(self, values):
+        for value in values:
+            self.add(value)
+
+    def merge(self, other):
+        """ Merge other sketch into self. """
+        if other.p != self.p:
+            raise ValueError('can not merge sketches of different precision')
+        self.registers = bytearray(map(max, self.registers, other.registers))
+
+    def count(self):
+        """ Return estimated distinct count. """
+        m = len(self.registers)
+        alpha = 0.7213 / (1 + 1.079 / m)
+        estimate = alpha * m * m / sum(2.0 ** -r for r in self.registers)
+        zeros = self.registers.count(0)
+        if estimate <= 2.5 * m and zeros:
+            return round(m * math.log(m / zeros))
+        return round(estimate)
+
+    def __len__(self):
+        return self.count()
+
+
+class SpaceSaving:
+    """
+    Heavy hitters (top-k) using Space-Saving algorithm: at most ``k``
+    values are counted; when full, a new value replaces the least counted
+    one, inheriting its count (as overestimation error).
+    """
+    k = 100
+    """ Number of counted values. """
+    counts = None
+    """ Counts by value. """
+    errors = None
+    """ Maximum overestimation of counts, by value. """
+
+    def __init__(self, k=None):
+        if k is not None:
+            self.k = k
+        self.counts = {}
+        self.errors = {}
+        self._heap = []
+        self._seq = counter()
+
+    def add(self, value, count=1):
+        counts = self.counts
+        if value in counts:
+            counts[value] += count
+        elif len(counts) < self.k:
+            counts[value] = count
+            self.errors[value] = 0
+        else:
+            min_value, min_count = self._pop_min()
+            del counts[min_value]
+            del self.errors[min_value]
+            counts[value] = min_count + count
+            self.errors[value] = min_count
+        self._push(value)
+
+    def update(self, values):
+        for value in values:
+            self.add(value)
+
+    def _push(self, value):
+        heapq.heappush(self._heap,
+                       (self.counts[value], next(self._seq), value))
+        if len(self._heap) > 4 * self.k:
+            self._heapify()
+
+    def _heapify(self):
+        """ Rebuild heap, dropping outdated entries. """
+        seq = self._seq
+        self._heap = [(c, next(seq), v) for v, c in self.counts.items()]
+        heapq.heapify(self._heap)
+
+    def _pop_min(self):
+        """ Pop least counted value, skipping outdated heap entries. """
+        heap, counts = self._heap, self.counts
+        while heap:
+            count, _, value = heap[0]
+            if counts.get(value) == count:
+                return value, count
+            heapq.heappop(heap)
+        value = min(counts, key=counts.get)
+        return value, counts[value]
+
+    def merge(self, other):
+        """ Merge other sketch into self. """
+        counts = Counter(self.counts)
+        counts.update(other.counts)
+        errors = Counter(self.errors)
+        errors.update(other.errors)
+        top = counts.most_common(self.k)
+        self.counts = dict(top)
+        self.errors = {v: errors[v] for v, _ in top}
+        self._heapify()
+
+    def top(self, n=None):
+        """ Return list of `(value, count)` by count. """
+        return Counter(self.counts).most_common(n)
+
+
+class Reservoir:
+    """ Uniform random sample of values (Algorithm R). """
+    size = 10
+    """ Sample size. """
+    items = None
+    """ Sampled values. """
+    count = 0
+    """ Number of values seen. """
+
+    def __init__(self, size=None, seed=None):
+        if size is not None:
+            self.size = size
+        self.items = []
+        self.random = random.Random(seed)
+
+    def add(self, value):
+        self.count += 1
+        if len(self.items) < self.size:
+            self.items.append(value)
+        else:
+            index = self.random.randrange(self.count)
+            if index < self.size:
+                self.items[index] = value
+
+    def update(self, values):
+        for value in values:
+            self.add(value)
+
+    def merge(self, other):
+        """ Merge other sample into self, weighting by counts. """
+        a, b = list(self.items), list(other.items)
+        na, nb = self.count, other.count
+        items = []
+        while len(items) < self.size and (a or b):
+            if a and (not b or self.random.random() * (na + nb) < na):
+                items.append(a.pop(self.random.randrange(len(a))))
+            else:
+                items.append(b.pop(self.random.randrange(len(b))))
+        self.items = items
+        self.count = na + nb
+
+
+class NumericStats:
+    """
+    Count, min, max, mean and variance (Welford), and histogram by power
+    of two buckets. Non finite values, and integers out of float range,
+    are ignored (counted by ``ignored``).
+    """
+    count = 0
+    ignored = 0
+    """ Number of ignored values. """
+    min = None
+    max = None
+    mean = 0.0
+    m2 = 0.0
+    """ Sum of squares of differences from the mean. """
+    histogram = None
+    """ Counts by bucket, bucket `(sign, exp)` holding values with
+    ``abs(value)`` in `[2**(exp-1), 2**exp)`. """
+
+    def __init__(self):
+        self.histogram = Counter()
+
+    @property
+    def variance(self):
+        return self.m2 / self.count if self.count else None
+
+    def add(self, value):
+        try:
+            finite = math.isfinite(value)
+        except OverflowError:
+            finite = False
+        if not finite:
+            self.ignored += 1
+            return
+        self.count += 1
+        if self.min is None or value < self.min:
+            self.min = value
+        if self.max is None or value > self.max:
+            self.max = value
+        delta = value - self.mean
+        self.mean += delta / self.count
+        self.m2 += delta * (value - self.mean)
+        self.histogram[self.bucket(value)] += 1
+
+    def update(self, values):
+        for value in values:
+            self.add(value)
+
+    @staticmethod
+    def bucket(value):
+        """ Return histogram bucket of value. """
+        if value == 0:
+            return (0, 0)
+        return (1 if value > 0 else -1, math.frexp(value)[1])
+
+    def merge(self, other):
+        """ Merge other stats into self. """
+        self.ignored += other.ignored
+        if not other.count:
+            return
+        count = self.count + other.count
+        delta = other.mean - self.mean
+        self.m2 += other.m2 + delta * delta * self.count * other.count / count
+        self.mean += delta * other.count / count
+        self.count = count
+        self.min = other.min if self.min is None else min(self.min, other.min)
+        self.max = other.max if self.max is None else max(self.max, other.max)
+        self.histogram.update(other.histogram)
+
+    def summary(self):
+        return {'count': self.count, 'ignored': self.ignored,
+                'min': self.min, 'max': self.max,
+                'mean': self.mean, 'variance': self.variance,
+                'histogram': {
+                    '0' if not s else '{}2^{}'.format('-' if s < 0 else '', e): c
+                    for (s, e), c in sorted(self.histogram.items())
+                }}
+
+
+class ValueSketch:
+    """
+    Summary of values: distinct count, top values, sample, and stats of
+    numeric ones. Values must be hashable.
+    """
+    def __init__(self, p=None, k=None, sample=None, seed=None):
+        """
+        :param int p: ``HyperLogLog`` precision
+        :param int k: ``SpaceSaving`` counted values
+        :param int sample: ``Reservoir`` size
+        """
+        self.count = 0
+        self.distinct = HyperLogLog(p)
+        self.top = SpaceSaving(k)
+        self.sample = Reservoir(sample, seed)
+        self.numeric = NumericStats()
+
+    def add(self, value):
+        self.count += 1
+        self.distinct.add(value)
+        self.top.add(value)
+        self.sample.add(value)
+        if isinstance(value, (int, float)) and not isinstance(value, bool):
+            self.numeric.add(value)
+
+    def update(self, values):
+        for value in values:
+            self.add(value)
+
+    def merge(self, other):
+        """ Merge other sketch into self. """
+        self.count += other.count
+        self.distinct.merge(other.distinct)
+        self.top.merge(other.top)
+        self.sample.merge(other.sample)
+        self.numeric.merge(other.numeric)
+
+    def summary(self, top=None):
+        """ Return summary as dict. """
+        summary = {
+            'count': self.count,
+            'distinct': self.distinct.count(),
+            'top': self.top.top(top),
+            'sample': self.sample.items,
+        }
+        if self.numeric.count:
+            summary['numeric'] = self.numeric.summary()
+        return summary
@@ -1,10 +1,69 @@
 import concurrent.futures as futures
-import time
+import threading
 
 from ..tool import Tool
 
 
-__all__ = ('BaseTask', 'Task', 'TaskSet', 'task', 'wait')
+__all__ = ('TaskCancelled', 'CancelToken', 'BaseTask', 'Task', 'TaskSet',
+           'task', 'wait', 'when_done')
+
+
+class TaskCancelled(futures.CancelledError):
+    """ Raised when a task is cancelled through its ``CancelToken``. """
+    pass
+
+
+class CancelToken:
+    """
+    Cooperative cancellation: a token is passed to tasks' run by the pool
+    (as ``cancel`` keyword argument). Long running tasks should check it
+    regularly, e.g. using ``raise_if_cancelled()``.
+    """
+    def __init__(self):
+        self._event = threading.Event()
+
+    @property
+    def cancelled(self):
+        return self._event.is_set()
+
+    def cancel(self):
+        self._event.set()
+
+    def raise_if_cancelled(self):
+        """ Raise ``TaskCancelled`` if token has been cancelled. """
+        if self._event.is_set():
+            raise TaskCancelled()
+
+    def wait(self, timeout=None):
+        """
+        Wait for cancellation up to ``timeout`` seconds (to be used instead
+        of ``time.sleep``). Return True if cancelled.
+        """
+        return self._event.wait(timeout)
+
+
+def when_done(futs, callback):
+    """
+    Call ``callback(futs)`` once all provided futures are done (from the
+    thread completing the last one).
+    """
+    futs = list(futs)
+    if not futs:
+        callback(futs)
+        return
+
+    pending = [len(futs)]
+    lock = threading.Lock()
+
+    def done(_):
+        with lock:
+            pending[0] -= 1
+            if pending[0]:
+                return
+        callback(futs)
+
+    for future in futs:
+        future.add_done_callback(done)
 
 
 class BaseTask:
@@ -16,17 +75,30 @@ class BaseTask:
     """ Task key """
     priority = 0
     """ Task priority, by lower first ran """
-    futures = []
-    """ Futures generated through submit calls """
+    futures = {}
+    """ Futures generated through submit calls, as ordered `{future: None}`. """
+    pending_futures = frozenset()
+    """ Futures of ``futures`` not done yet (updated on completion). """
+    done_count = 0
+    """ Number of forgotten futures that completed successfully. """
+    failed_count = 0
+    """ Number of forgotten futures that failed or were cancelled. """
     parent = None
     """ Parent task or task set. """
     scheduled = False
     """ True if task has been scheduled at least once. """
+    depends = None
+    """
+    Keys of tasks of the same ``TaskSet`` to be completed before running
+    this one (key or tuple of keys).
+    """
 
     @property
     def done(self):
-        """ Return True if task is done. """
-        return next((False for f in self.futures if not f.done()), True)
+        """
+        Return True if task is done (all its remaining futures are done).
+        """
+        return not self.pending_futures
 
     def __init__(self, key, **kwargs):
         """
@@ -36,9 +108,40 @@ class BaseTask:
         :param **kwargs: init attributes values (must be declared on class)
         """
         self.key = key
-        self.futures = []
+        self.futures = {}
+        self.pending_futures = set()
         self.__dict__.update({k:v for k,v in kwargs.items()
                                 if hasattr(self, k)})
+        if isinstance(self.depends, (str, int)):
+            self.depends = (self.depends,)
+
+    def add_future(self, future):
+        """
+        Add future to ``self.futures``, and self to future's ``owners``
+        (tasks the future has been added to).
+        """
+        self.futures[future] = None
+        self.pending_futures.add(future)
+        future.add_done_callback(self.pending_futures.discard)
+        owners = getattr(future, 'owners', None)
+        if owners is None:
+            future.owners = owners = []
+        owners.append(self)
+
+    def forget(self, future):
+        """
+        Remove done future from ``self.futures`` (releasing its result),
+        counting it in ``done_count`` or ``failed_count``.
+        """
+        try:
+            del self.futures[future]
+        except KeyError:
+            return
+        self.pending_futures.discard(future)
+        if future.cancelled() or future.exception() is not None:
+            self.failed_count += 1
+        else:
+            self.done_count += 1
 
     def get_future(self, key, many=False):
         """ Return future by task key or None. If ``many``, return iterator. """
@@ -48,8 +151,11 @@ class BaseTask:
     def results(self):
         """
         Yield results from futures that finished, as tuples of
-        ```(task_key, future, exception or result)```.
+        ```(task_key, future, exception or result)```. Forgotten futures
+        are only counted (see ``forget()``).
         """
+        if len(self.pending_futures) == len(self.futures):
+            return
         for i, future in enumerate(self.futures):
             if future.done():
                 try:
@@ -77,7 +183,7 @@ class BaseTask:
         kwargs['key'] = key
         future = executor.submit(self.run, **kwargs)
         setattr(future, 'task_key', key)
-        self.futures.append(future)
+        self.add_future(future)
         self.scheduled = True
         return future
 
@@ -127,12 +233,16 @@ class Task(BaseTask):
 
 class TaskSet(BaseTask):
     """
-    Run a set of sub-tasks by priority in the same pool task.
+    Run a set of sub-tasks by dependencies then priority.
 
     Two ways to provide tasks: decorated methods using `@task` or
     similar, and at instance's init.
+
+    Sub-tasks can declare dependencies on other tasks of the set by key
+    (see ``BaseTask.depends``). When submitted, independent tasks run
+    concurrently, and dependent ones are submitted as soon as their
+    dependencies are completed.
     """
-    # TODO: sort tasks before get_tasks
     tasks = None
     """ Provided tasks. """
 
@@ -183,22 +293,137 @@ class TaskSet(BaseTask):
                   for task, kw in self.get_tasks(**kwargs)}
 
     def submit(self, executor, **kwargs):
-        tasks = self.get_tasks(**kwargs)
-        futures = [task.submit(executor, **kw)
-                    for task, kw in tasks]
-        self.futures.extend(futures)
+        return self.submit_tasks(executor, self.get_tasks(**kwargs))
+
+    def submit_tasks(self, executor, tasks):
+        """
+        Submit provided tasks, as iterable of `(task, submit kwargs)`, and
+        return futures.
+        """
+        by_key = {}
+        for task, kw in tasks:
+            if task.depends:
+                depends = [f for key in task.depends
+                           for f in self.get_dependency_futures(key, by_key)]
+                futs = [self.submit_after(depends, executor, task, kw)]
+            else:
+                futs = task.submit(executor, **kw)
+                if isinstance(futs, futures.Future):
+                    futs = [futs]
+            by_key[task.key] = futs
+
+        futs = [f for futs in by_key.values() for f in futs]
+        for future in futs:
+            self.add_future(future)
         self.scheduled = True
-        return futures
+        return futs
+
+    def get_dependency_futures(self, key, submitted):
+        """
+        Return futures of dependency task by key, looking first at tasks
+        submitted by current call.
+        """
+        futs = submitted.get(key)
+        if futs is None:
+            task = self.get_task(key)
+            if task is None or not task.scheduled:
+                raise ValueError('dependency task {} not found or not '
+                                 'scheduled'.format(key))
+            futs = task.futures
+        return futs
+
+    def submit_after(self, depends, executor, task, kwargs):
+        """
+        Return a future of provided task's result, task being submitted
+        once ``depends`` futures are done. Task is not run if one of them
+        failed or has been cancelled: the future gets the same exception.
+        """
+        future = futures.Future()
+        setattr(future, 'task_key', kwargs.get('key', task.key))
+        task.add_future(future)
+        task.scheduled = True
+
+        def resolve(futs, single):
+            error = next((e for e in (self._exception(f) for f in futs)
+                          if e is not None), None)
+            if error is not None:
+                future.set_exception(error)
+            elif single:
+                future.set_result(futs[0].result())
+            else:
+                future.set_result([f.result() for f in futs])
+
+        def submit(depends):
+            error = next((e for e in (self._exception(f) for f in depends)
+                          if e is not None), None)
+            if error is not None:
+                future.set_exception(error)
+                return
+            try:
+                futs = task.submit(executor, **kwargs)
+            except Exception as err:
+                future.set_exception(err)
+                return
+            single = isinstance(futs, futures.Future)
+            if single:
+                # task's future is the one returned by submit_after
+                del task.futures[futs]
+                task.pending_futures.discard(futs)
+                if task in getattr(futs, 'owners', ()):
+                    futs.owners.remove(task)
+                futs = [futs]
+            when_done(futs, lambda futs: resolve(futs, single))
+
+        when_done(depends, submit)
+        return future
+
+    @staticmethod
+    def _exception(future):
+        """ Return future's exception (including cancellation) or None """
+        if future.cancelled():
+            return futures.CancelledError()
+        return future.exception()
 
     def get_tasks(self, **kwargs):
-        """ Get tasks. """
+        """ Get tasks, sorted by dependencies. """
         key = kwargs.pop('key', self.key)
-        for task in self.tasks:
+        for task in self.get_sorted_tasks():
             task_key = self.get_task_key(key=task.key, **kwargs)
             kw = {'key': task_key, 'parent': self}
             kw.update(kwargs)
             yield (task, kw)
 
+    def get_sorted_tasks(self):
+        """
+        Return tasks sorted by dependencies (topological order), then by
+        priority.
+
+        :raises ValueError: on unknown dependency or dependency cycle.
+        """
+        tasks = {task.key: task for task in self.tasks}
+        result, visited, visiting = [], set(), set()
+
+        def visit(task):
+            if task.key in visited:
+                return
+            if task.key in visiting:
+                raise ValueError('dependency cycle on task {}'
+                                 .format(task.key))
+            visiting.add(task.key)
+            for key in task.depends or ():
+                dependency = tasks.get(key)
+                if dependency is None:
+                    raise ValueError('task {} depends on unknown task {}'
+                                     .format(task.key, key))
+                visit(dependency)
+            visiting.discard(task.key)
+            visited.add(task.key)
+            result.append(task)
+
+        for task in self.tasks:
+            visit(task)
+        return result
+
     def get_task_key(self, key=None, **kwargs):
         """
         Return key for provided task. Default is ``taskset_key.task_key``.
@@ -213,22 +438,25 @@ class TaskSet(BaseTask):
         gen = (t for t in self.tasks if t.key == key)
         return gen if many else next(gen, None)
 
-    def wait(self, *keys, **key_kwargs):
-        """ Wait for tasks to be completed. """
+    def wait(self, *keys, timeout=None, **key_kwargs):
+        """
+        Wait for tasks to be completed. Return immediately if the set has
+        not been submitted (tasks are run sequentially by dependencies).
+        """
+        if not self.scheduled:
+            return
         if key_kwargs:
             key_kwargs.pop('key', None)
             keys = (self.get_task_key(key, **key_kwargs)
                         for key in keys)
 
+        futs = []
         for key in keys:
             future = self.get_future(key)
             if not future:
-                print('>>>', [f.task_key for f in self.futures])
                 raise RuntimeError("task's future {} not found".format(key))
-            while True:
-                if future.done():
-                    break
-                time.sleep(0)
+            futs.append(future)
+        futures.wait(futs, timeout=timeout)
 
 
 def task(*args, task_class=Task, **kwargs):
@@ -252,7 +480,11 @@ def wait(*task_keys, **wait_kwargs):
     """
     Decorator used to wait for task's future on the same TaskSet to be completed.
     It calls ``this.get_task_key(**wrapper_kwargs)`` in order to get
-    futures' keys
+    futures' keys.
+
+    When applied over a task declaration (``@task`` or similar), waited
+    keys are added to task's ``depends``, so that it is only submitted
+    once they are completed.
 
     :param *task_keys: keys if tasks to wait.
     :param **wait_kwargs: ``wait_task``'s kwargs (excluding `parent`)
@@ -263,11 +495,16 @@ def wait(*task_keys, **wait_kwargs):
                 raise ValueError('Missing `parent` task argument. '
                                  '`wait` decorator must be used inside TaskSet.')
 
-            keys = [parent.get_task_key(key, **kwargs) for key in task_keys]
-            parent.wait(*task_keys, **wait_kwargs)
+            keys = [parent.get_task_key(key=k, **kwargs) for k in task_keys]
+            parent.wait(*keys, **wait_kwargs)
             return func(*args, key=key, parent=parent, **kwargs)
         if hasattr(func, 'task'):
-            setattr(wrapper, 'task', func.task)
+            task_class, args, kwargs = func.task
+            depends = kwargs.get('depends') or ()
+            if isinstance(depends, (str, int)):
+                depends = (depends,)
+            kwargs = dict(kwargs, depends=tuple(depends) + task_keys)
+            setattr(wrapper, 'task', (task_class, args, kwargs))
         return wrapper
     return decorator
 
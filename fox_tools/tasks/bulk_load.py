@@ -0,0 +1,187 @@
+"""
+Bulk insert or update of rows using raw SQL, bypassing the ORM:
+PostgreSQL's ``COPY`` into a temporary table then merge, or
+``executemany`` upsert on SQLite.
+"""
+import io
+import json
+import uuid
+
+from django.db import models
+
+try:
+    from psycopg2.extras import Json
+except ImportError:
+    Json = None
+
+
+__all__ = ('get_fields', 'get_rows', 'to_csv', 'CSVStream', 'merge_rows')
+
+
+def get_fields(model):
+    """ Return model's fields to be loaded (excluding auto primary key). """
+    return [f for f in model._meta.concrete_fields
+            if not isinstance(f, models.AutoField)]
+
+
+def get_rows(objs, fields, connection):
+    """ Return database values of provided objects as list of rows. """
+    return [[f.get_db_prep_save(f.pre_save(obj, True), connection)
+             for f in fields] for obj in objs]
+
+
+def to_csv(rows, stream=None):
+    """
+    Write rows in PostgreSQL's ``COPY`` CSV format, and return stream
+    (rewound). Values are quoted, ``None`` being an unquoted empty value
+    (``NULL``).
+    """
+    if stream is None:
+        stream = io.StringIO()
+    stream.writelines(_csv_lines(rows))
+    stream.seek(0)
+    return stream
+
+
+class CSVStream(io.TextIOBase):
+    """
+    Read-only file-like object streaming rows in ``COPY`` CSV format (see
+    ``to_csv``): lines are generated as they are read.
+    """
+    def __init__(self, rows):
+        self._lines = _csv_lines(rows)
+        self._buffer = ''
+
+    def readable(self):
+        return True
+
+    def read(self, size=-1):
+        if size is None or size < 0:
+            data, self._buffer = self._buffer + ''.join(self._lines), ''
+            return data
+        chunks, length = [self._buffer], len(self._buffer)
+        for line in self._lines:
+            chunks.append(line)
+            length += len(line)
+            if length >= size:
+                break
+        data = ''.join(chunks)
+        data, self._buffer = data[:size], data[size:]
+        return data
+
+    def readline(self, size=-1):
+        if self._buffer:
+            line, sep, rest = self._buffer.partition('\n')
+            if sep:
+                self._buffer = rest
+                return line + sep
+        line, self._buffer = self._buffer + next(self._lines, ''), ''
+        return line
+
+
+def _csv_lines(rows):
+    for row in rows:
+        yield ','.join(_csv_value(v) for v in row) + '\n'
+
+
+def _csv_value(value):
+    if value is None:
+        return ''
+    if isinstance(value, bool):
+        value = 't' if value else 'f'
+    elif isinstance(value, (bytes, memoryview)):
+        value = '\\x' + bytes(value).hex()
+    elif Json is not None and isinstance(value, Json):
+        # JSONField value adapted by psycopg2, using field's encoder
+        value = value.dumps(value.adapted)
+    elif isinstance(value, dict):
+        value = json.dumps(value)
+    elif isinstance(value, (list, tuple)):
+        value = _array_value(value)
+    return '"' + str(value).replace('"', '""') + '"'
+
+
+def _array_value(values):
+    """ Return PostgreSQL array literal of values (ArrayField). """
+    items = []
+    for value in values:
+        if value is None:
+            items.append('NULL')
+        elif isinstance(value, (list, tuple)):
+            items.append(_array_value(value))
+        elif isinstance(value, bool):
+            items.append('t' if value else 'f')
+        else:
+            value = str(value).replace('\\', '\\\\').replace('"', '\\"')
+            items.append('"' + value + '"')
+    return '{' + ','.join(items) + '}'
+
+
+def merge_rows(connection, model, fields, rows, unique_field,
+               update_fields=None):
+    """
+    Insert rows into model's table, updating existing ones on
+    ``unique_field`` conflict.
+
+    :param [Field] fields: fields of rows' values.
+    :param str unique_field: name of unique field for conflicts.
+    :param [str] update_fields: names of fields updated on conflict \
+        (if empty, existing rows are left unchanged).
+    """
+    if not rows:
+        return
+    if connection.vendor == 'postgresql':
+        merge_copy(connection, model, fields, rows, unique_field,
+                   update_fields)
+    else:
+        merge_executemany(connection, model, fields, rows, unique_field,
+                          update_fields)
+
+
+def merge_copy(connection, model, fields, rows, unique_field,
+               update_fields=None):
+    """
+    PostgreSQL: ``COPY`` rows into a temporary table, then merge them into
+    model's table with a single ``INSERT ... ON CONFLICT`` statement.
+    """
+    qn = connection.ops.quote_name
+    table = qn(model._meta.db_table)
+    temp = qn('_import_{}'.format(uuid.uuid4().hex))
+    columns = ', '.join(qn(f.column) for f in fields)
+    with connection.cursor() as cursor:
+        cursor.execute('CREATE TEMPORARY TABLE {} ON COMMIT DROP AS '
+                       'SELECT {} FROM {} WITH NO DATA'
+                       .format(temp, columns, table))
+        cursor.copy_expert('COPY {} ({}) FROM STDIN WITH (FORMAT csv)'
+                           .format(temp, columns), CSVStream(rows))
+        cursor.execute('INSERT INTO {} ({}) SELECT {} FROM {} {}'.format(
+            table, columns, columns, temp,
+            _on_conflict(connection, model, unique_field, update_fields)))
+        cursor.execute('DROP TABLE {}'.format(temp))
+
+
+def merge_executemany(connection, model, fields, rows, unique_field,
+                      update_fields=None):
+    """
+    Other databases (SQLite): ``INSERT ... ON CONFLICT`` using
+    ``executemany`` (rows are expected to be provided in large chunks).
+    """
+    qn = connection.ops.quote_name
+    sql = 'INSERT INTO {} ({}) VALUES ({}) {}'.format(
+        qn(model._meta.db_table),
+        ', '.join(qn(f.column) for f in fields),
+        ', '.join(['%s'] * len(fields)),
+        _on_conflict(connection, model, unique_field, update_fields))
+    with connection.cursor() as cursor:
+        cursor.executemany(sql, rows)
+
+
+def _on_conflict(connection, model, unique_field, update_fields):
+    qn = connection.ops.quote_name
+    opts = model._meta
+    conflict = qn(opts.get_field(unique_field).column)
+    if not update_fields:
+        return 'ON CONFLICT ({}) DO NOTHING'.format(conflict)
+    columns = (qn(opts.get_field(f).column) for f in update_fields)
+    return 'ON CONFLICT ({}) DO UPDATE SET {}'.format(
+        conflict, ', '.join('{0} = EXCLUDED.{0}'.format(c) for c in columns))
@@ -1,10 +1,14 @@
+from itertools import islice
 import time
 import threading
+import zlib
 
 from django.core import serializers
-from django.db import models, transaction
+from django.db import connections, models, router, transaction
 from django.utils.functional import cached_property
 
+from ..locks import StripedLock
+from . import bulk_load
 from .base import Task, TaskSet, task
 
 
@@ -34,20 +38,70 @@ class ImportModel(Task):
     """ Attribute name on target. """
     skip_id_zero = True
     """ If True, skip instance with `not source_id` """
+    upsert = False
+    """
+    If True, insert or update rows in a single statement using
+    ``bulk_create(update_conflicts=True)``, when supported by database
+    backend (``target_key`` must be unique). Existing rows are not
+    fetched: task function is always called with ``target=None``.
+    """
+    update_fields = None
+    """
+    Fields updated on existing rows (defaults to all concrete fields
+    except primary key and ``target_key``).
+    """
+    bulk_backend = 'orm'
+    """
+    Backend used to write rows:
+    - ``'orm'``: ``bulk_create``/``bulk_update`` (see ``upsert``);
+    - ``'sql'``: raw SQL upsert (``target_key`` must be unique), as
+      ``upsert``: PostgreSQL ``COPY`` into a temporary table merged into
+      target table, SQLite ``executemany``. Other databases fallback to
+      ``upsert``. Use large chunks with this backend.
+    """
+    lock_mode = 'thread'
+    """
+    Locking of imported keys, in order to avoid SQL's `DeadLock` error
+    and concurrent inserts of the same rows:
+    - ``'thread'``: striped thread locks shared by tasks of the same model;
+    - ``'advisory'``: striped PostgreSQL transaction advisory locks, for
+      multi-process imports (fallback to ``'thread'`` on other databases);
+    - ``None``: no locking.
+
+    Locks are taken by stripe (key hash) in sorted order, so that imports
+    of disjoint chunks can run in parallel. Integer keys are assigned to
+    consecutive stripes: chunks of consecutive keys share no stripe.
+    """
+    lock_stripes = 4096
+    """
+    Number of lock stripes by model. It must be far greater than chunks'
+    size, otherwise disjoint chunks share stripes and are imported one at
+    a time.
+    """
+    keep_objects = True
+    """
+    Imported objects kept in ``results`` (by task key, then by key), for
+    use by other tasks:
+    - ``True``: model instances;
+    - ``'pk'``: primary keys only;
+    - ``False``: nothing is kept, ``run`` returning imported objects of
+      the provided data set only.
+    """
     locks = {}
     """
-    [class attribute] Thread locks by model, in order to avoid SQL's
-    `DeadLock` error.
+    [class attribute] Thread striped locks by model.
     """
     lock = None
-    """ Task's thread lock, set at init. """
+    """ Task's ``StripedLock``, set at init. """
 
     def __init__(self, key, func, model, source_key, target_key, **kwargs):
         self.model = model
-        self.lock = type(self).locks.setdefault(model, threading.Lock())
         self.source_key = source_key
         self.target_key = target_key
         super().__init__(key, func, **kwargs)
+        locks = type(self).locks
+        self.lock = locks.get(model) or locks.setdefault(
+            model, StripedLock(self.lock_stripes, threading.Lock))
 
     def _get_rel(self, obj, key, *args, **kwargs):
         if isinstance(key, str):
@@ -62,14 +116,12 @@ class ImportModel(Task):
 
     def run(self, dataset, results, **kwargs):
         """
-        Fetch objects from db for provided data set, create or update
-        them.
+        Create or update objects for provided data set (see ``upsert``).
         """
         # don't use key provided by kwargs in order to avoid splitting
         # results over data range (=> key = 'parent_key.data_range')
         key = self.key
-        result = results.setdefault(key, {})
-        model, func = self.model, self.func
+        result = results.setdefault(key, {}) if self.keep_objects else {}
 
         items = ((self.source_rel(item, results), item) for item in dataset)
 
@@ -82,45 +134,190 @@ class ImportModel(Task):
             return {}
 
         ids = set(item[0] for item in items)
-        self.acquire_lock(ids)
+        use_advisory = self.use_advisory_lock()
+        if not use_advisory:
+            self.acquire_lock(ids)
         try:
-            with transaction.atomic() as atomic:
-                queryset = model.objects.select_for_update(of=tuple()) \
-                                .filter(**{self.target_key + '__in': ids })
-                in_db = { self.target_rel(r): r for r in queryset }
-
-                to_create, to_update = {}, {}
-                for key_, item in items:
-                    obj = in_db.get(key_, None) or to_create.get(key_, None)
-                    target = super().run(source=item, results=results, target=obj,
-                                            **kwargs)
-                    if not target:
-                        continue
-
-                    setattr(target, self.target_key, key_)
-                    if obj and key_ in in_db:
-                        to_update[key_] = target
-                    else:
-                        to_create[key_] = target
-
-                if to_create:
-                    to_create = model.objects.bulk_create(to_create.values())
-                    result.update({self.target_rel(r): r for r in to_create})
-                    # miss row id here
-                if to_update:
-                    result.update({self.target_rel(r): r for r in to_update.values()})
-                    for obj in to_update.values():
-                        obj.save()
+            with transaction.atomic(using=self.get_db()):
+                if use_advisory:
+                    self.acquire_advisory_lock(ids)
+                if self.use_bulk_load():
+                    objs = self.run_bulk_load(items, results, **kwargs)
+                elif self.use_upsert():
+                    objs = self.run_upsert(items, results, **kwargs)
+                else:
+                    objs = self.run_import(items, ids, results, **kwargs)
         finally:
-            self.release_lock(ids)
+            if not use_advisory:
+                self.release_lock(ids)
+
+        if self.keep_objects == 'pk':
+            objs = {k: obj.pk for k, obj in objs.items()}
+        result.update(objs)
         return result
 
+    def run_import(self, items, ids, results, **kwargs):
+        """
+        Fetch existing rows, then create new ones and update the others
+        using bulk operations.
+
+        :return dict of imported objects by key.
+        """
+        model, target_key = self.model, self.target_key
+        queryset = model.objects.select_for_update(of=tuple()) \
+                        .filter(**{target_key + '__in': ids })
+        in_db = { self.target_rel(r): r for r in queryset }
+
+        to_create, to_update = {}, {}
+        for key, item in items:
+            obj = in_db.get(key, None) or to_create.get(key, None)
+            target = super().run(source=item, results=results, target=obj,
+                                 **kwargs)
+            if not target:
+                continue
+
+            setattr(target, target_key, key)
+            if obj and key in in_db:
+                to_update[key] = target
+            else:
+                to_create[key] = target
+
+        if to_create:
+            model.objects.bulk_create(to_create.values())
+            self.fetch_pks(to_create)
+        if to_update:
+            model.objects.bulk_update(to_update.values(),
+                                      self.get_update_fields())
+        to_update.update(to_create)
+        return to_update
+
+    def run_upsert(self, items, results, **kwargs):
+        """
+        Insert or update objects in a single statement, then fetch their
+        primary keys.
+
+        :return dict of imported objects by key.
+        """
+        objs = self.get_objects(items, results, **kwargs)
+        if objs:
+            self.model.objects.bulk_create(
+                objs.values(), update_conflicts=True,
+                unique_fields=[self.target_key],
+                update_fields=self.get_update_fields())
+            self.fetch_pks(objs)
+        return objs
+
+    def run_bulk_load(self, items, results, **kwargs):
+        """
+        Insert or update objects using raw SQL (see ``bulk_backend``),
+        then fetch their primary keys.
+
+        :return dict of imported objects by key.
+        """
+        objs = self.get_objects(items, results, **kwargs)
+        if objs:
+            connection = connections[self.get_db()]
+            fields = bulk_load.get_fields(self.model)
+            rows = bulk_load.get_rows(objs.values(), fields, connection)
+            bulk_load.merge_rows(connection, self.model, fields, rows,
+                                 self.target_key, self.get_update_fields())
+            self.fetch_pks(objs)
+        return objs
+
+    def get_objects(self, items, results, **kwargs):
+        """
+        Return objects to import by key, without fetching existing rows.
+        """
+        target_key = self.target_key
+        objs = {}
+        for key, item in items:
+            target = super().run(source=item, results=results,
+                                 target=objs.get(key), **kwargs)
+            if target:
+                setattr(target, target_key, key)
+                objs[key] = target
+        return objs
+
+    def fetch_pks(self, objs):
+        """
+        Set primary key of provided objects (as dict by key) when not
+        returned by database on insert.
+        """
+        missing = [key for key, obj in objs.items() if obj.pk is None]
+        if missing:
+            pks = self.model.objects \
+                .filter(**{self.target_key + '__in': missing}) \
+                .values_list(self.target_key, 'pk')
+            for key, pk in pks:
+                objs[key].pk = pk
+                objs[key]._state.adding = False
+                objs[key]._state.db = self.get_db()
+
+    def get_update_fields(self):
+        """ Return fields to update on existing rows. """
+        if self.update_fields is not None:
+            return self.update_fields
+        return [f.name for f in self.model._meta.concrete_fields
+                if not f.primary_key and f.name != self.target_key]
+
+    def get_db(self):
+        """ Return database alias used to write model. """
+        return router.db_for_write(self.model)
+
+    def use_upsert(self):
+        """ Return True if upsert is enabled and supported by database. """
+        features = connections[self.get_db()].features
+        return (self.upsert or self.bulk_backend == 'sql') and \
+            features.supports_update_conflicts_with_target
+
+    def use_bulk_load(self):
+        """ Return True if raw SQL backend is used. """
+        return self.bulk_backend == 'sql' and \
+            connections[self.get_db()].vendor in ('postgresql', 'sqlite')
+
+    def use_advisory_lock(self):
+        """ Return True if database advisory locks are used. """
+        return self.lock_mode == 'advisory' and \
+            connections[self.get_db()].vendor == 'postgresql'
+
     def acquire_lock(self, ids):
-        return self.lock.acquire()
+        """ Acquire thread locks for provided ids. """
+        if self.lock_mode:
+            self.lock.acquire(ids)
 
     def release_lock(self, ids):
-        return self.lock.release()
-        
+        """ Release thread locks for provided ids. """
+        if self.lock_mode:
+            self.lock.release(ids)
+
+    def acquire_advisory_lock(self, ids):
+        """
+        Acquire PostgreSQL transaction advisory locks for provided ids (must
+        be called inside a transaction). Locks are released at the end of
+        the transaction.
+
+        Stripes are computed as for thread locks, using CRC32 for
+        non-integer keys (instead of ``hash()`` which is salted by
+        process).
+        """
+        model_key = self._int32(zlib.crc32(self.model._meta.label.encode()))
+        stripes = sorted({self.get_stripe(id) for id in ids})
+        with connections[self.get_db()].cursor() as cursor:
+            for stripe in stripes:
+                cursor.execute('SELECT pg_advisory_xact_lock(%s, %s)',
+                               [model_key, stripe])
+
+    def get_stripe(self, id):
+        """ Return advisory lock's stripe of provided id. """
+        if not isinstance(id, int):
+            id = zlib.crc32(str(id).encode())
+        return id % self.lock_stripes
+
+    @staticmethod
+    def _int32(value):
+        """ Unsigned to signed 32 bits integer. """
+        return value - (1 << 32) if value >= (1 << 31) else value
+
 
 class ImportModels(TaskSet):
     """
@@ -129,12 +326,19 @@ class ImportModels(TaskSet):
     It runs import methods declared on this class. To declare an import
     method, just use decorators provided in this module.
 
-    Note/TODO: does not support multithread
+    Concurrent imports of a model are synchronized by key (see
+    ``ImportModel.lock_mode``).
+
+    Imports depending on other ones declare it using ``depends``, e.g.
+    ``@import_model(Horse, 'id', 'id', depends=('trainers', 'stables'))``:
+    when submitted to a pool, independent imports run concurrently.
     """
     dataset = None
     """ Dataset to import """
     chunk_size = 64
     """ Chunk size """
+    split_key = 'pk'
+    """ Unique field used to paginate QuerySet datasets (see ``split``). """
 
     def __init__(self, key, dataset=None, **kwargs):
         self.dataset = dataset
@@ -142,36 +346,96 @@ class ImportModels(TaskSet):
 
     @classmethod
     def split(cls, key, dataset, chunk_size=None, count=None, data_range=None,
-                **init_kwargs):
+                key_range=None, split_key=None, **init_kwargs):
         """
-        Create multiple import task over dataset, split by chunk.
+        Create multiple import task over dataset, split by chunk, without
+        counting or loading the whole dataset.
+
+        QuerySets are paginated on ``split_key`` values (see
+        ``split_queryset``), other iterables are consumed by chunk.
+
+        :param int count: maximum number of items to import.
+        :param tuple data_range: `(start, end)` positions of items to \
+            import (end excluded, ``None`` for no bound).
+        :param tuple key_range: `(start, end)` ``split_key`` values of \
+            items to import, QuerySets only (end excluded, ``None`` for \
+            no bound).
+        :param str split_key: overrides ``cls.split_key``.
         """
-        dataset = cls.get_dataset(dataset, data_range=data_range, slice=False)
         chunk_size = chunk_size or cls.chunk_size
-        count = cls.count(dataset, count)
-        for i in range(0, count, chunk_size):
-            data_range = (i, i+chunk_size)
-            task = cls('{}.{}'.format(key, i),
-                       cls.get_dataset(dataset, data_range=data_range, slice=True),
-                       **init_kwargs)
-            yield task
+        if isinstance(dataset, models.QuerySet):
+            chunks = cls.split_queryset(dataset, chunk_size, count, data_range,
+                                        split_key or cls.split_key, key_range)
+        elif key_range is not None:
+            raise ValueError('key_range can only be used with QuerySets')
+        else:
+            chunks = cls.split_iterable(dataset, chunk_size, count, data_range)
+
+        for i, chunk in enumerate(chunks):
+            yield cls('{}.{}'.format(key, i * chunk_size), chunk,
+                      **init_kwargs)
 
     @classmethod
-    def count(self, dataset, count=None):
-        size = dataset.count() if isinstance(dataset, models.QuerySet) else \
-                    len(dataset)
-        return size if count is None else min(size, count)
+    def split_queryset(cls, queryset, chunk_size, count=None, data_range=None,
+                       split_key='pk', key_range=None):
+        """
+        Yield querysets by chunk, using keyset pagination: a chunk is
+        selected by a range of ``split_key`` values, the upper bound being
+        fetched by a single indexed query from the previous one (instead of
+        ``OFFSET`` queries whose cost grows with offset). A ``data_range``
+        start position is looked up once.
+
+        ``split_key`` must be unique and indexed.
+        """
+        queryset = queryset.order_by(split_key)
+        if key_range is not None:
+            start, end = key_range
+            if start is not None:
+                queryset = queryset.filter(**{split_key + '__gte': start})
+            if end is not None:
+                queryset = queryset.filter(**{split_key + '__lt': end})
+        if data_range is not None:
+            start, end = data_range
+            start = start or 0
+            if end is not None:
+                count = end - start if count is None else \
+                            min(count, end - start)
+            if start:
+                first = next(iter(queryset.values_list(split_key, flat=True)
+                                          [start:start+1]), None)
+                if first is None:
+                    return
+                queryset = queryset.filter(**{split_key + '__gte': first})
+
+        last = None
+        while count is None or count > 0:
+            size = chunk_size if count is None else min(chunk_size, count)
+            rest = queryset if last is None else \
+                        queryset.filter(**{split_key + '__gt': last})
+            bound = next(iter(rest.values_list(split_key, flat=True)
+                                  [size-1:size]), None)
+            if bound is None:
+                if rest.exists():
+                    yield rest
+                return
+            yield rest.filter(**{split_key + '__lte': bound})
+            last = bound
+            if count is not None:
+                count -= size
 
     @classmethod
-    def get_dataset(self, dataset, data_range=None, slice=True):
-        if isinstance(dataset, models.QuerySet):
-            dataset = dataset.all()
-        if slice:
-            if data_range is not None:
-                dataset = dataset[data_range[0]:data_range[1]]
-            else:
-                dataset = dataset[:]
-        return dataset
+    def split_iterable(cls, dataset, chunk_size, count=None, data_range=None):
+        """ Yield lists of items by chunk from provided iterable. """
+        iterator = iter(dataset)
+        if data_range is not None:
+            iterator = islice(iterator, *data_range)
+        if count is not None:
+            iterator = islice(iterator, count)
+        while True:
+            chunk = list(islice(iterator, chunk_size))
+            if not chunk:
+                return
+            yield chunk
 
     def get_tasks(self, **kwargs):
         kwargs.setdefault('results', {})
@@ -182,23 +446,61 @@ class ImportModels(TaskSet):
         return super().run(dataset=self.dataset, **kwargs)
 
     @classmethod
-    def load(cls, path=None, stream=None, **kwargs):
+    def load(cls, path=None, stream=None, format='json', **kwargs):
+        """
+        Return import task set for the fixture at provided path or stream.
+        The whole fixture is loaded in memory: use ``load_split`` for
+        large fixtures.
+        """
         if stream is None:
             stream = open(path, 'r')
 
         with stream:
-            kwargs['dataset'] = list(serializers.deserialize('json', stream))
+            kwargs['dataset'] = list(serializers.deserialize(format, stream))
             return cls(**kwargs)
 
-    def dumpdata(self, path=None, stream=None, count=None):
+    @classmethod
+    def load_split(cls, key, path=None, stream=None, format='jsonl',
+                   chunk_size=None, count=None, report=None, **init_kwargs):
+        """
+        Yield import tasks by chunk of a fixture, deserialized lazily.
+        Fixture format must support streaming (e.g. `jsonl`), in order to
+        load it in bounded memory.
+
+        :param callable report: `report(task, duration)` called for \
+            each chunk, with the duration of its loading in seconds.
+        :param **init_kwargs: ``split`` arguments and tasks init kwargs.
+        """
+        if stream is None:
+            stream = open(path, 'r')
+
+        with stream:
+            dataset = serializers.deserialize(format, stream)
+            tasks = cls.split(key, dataset, chunk_size=chunk_size,
+                              count=count, **init_kwargs)
+            while True:
+                start = time.perf_counter()
+                task = next(tasks, None)
+                if task is None:
+                    return
+                if report is not None:
+                    report(task, time.perf_counter() - start)
+                yield task
+
+    def dumpdata(self, path=None, stream=None, count=None, format='json',
+                 chunk_size=2000):
         """
         Dump data to file (by path or stream), to be used as fixture.
+        QuerySets are iterated by chunk of ``chunk_size`` rows, and items
+        written as they are serialized.
         """
+        dataset = self.dataset
+        if isinstance(dataset, models.QuerySet):
+            dataset = dataset.iterator(chunk_size=chunk_size)
+        if count is not None:
+            dataset = islice(dataset, count)
+
         if stream is None:
             stream = open(path, 'w')
-        if count is None:
-            count = self.count
         with stream:
-            serializers.serialize('json', self.dataset[:count],
-                                  stream=stream)
-
+            serializers.serialize(format, dataset, stream=stream)
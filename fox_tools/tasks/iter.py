@@ -1,6 +1,9 @@
+import concurrent.futures as futures
 from itertools import islice
+import queue
+import threading
 
-from .base import Task, TaskSet
+from .base import Task, TaskSet, when_done
 
 
 __all__ = ('IterTaskSet',)
@@ -8,41 +11,65 @@ __all__ = ('IterTaskSet',)
 
 class IterTaskSet(TaskSet):
     """
-    Use iterator in order to generate tasks. TaskSet is submitted
-    multiple time, as long as iterator is not exhausted.
+    Use iterator in order to generate tasks, streamed to the executor.
+
+    Once submitted, at most ``prefetch`` tasks from the iterator are
+    running or queued at a time: a new one is taken from the iterator as
+    soon as one completes. Set's future (``stream``) completes once the
+    iterator is exhausted and all its tasks are done.
+
+    When used by a ``Pool``, streamed tasks' futures are added to the
+    current round (see ``Pool.track``). The pool stops streaming new
+    tasks when drained or cancelled.
     """
     iter = None
     """ Iterator over tasks """
     chunk_size = 20
-    """ Number of tasks to take on ``submit``. """
+    """ Number of tasks taken from iterator by ``get_tasks``. """
+    prefetch = 20
+    """ Maximum number of iterator's tasks submitted and not done. """
+    background = False
+    """
+    If True, tasks are taken from iterator by a background thread, up to
+    ``prefetch`` tasks ahead, so that their generation overlaps with
+    execution.
+    """
+    stream = None
+    """ Future of the current stream, set on submit. """
+    exhausted = False
+    """ True when iterator is exhausted. """
 
     def __init__(self, key, iter, **kwargs):
         self.iter = iter
         super().__init__(key, **kwargs)
-
-    def submit(self, *args, **kwargs):
-        result = super().submit(*args, **kwargs)
-        if self.iter is not None:
-            self.scheduled = False
-        return result
+        self._lock = threading.Lock()
+        self._in_flight = 0
+        self._queue = None
+        self._local = threading.local()
 
     _regular_tasks_taken = False
 
-    def get_tasks(self, **kwargs):
+    def get_tasks(self, count=None, **kwargs):
+        """
+        Return regular tasks (only on first call) and up to ``count``
+        (default: ``chunk_size``) tasks from iterator.
+        """
         if not self._regular_tasks_taken:
             tasks = list(super().get_tasks(**kwargs))
             self._regular_tasks_taken = True
         else:
             tasks = []
 
-        if self.iter is not None and len(tasks) < self.chunk_size:
-            count = self.chunk_size - len(tasks)
-            extra = [t for t in (self.from_iter(v, **kwargs)
-                        for v in islice(self.iter, 0, count)) if t]
-            if extra is None:
-                self.iter = None
-            else:
-                tasks += extra
+        if count is None:
+            count = self.chunk_size
+        if self.iter is not None and count:
+            with self._lock:
+                values = list(islice(self.iter, count))
+                if len(values) < count:
+                    self.iter = None
+                    self.exhausted = True
+            tasks += [t for t in (self.from_iter(v, **kwargs)
+                                  for v in values) if t]
         return tasks
 
     def from_iter(self, value, **kwargs):
@@ -53,3 +80,161 @@ class IterTaskSet(TaskSet):
         """
         return (value, kwargs) if isinstance(value, Task) else None
 
+    def submit(self, executor, **kwargs):
+        """
+        Submit regular tasks and start streaming iterator's tasks. Return
+        regular tasks' futures and ``stream`` future.
+        """
+        if self.stream is not None and not self.stream.done():
+            return []
+        futs = self.submit_tasks(executor, self.get_tasks(count=0, **kwargs))
+
+        self.stream = futures.Future()
+        setattr(self.stream, 'task_key', self.key)
+        self.add_future(self.stream)
+        self.scheduled = True
+        self._context = (executor, kwargs)
+        if self.background and self.iter is not None:
+            self._queue = queue.Queue(maxsize=self.prefetch)
+            threading.Thread(target=self.produce, args=(kwargs,),
+                             daemon=True).start()
+        self.refill()
+        return futs + [self.stream]
+
+    def produce(self, kwargs):
+        """
+        [background thread] Put tasks from iterator into queue, `None`
+        marking its end (or exception raised by iterator).
+        """
+        try:
+            for value in self.iter:
+                item = self.from_iter(value, **kwargs)
+                if item is None:
+                    continue
+                if not self._put(item):
+                    return
+                self.refill()
+            self._put(None)
+        except Exception as err:
+            self._put(err)
+        self.refill()
+
+    def _put(self, item):
+        """ Put item in queue, return False if streaming is stopped. """
+        while not self.is_stopped():
+            try:
+                self._queue.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                pass
+        return False
+
+    def is_stopped(self):
+        """ Return True if streaming must stop (pool draining, cancel). """
+        kwargs = self._context[1]
+        cancel, pool = kwargs.get('cancel'), kwargs.get('pool')
+        return bool(cancel is not None and cancel.cancelled or
+                    pool is not None and getattr(pool, 'draining', False))
+
+    def next_task(self):
+        """
+        Return next `(task, kwargs)` from iterator (or background queue),
+        None if none is available. Called with lock held.
+        """
+        if self._queue is not None:
+            try:
+                item = self._queue.get_nowait()
+            except queue.Empty:
+                return None
+            if item is None or isinstance(item, Exception):
+                self._queue = None
+                self.iter = None
+                self.exhausted = True
+                if item is not None:
+                    raise item
+            return item
+
+        while self.iter is not None:
+            try:
+                value = next(self.iter)
+            except StopIteration:
+                self.iter = None
+                self.exhausted = True
+                return None
+            item = self.from_iter(value, **self._context[1])
+            if item is not None:
+                return item
+        return None
+
+    def refill(self, done=None):
+        """
+        Submit tasks from iterator while fewer than ``prefetch`` are in
+        flight, and complete ``stream`` once all are done.
+
+        Futures completing immediately call back ``refill`` from the same
+        thread: those calls are handled by the running one's loop instead
+        of recursing.
+
+        :param done: futures of a completed task (when called back).
+        """
+        if done is not None:
+            with self._lock:
+                self._in_flight -= 1
+        local = self._local
+        if getattr(local, 'active', False):
+            local.again = True
+            return
+        local.active = True
+        try:
+            local.again = True
+            while local.again:
+                local.again = False
+                self._refill()
+        except Exception as err:
+            try:
+                self.stream.set_exception(err)
+            except futures.InvalidStateError:
+                pass
+        finally:
+            local.active = False
+
+    def _refill(self):
+        stream = self.stream
+        executor, kwargs = self._context
+        items, error = [], None
+        with self._lock:
+            try:
+                while self._in_flight < self.prefetch and \
+                        not self.is_stopped():
+                    item = self.next_task()
+                    if item is None:
+                        break
+                    self._in_flight += 1
+                    items.append(item)
+            except Exception as err:
+                error = err
+
+        pool = kwargs.get('pool')
+        for item in items:
+            try:
+                futs = self.submit_tasks(executor, [item])
+            except Exception as err:
+                futs, error = [], err
+            if pool is not None:
+                for future in futs:
+                    pool.track(future, self)
+            when_done(futs, self.refill)
+
+        with self._lock:
+            finished = not self._in_flight and (
+                self.iter is None or self.is_stopped())
+        if stream.done() or error is None and not finished:
+            return
+        try:
+            if error is not None:
+                stream.set_exception(error)
+            else:
+                stream.set_result(self.exhausted)
+        except futures.InvalidStateError:
+            # completed by another thread
+            pass
@@ -0,0 +1,357 @@
+"""
+Pool instrumentation: tasks' events (queued, started, finished) are
+reported by the pool's executor to instruments.
+
+Provided instruments:
+- ``Metrics``: histograms of queue wait time, run time and result size,
+  errors and retries counts, by task class and key prefix; exported as
+  Prometheus text or JSON;
+- ``Tracer``: OpenTelemetry compatible spans by task run.
+"""
+from bisect import bisect_left
+import threading
+import time
+
+try:
+    from opentelemetry import trace
+except ImportError:
+    trace = None
+
+
+__all__ = ('TaskEvent', 'Instrument', 'Histogram', 'Metrics', 'Tracer',
+           'result_bytes', 'result_size')
+
+
+def result_bytes(result):
+    """
+    Return size in bytes of task's result or None: length of bytes and
+    strings, content length of HTTP responses (also when returned in a
+    dict as ``response``, as ``HttpRequest`` does).
+    """
+    if isinstance(result, (bytes, bytearray, str)):
+        return len(result)
+    if isinstance(result, dict) and 'response' in result:
+        result = result['response']
+    if hasattr(result, 'status_code') and hasattr(result, 'headers'):
+        size = result.headers.get('Content-Length')
+        if size and size.isdigit():
+            return int(size)
+        content = getattr(result, '_content', None)
+        return len(content) if isinstance(content, bytes) else None
+    return None
+
+
+def result_size(result):
+    """
+    Return size of task's result or None: ``result_bytes()`` if any,
+    length of sized values otherwise.
+    """
+    size = result_bytes(result)
+    if size is None:
+        try:
+            return len(result)
+        except TypeError:
+            return None
+    return size
+
+
+class TaskEvent:
+    """ Task's run through pool's executor, as reported to instruments. """
+    __slots__ = ('task', 'key', 'future', 'queued', 'started', 'finished',
+                 'result', 'error', 'span')
+
+    def __init__(self, task, key):
+        self.task = task
+        self.key = key
+        self.future = None
+        self.queued = time.perf_counter()
+        self.started = self.finished = None
+        self.result = self.error = self.span = None
+
+    @property
+    def wait_time(self):
+        """ Time spent in executor's queue (seconds). """
+        return None if self.started is None else self.started - self.queued
+
+    @property
+    def run_time(self):
+        """ Run duration (seconds). """
+        if self.finished is None or self.started is None:
+            return None
+        return self.finished - self.started
+
+
+class Instrument:
+    """
+    Base class of pool's instruments. Methods are called from pool's
+    thread (``queued``) and executor's workers (``started``,
+    ``finished``): they must be thread-safe.
+    """
+    def queued(self, event):
+        """ Task has been submitted to executor. """
+        pass
+
+    def started(self, event):
+        """ Task's run is started. """
+        pass
+
+    def finished(self, event):
+        """ Task's run is finished (``event.error`` is set on failure). """
+        pass
+
+
+class Histogram:
+    """ Values count by bucket (upper bounds), sum and count. """
+    bounds = None
+    """ Buckets' upper bounds, sorted (last bucket being ``+inf``). """
+
+    def __init__(self, bounds):
+        self.bounds = tuple(bounds)
+        self.counts = [0] * (len(self.bounds) + 1)
+        self.sum = 0
+        self.count = 0
+
+    def observe(self, value):
+        self.counts[bisect_left(self.bounds, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def merge(self, other):
+        """ Merge other histogram (of same bounds) into self. """
+        if other.bounds != self.bounds:
+            raise ValueError('can not merge histograms of different bounds')
+        self.counts = [a + b for a, b in zip(self.counts, other.counts)]
+        self.sum += other.sum
+        self.count += other.count
+
+    def quantile(self, q):
+        """ Return upper bound of the bucket holding quantile ``q``. """
+        if not self.count:
+            return None
+        rank, total = q * self.count, 0
+        for bound, count in zip(self.bounds + (float('inf'),), self.counts):
+            total += count
+            if total >= rank and count:
+                return bound
+        return float('inf')
+
+    def cumulative(self):
+        """ Yield `(upper bound, cumulative count)`, including ``+inf``. """
+        total = 0
+        for bound, count in zip(self.bounds + (float('inf'),), self.counts):
+            total += count
+            yield bound, total
+
+    def as_dict(self):
+        return {'count': self.count, 'sum': self.sum,
+                'buckets': {_bound(b): c for b, c in self.cumulative()}}
+
+
+def _bound(bound):
+    return '+Inf' if bound == float('inf') else repr(bound)
+
+
+class GroupMetrics:
+    """ Metrics of a group of tasks. """
+    def __init__(self, time_buckets, size_buckets):
+        self.queued = 0
+        self.started = 0
+        self.finished = 0
+        self.errors = 0
+        self.retries = 0
+        self.wait_time = Histogram(time_buckets)
+        self.run_time = Histogram(time_buckets)
+        self.size = Histogram(size_buckets)
+
+    @property
+    def in_flight(self):
+        return self.started - self.finished
+
+    def as_dict(self):
+        return {'queued': self.queued, 'started': self.started,
+                'finished': self.finished, 'errors': self.errors,
+                'retries': self.retries, 'wait_time': self.wait_time.as_dict(),
+                'run_time': self.run_time.as_dict(),
+                'size': self.size.as_dict()}
+
+
+class Metrics(Instrument):
+    """
+    Aggregate tasks' queue wait time, run time, result size, errors and
+    retries by task class and key prefix.
+
+    A task submitted again with the key of a failed run is counted as a
+    retry.
+    """
+    time_buckets = (0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1, 5, 10, 30, 60,
+                    300)
+    """ Time histograms' buckets (seconds). """
+    size_buckets = tuple(4 ** i for i in range(4, 14))
+    """ Result size histograms' buckets. """
+    key_separator = '.'
+    """ Task key's prefix separator. """
+    prefix_depth = 1
+    """ Number of key's components used as prefix (0 for none). """
+    max_groups = 1000
+    """ Maximum number of groups, others being aggregated in prefix ``*``. """
+    namespace = 'fox_tasks'
+    """ Prometheus metrics names' prefix. """
+    max_failed = 10000
+    """ Maximum number of failed keys remembered to count retries. """
+
+    def __init__(self, **kwargs):
+        for key, value in kwargs.items():
+            if not hasattr(self, key):
+                raise AttributeError(key)
+            setattr(self, key, value)
+        self.groups = {}
+        self.lock = threading.Lock()
+        self._failed = set()
+
+    def get_prefix(self, key):
+        """
+        Return task key's prefix (used for grouping), empty if key has no
+        separator.
+        """
+        key = '' if key is None else str(key)
+        if not self.prefix_depth or self.key_separator not in key:
+            return ''
+        parts = key.split(self.key_separator, self.prefix_depth)
+        return self.key_separator.join(parts[:self.prefix_depth])
+
+    def get_group(self, event):
+        """ Return group key of event as `(task class name, prefix)`. """
+        return (type(event.task).__name__, self.get_prefix(event.key))
+
+    def _get_metrics(self, group):
+        metrics = self.groups.get(group)
+        if metrics is None:
+            if len(self.groups) >= self.max_groups:
+                group = (group[0], '*')
+                metrics = self.groups.get(group)
+            if metrics is None:
+                metrics = self.groups[group] = GroupMetrics(
+                    self.time_buckets, self.size_buckets)
+        return metrics
+
+    def queued(self, event):
+        group = self.get_group(event)
+        with self.lock:
+            metrics = self._get_metrics(group)
+            metrics.queued += 1
+            failed = (group, event.key)
+            if failed in self._failed:
+                self._failed.discard(failed)
+                metrics.retries += 1
+
+    def started(self, event):
+        group = self.get_group(event)
+        with self.lock:
+            metrics = self._get_metrics(group)
+            metrics.started += 1
+            metrics.wait_time.observe(event.wait_time)
+
+    def finished(self, event):
+        group = self.get_group(event)
+        size = None if event.error else result_size(event.result)
+        with self.lock:
+            metrics = self._get_metrics(group)
+            metrics.finished += 1
+            metrics.run_time.observe(event.run_time)
+            if event.error is not None:
+                metrics.errors += 1
+                if len(self._failed) >= self.max_failed:
+                    self._failed.clear()
+                self._failed.add((group, event.key))
+            elif size is not None:
+                metrics.size.observe(size)
+
+    def to_json(self):
+        """ Return metrics as list of dicts. """
+        with self.lock:
+            return [dict(task=task, prefix=prefix, **metrics.as_dict())
+                    for (task, prefix), metrics in sorted(self.groups.items())]
+
+    def to_prometheus(self):
+        """ Return metrics in Prometheus text exposition format. """
+        ns = self.namespace
+        counters = (('queued', 'Tasks submitted to executor'),
+                    ('started', 'Tasks started'),
+                    ('finished', 'Tasks finished'),
+                    ('errors', 'Tasks failed'),
+                    ('retries', 'Tasks submitted again after failure'))
+        histograms = (('wait_time', 'seconds', 'Time spent in queue'),
+                      ('run_time', 'seconds', 'Run duration'),
+                      ('size', 'bytes', 'Result size'))
+        with self.lock:
+            groups = sorted(self.groups.items())
+            lines = []
+            for name, help in counters:
+                lines.append('# HELP {}_{}_total {}'.format(ns, name, help))
+                lines.append('# TYPE {}_{}_total counter'.format(ns, name))
+                for group, metrics in groups:
+                    lines.append('{}_{}_total{{{}}} {}'.format(
+                        ns, name, _labels(group), getattr(metrics, name)))
+            for name, unit, help in histograms:
+                metric = '{}_{}_{}'.format(ns, name, unit)
+                lines.append('# HELP {} {}'.format(metric, help))
+                lines.append('# TYPE {} histogram'.format(metric))
+                for group, metrics in groups:
+                    labels = _labels(group)
+                    histogram = getattr(metrics, name)
+                    for bound, count in histogram.cumulative():
+                        lines.append('{}_bucket{{{},le="{}"}} {}'.format(
+                            metric, labels, _bound(bound), count))
+                    lines.append('{}_sum{{{}}} {}'.format(
+                        metric, labels, histogram.sum))
+                    lines.append('{}_count{{{}}} {}'.format(
+                        metric, labels, histogram.count))
+        return '\n'.join(lines) + '\n'
+
+
+def _labels(group):
+    task, prefix = group
+    prefix = prefix.replace('\\', '\\\\').replace('"', '\\"') \
+                   .replace('\n', '\\n')
+    return 'task="{}",prefix="{}"'.format(task, prefix)
+
+
+class Tracer(Instrument):
+    """
+    Create a span by task run, using an OpenTelemetry compatible tracer
+    (``start_span(name, attributes=)``, spans providing
+    ``set_attribute``, ``record_exception`` and ``end``).
+    """
+    tracer = None
+    """ Tracer (default: OpenTelemetry's tracer, if installed). """
+
+    def __init__(self, tracer=None, name='fox_tools.tasks'):
+        if tracer is None:
+            if trace is None:
+                raise ImportError('opentelemetry-api is required when no '
+                                  'tracer is provided')
+            tracer = trace.get_tracer(name)
+        self.tracer = tracer
+
+    def get_span_name(self, event):
+        return type(event.task).__name__
+
+    def started(self, event):
+        event.span = self.tracer.start_span(
+            self.get_span_name(event),
+            attributes={'task.key': str(event.key),
+                        'task.wait_time': event.wait_time},
+        )
+
+    def finished(self, event):
+        span = event.span
+        if span is None:
+            return
+        if event.error is not None:
+            span.record_exception(event.error)
+            span.set_attribute('error', True)
+        else:
+            size = result_size(event.result)
+            if size is not None:
+                span.set_attribute('task.result_size', size)
+        span.end()
@@ -1,17 +1,126 @@
+from collections import OrderedDict
 import concurrent.futures as futures
+import queue
+import threading
 import time
+import traceback
 
 from ..tool import Tool
-from . import BaseTask
+from . import BaseTask, CancelToken, TaskCancelled
+from .metrics import TaskEvent
+from .progress import Progress
+from .sinks import get_sink
 
 
-__all__ = ('Pool',)
+__all__ = ('PoolExecutor', 'Completion', 'Pool')
 
 
+class PoolExecutor:
+    """
+    Executor proxy used by ``Pool``: it reports tasks' events (queued,
+    started, finished) to the pool's instruments, and holds tasks back
+    from starting while the pool is paused (see ``Pool.wait_resumed``).
+    """
+    executor = None
+    """ Proxied executor. """
+    pool = None
+    """ Pool instance. """
+
+    def __init__(self, executor, pool):
+        self.executor = executor
+        self.pool = pool
+
+    def submit(self, fn, *args, **kwargs):
+        task = getattr(fn, '__self__', None)
+        event = TaskEvent(task, kwargs.get('key', getattr(task, 'key', None)))
+        pool, notify = self.pool, self.pool.notify
+
+        def run():
+            resumed = pool.wait_resumed()
+            event.started = time.perf_counter()
+            notify('started', event)
+            try:
+                if not resumed:
+                    raise TaskCancelled()
+                event.result = fn(*args, **kwargs)
+                return event.result
+            except BaseException as err:
+                event.error = err
+                raise
+            finally:
+                event.finished = time.perf_counter()
+                notify('finished', event)
+                event.result = None
+
+        notify('queued', event)
+        event.future = self.executor.submit(run)
+        return event.future
+
+    def shutdown(self, *args, **kwargs):
+        return self.executor.shutdown(*args, **kwargs)
+
+    def __enter__(self):
+        self.executor.__enter__()
+        return self
+
+    def __exit__(self, *args):
+        return self.executor.__exit__(*args)
+
+    def __getattr__(self, name):
+        return getattr(self.executor, name)
+
+
+class Completion:
+    """
+    Iterate over futures as they complete. Futures can be added while
+    iterating, from any thread. Yielded futures are not referenced
+    anymore.
+    """
+    def __init__(self):
+        self.queue = queue.SimpleQueue()
+        self.pending = 0
+        self.lock = threading.Lock()
+
+    def add(self, future):
+        with self.lock:
+            self.pending += 1
+        future.add_done_callback(self.queue.put)
+
+    def iter(self, timeout=None):
+        """
+        Yield futures as they complete, until no future is pending.
+
+        :param timeout: maximum time waiting for a future (seconds).
+        :raises concurrent.futures.TimeoutError: on timeout.
+        """
+        while True:
+            with self.lock:
+                if not self.pending:
+                    return
+            try:
+                future = self.queue.get(timeout=timeout)
+            except queue.Empty:
+                raise futures.TimeoutError('{} futures unfinished'
+                                           .format(self.pending)) from None
+            with self.lock:
+                self.pending -= 1
+            yield future
+            future = None
+
 
 class Pool(Tool):
     """
     Pool managing multiple `Task`s over executor.
+
+    Completed futures are kept by their tasks unless ``keep_results`` is
+    False, and done tasks by the pool unless ``done_tasks_ttl`` or
+    ``max_done_tasks`` is set: long runs should use them in order to
+    keep memory bounded.
+
+    A running pool can be controlled from other threads: ``pause()`` and
+    ``resume()`` tasks' starts, ``drain()`` stops submitting new tasks
+    letting submitted ones complete, and ``cancel()`` aborts the run
+    (tasks are notified through the ``cancel`` token of their context).
     """
     max_workers = 5
     """ Maximum number of concurrent workers. """
@@ -22,6 +131,36 @@ class Pool(Tool):
     """ Pool executor. """
     tasks = None
     """ Dict of tasks by key. """
+    instruments = None
+    """
+    Instruments notified of tasks' events (see
+    ``fox_tools.tasks.metrics``).
+    """
+    progress = None
+    """ Tasks' progress counters (``Progress``, added to instruments). """
+    fail_fast = True
+    """
+    If True, a task's error cancels the run and is raised by ``run()``.
+    Otherwise, errors are logged and the run goes on.
+    """
+    cancel_token = None
+    """ Cancellation token of the current run (``CancelToken``). """
+    draining = False
+    """ True when pool stopped submitting tasks (drain or cancel). """
+    keep_results = True
+    """
+    If False, completed futures are forgotten by their tasks (see
+    ``BaseTask.forget``) once handled by ``completed()`` and ``sink``.
+    """
+    sink = None
+    """
+    Receive completed futures' results: ``Sink``, callable, queue or file
+    path (see ``fox_tools.tasks.sinks``).
+    """
+    done_tasks_ttl = None
+    """ Delay (seconds) after which done tasks are removed from ``tasks``. """
+    max_done_tasks = None
+    """ Maximum number of done tasks kept in ``tasks``. """
 
     @property
     def is_running(self):
@@ -32,7 +171,89 @@ class Pool(Tool):
         super().__init__(**kwargs)
         if not self.tasks:
             self.tasks = {}
+        self.instruments = list(self.instruments or ())
+        if self.progress is None:
+            self.progress = Progress()
+        if self.progress not in self.instruments:
+            self.instruments.insert(0, self.progress)
         self.executor = None
+        self.sink = get_sink(self.sink)
+        self._done_tasks = OrderedDict()
+        self._completion = None
+        self.cancel_token = CancelToken()
+        self._resumed = threading.Event()
+        self._resumed.set()
+        self._stopped = threading.Event()
+        self._stopped.set()
+        self._drain_timer = None
+
+    @property
+    def paused(self):
+        """ True if pool is paused. """
+        return not self._resumed.is_set()
+
+    def pause(self):
+        """
+        Pause pool: submitted tasks are not started until ``resume()``.
+        Running tasks are not interrupted.
+        """
+        self._resumed.clear()
+
+    def resume(self):
+        """ Resume paused pool. """
+        self._resumed.set()
+
+    def wait_resumed(self):
+        """
+        Block while pool is paused (called by executor's workers before
+        running a task). Return False if run has been cancelled.
+        """
+        self._resumed.wait()
+        return not self.cancel_token.cancelled
+
+    def drain(self, timeout=None, wait=True):
+        """
+        Stop submitting new tasks, letting submitted ones complete. The
+        run is cancelled if not completed after ``timeout`` seconds.
+
+        :param bool wait: wait for the run to end.
+        :return: True if the run ended without being cancelled (False if \
+            not waiting).
+        """
+        if not self.is_running:
+            return True
+        self.draining = True
+        self.resume()
+        if timeout is not None and self._drain_timer is None:
+            self._drain_timer = threading.Timer(timeout, self.cancel)
+            self._drain_timer.daemon = True
+            self._drain_timer.start()
+        if not wait:
+            return False
+        self._stopped.wait()
+        return not self.cancel_token.cancelled
+
+    def cancel(self):
+        """
+        Cancel current run: no more task is submitted nor started, and
+        running ones are notified through their cancel token.
+        """
+        self.draining = True
+        self.cancel_token.cancel()
+        self._resumed.set()
+
+    def get_instrument(self, cls):
+        """ Return first instrument of provided class or None. """
+        return next((i for i in self.instruments if isinstance(i, cls)),
+                    None)
+
+    def notify(self, event_name, event):
+        """ Call instruments' ``event_name`` method with provided event. """
+        for instrument in self.instruments:
+            try:
+                getattr(instrument, event_name)(event)
+            except Exception as err:
+                self.log(err, instrument=instrument, event=event_name)
 
     def get_task(self, key):
         """ Return task by key or None. """
@@ -52,10 +273,14 @@ class Pool(Tool):
         return (self.tasks.get(task.key) for task in tasks)
 
     def shutdown(self):
-        """ Shutdown executor and clear tasks. """
-        self.executor.shutdown(cancel_futures=True)
-        self.executor = None
-        # TODO: clean up tasks
+        """
+        Cancel current run and shutdown executor, without waiting for
+        running tasks.
+        """
+        self.cancel()
+        executor = self.executor
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
 
     def run(self, keep_alive=False, **context):
         """
@@ -67,27 +292,110 @@ class Pool(Tool):
         """
         if self.executor:
             raise RuntimeError('pool is already running')
-        
+
+        self.cancel_token = CancelToken()
+        self.draining = False
+        self._stopped.clear()
         context = self.get_context(**context)
-        self.executor = self.get_executor(**context)
-        with self.executor as executor:
-            context['executor'] = executor
-            context['wait'] = keep_alive 
-            while True:
-                futs = list(self.get_futures(**context))
-                if not futs:
-                    break
-                futs = futures.as_completed(futs, timeout=self.task_timeout)
-                for future in futs:
-                    try:
-                        self.completed(future)
-                        future.result()
-                    except Exception as err:
-                        self.log(err, task=getattr(future, 'task_key', None))
-                        import traceback
-                        traceback.print_exc()
-                        raise
-        self.executor = None
+        self.executor = PoolExecutor(self.get_executor(**context), self)
+        try:
+            with self.executor as executor:
+                context['executor'] = executor
+                context['wait'] = keep_alive
+                while True:
+                    futs = self.iter_completed(self.get_futures(**context),
+                                               self.task_timeout)
+                    count = 0
+                    for future in futs:
+                        count += 1
+                        try:
+                            self.completed(future)
+                            future.result()
+                        except futures.CancelledError:
+                            pass
+                        except Exception as err:
+                            self.log(err, task=getattr(future, 'task_key', None))
+                            traceback.print_exc()
+                            if self.fail_fast:
+                                self.cancel()
+                                raise
+                        finally:
+                            self.release(future)
+                    if not count:
+                        break
+        finally:
+            self._completion = None
+            if self.sink is not None:
+                self.sink.close()
+            if self._drain_timer is not None:
+                self._drain_timer.cancel()
+                self._drain_timer = None
+            self.executor = None
+            self._stopped.set()
+
+    def iter_completed(self, futs, timeout=None):
+        """
+        Return iterator over futures as they complete, futures added by
+        ``track()`` included (see ``Completion``).
+        """
+        completion = self._completion = Completion()
+        for future in futs:
+            completion.add(future)
+        return completion.iter(timeout)
+
+    def track(self, future, task=None):
+        """
+        Add a future submitted by a task outside of ``get_futures`` (e.g.
+        from a callback) to the current round, so that it is handled as
+        the others (``completed``, ``release``). Thread-safe.
+
+        :param BaseTask task: pool's task the future belongs to.
+        :return: False if pool is not running.
+        """
+        completion = self._completion
+        if completion is None:
+            return False
+        future.pool_task = task
+        completion.add(future)
+        return True
+
+    def release(self, future):
+        """
+        Apply retention policy on completed future: pass it to ``sink``,
+        make its tasks forget it (if not ``keep_results``), and evict
+        done tasks.
+        """
+        if self.sink is not None:
+            try:
+                self.sink.put(future)
+            except Exception as err:
+                self.log(err, task=getattr(future, 'task_key', None))
+        if not self.keep_results:
+            for owner in getattr(future, 'owners', None) or ():
+                owner.forget(future)
+            future.owners = None
+
+        if self.done_tasks_ttl is None and self.max_done_tasks is None:
+            return
+        task = getattr(future, 'pool_task', None)
+        future.pool_task = None
+        if task is not None and task.scheduled and task.done:
+            self._done_tasks.setdefault(task.key, (task, time.monotonic()))
+        self.evict_tasks()
+
+    def evict_tasks(self):
+        """ Remove done tasks from ``tasks`` (by TTL and count). """
+        done, ttl, limit = self._done_tasks, self.done_tasks_ttl, \
+                           self.max_done_tasks
+        now = time.monotonic()
+        while done:
+            key, (task, done_at) = next(iter(done.items()))
+            if not (limit is not None and len(done) > limit or
+                    ttl is not None and now - done_at >= ttl):
+                break
+            done.popitem(last=False)
+            if self.tasks.get(key) is task:
+                del self.tasks[key]
 
     def get_executor(self, **context):
         return futures.ThreadPoolExecutor(max_workers=self.max_workers)
@@ -98,8 +406,10 @@ class Pool(Tool):
 
         Pool class provides following context values:
         - `pool`: Pool instance running tasks (self);
+        - `cancel`: run's ``CancelToken``;
         """
         kwargs.setdefault('pool', self)
+        kwargs.setdefault('cancel', self.cancel_token)
         return kwargs
 
     def get_futures(self, executor, wait=False, **kwargs):
@@ -107,10 +417,12 @@ class Pool(Tool):
         Submit unscheduled tasks to executor and return iterator over
         generated futures.
         """
+        if self.draining:
+            return
         tasks = list(self.get_tasks(**kwargs))
         if wait and not tasks:
             while not tasks:
-                if not self.is_running:
+                if not self.is_running or self.draining:
                     return
                 time.sleep(0.01)
                 tasks = list(self.get_tasks(**kwargs))
@@ -120,13 +432,14 @@ class Pool(Tool):
             if not futs:
                 continue
             if isinstance(futs, futures.Future):
-                yield futs
-            else:
-                for future in futs:
-                    yield future
+                futs = (futs,)
+            for future in futs:
+                future.pool_task = task
+                yield future
 
     def get_tasks(self, **kwargs):
-        return (task for task in self.tasks.values() if not task.scheduled)
+        return (task for task in list(self.tasks.values())
+                if not task.scheduled)
 
     def _await_task(self):
         """
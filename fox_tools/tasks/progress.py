@@ -0,0 +1,217 @@
+"""
+Pool progress: running counters of tasks (updated in constant time),
+throughput over sliding windows and estimated time of arrival, and a
+throttled terminal display.
+"""
+from concurrent.futures import CancelledError
+import sys
+import threading
+import time
+from datetime import timedelta
+
+from .metrics import Instrument, result_bytes
+
+
+__all__ = ('Progress', 'ProgressDisplay')
+
+
+class Progress(Instrument):
+    """
+    Tasks counters maintained by ``Pool``: queued, started, done (with
+    success), failed, cancelled, and results size (bytes).
+
+    Completions are counted by second over the last ``window`` seconds, in
+    order to provide rates over sliding windows.
+    """
+    total = None
+    """ Expected number of tasks (if known), used for ETA. """
+    window = 300
+    """ Maximum window for rates (seconds). """
+    rate_windows = (10, 60)
+    """ Windows of rates provided by ``snapshot()`` (seconds). """
+    eta_window = 60
+    """ Window of the rate used to compute ETA (seconds). """
+
+    def __init__(self, total=None, window=None, clock=time.monotonic):
+        if total is not None:
+            self.total = total
+        if window is not None:
+            self.window = window
+        self.clock = clock
+        self.lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        """ Reset counters. """
+        with self.lock:
+            self.queued_count = 0
+            self.started_count = 0
+            self.done_count = 0
+            self.failed_count = 0
+            self.cancelled_count = 0
+            self.bytes = 0
+            self.start_time = self.clock()
+            self._counts = [0] * self.window
+            self._seconds = [None] * self.window
+
+    @property
+    def finished_count(self):
+        """ Finished tasks (done, failed or cancelled). """
+        return self.done_count + self.failed_count + self.cancelled_count
+
+    @property
+    def pending(self):
+        """ Tasks waiting in executor's queue. """
+        return self.queued_count - self.started_count
+
+    @property
+    def in_flight(self):
+        """ Running tasks. """
+        return self.started_count - self.finished_count
+
+    def queued(self, event):
+        with self.lock:
+            self.queued_count += 1
+
+    def started(self, event):
+        with self.lock:
+            self.started_count += 1
+
+    def finished(self, event):
+        size = None if event.error is not None else result_bytes(event.result)
+        with self.lock:
+            if event.error is None:
+                self.done_count += 1
+                if size is not None:
+                    self.bytes += size
+            elif isinstance(event.error, CancelledError):
+                self.cancelled_count += 1
+            else:
+                self.failed_count += 1
+            second = int(self.clock())
+            index = second % self.window
+            if self._seconds[index] != second:
+                self._seconds[index] = second
+                self._counts[index] = 0
+            self._counts[index] += 1
+
+    def rate(self, seconds=60):
+        """ Return finished tasks by second over last ``seconds``. """
+        now = self.clock()
+        seconds = min(seconds, self.window)
+        since = int(now) - seconds
+        with self.lock:
+            count = sum(c for s, c in zip(self._seconds, self._counts)
+                        if s is not None and s > since)
+        elapsed = min(seconds, now - self.start_time)
+        return count / elapsed if elapsed > 0 else 0.0
+
+    def eta(self):
+        """ Return estimated remaining time (seconds), or None if unknown. """
+        if self.total is None:
+            return None
+        remaining = self.total - self.finished_count
+        if remaining <= 0:
+            return 0.0
+        rate = self.rate(self.eta_window)
+        return remaining / rate if rate else None
+
+    def snapshot(self):
+        """ Return progress as dict. """
+        with self.lock:
+            data = {'queued': self.queued_count, 'pending': self.pending,
+                    'in_flight': self.in_flight, 'done': self.done_count,
+                    'failed': self.failed_count,
+                    'cancelled': self.cancelled_count, 'bytes': self.bytes,
+                    'total': self.total,
+                    'elapsed': self.clock() - self.start_time}
+        data['rates'] = {w: self.rate(w) for w in self.rate_windows}
+        data['eta'] = self.eta()
+        return data
+
+
+class ProgressDisplay(Instrument):
+    """
+    Print pool's progress on terminal, at most every ``interval``
+    seconds (on task completion). On a TTY, the line is rewritten in
+    place.
+    """
+    progress = None
+    """ ``Progress`` instance. """
+    interval = 1.0
+    """ Minimal interval between updates (seconds). """
+
+    def __init__(self, progress, stream=None, interval=None,
+                 clock=time.monotonic):
+        self.progress = progress
+        self.stream = sys.stderr if stream is None else stream
+        if interval is not None:
+            self.interval = interval
+        self.clock = clock
+        self.last = None
+        self.lock = threading.Lock()
+        isatty = getattr(self.stream, 'isatty', None)
+        self.tty = bool(isatty and isatty())
+
+    def finished(self, event):
+        self.update()
+
+    def update(self, force=False):
+        """ Print progress if interval is elapsed (or ``force``). """
+        if not self.lock.acquire(blocking=force):
+            return
+        try:
+            now = self.clock()
+            if not force and self.last is not None and \
+                    now - self.last < self.interval:
+                return
+            self.last = now
+            line = self.format(self.progress.snapshot())
+            if self.tty:
+                self.stream.write('\r\033[K' + line)
+            else:
+                self.stream.write(line + '\n')
+            self.stream.flush()
+        finally:
+            self.lock.release()
+
+    def close(self):
+        """ Print final progress. """
+        self.update(force=True)
+        if self.tty:
+            self.stream.write('\n')
+            self.stream.flush()
+
+    def format(self, snapshot):
+        """ Return progress line from ``Progress.snapshot()``. """
+        total = snapshot['total']
+        finished = snapshot['done'] + snapshot['failed'] + \
+                   snapshot.get('cancelled', 0)
+        if total:
+            items = ['{}/{} ({:.1%})'.format(finished, total,
+                                             finished / total)]
+        else:
+            items = [str(finished)]
+        items.append('failed {}'.format(snapshot['failed']))
+        if snapshot.get('cancelled'):
+            items.append('cancelled {}'.format(snapshot['cancelled']))
+        items.append('in-flight {}'.format(snapshot['in_flight']))
+        rate = snapshot['rates'].get(min(snapshot['rates']), 0) \
+                    if snapshot['rates'] else 0
+        items.append('{:.1f}/s'.format(rate))
+        if snapshot['bytes']:
+            items.append(format_bytes(snapshot['bytes']))
+        if snapshot['eta'] is not None:
+            items.append('ETA {}'.format(
+                timedelta(seconds=round(snapshot['eta']))))
+        return ' | '.join(items)
+
+
+def format_bytes(size):
+    """ Return human readable size. """
+    for unit in ('B', 'kB', 'MB', 'GB'):
+        if size < 1024:
+            return '{:.1f} {}'.format(size, unit) if unit != 'B' else \
+                   '{} B'.format(size)
+        size /= 1024
+    return '{:.1f} TB'.format(size)
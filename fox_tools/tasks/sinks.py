@@ -0,0 +1,121 @@
+"""
+Sinks receiving completed futures' results from ``Pool``, so that they
+can be released by the pool (see ``Pool.keep_results``).
+
+Sinks receive `(task_key, result, error)`, ``error`` being the exception
+raised by the task (None on success).
+"""
+import json
+import pickle
+import threading
+
+
+__all__ = ('Sink', 'CallbackSink', 'QueueSink', 'SpoolSink', 'get_sink')
+
+
+class Sink:
+    """ Base sink class. """
+    def put(self, future):
+        """ Write completed future's result. """
+        if future.cancelled():
+            return
+        error = future.exception()
+        result = None if error is not None else future.result()
+        self.write(getattr(future, 'task_key', None), result, error)
+
+    def write(self, key, result, error):
+        raise NotImplementedError('write is not implemented by subclass')
+
+    def close(self):
+        """ Release resources (called at the end of pool's run). """
+        pass
+
+
+class CallbackSink(Sink):
+    """ Call ``func(key, result, error)``. """
+    def __init__(self, func):
+        self.func = func
+
+    def write(self, key, result, error):
+        self.func(key, result, error)
+
+
+class QueueSink(Sink):
+    """ Put `(key, result, error)` into queue. """
+    def __init__(self, queue):
+        self.queue = queue
+
+    def write(self, key, result, error):
+        self.queue.put((key, result, error))
+
+
+class SpoolSink(Sink):
+    """
+    Append results to a file, as JSON Lines (objects with ``key``,
+    ``result`` and ``error`` values, non serializable values being
+    converted to string) or pickle records (non picklable results being
+    stored as their ``repr``).
+    """
+    formats = ('jsonl', 'pickle')
+
+    def __init__(self, path, format='jsonl'):
+        if format not in self.formats:
+            raise ValueError('invalid format: {}'.format(format))
+        self.path = path
+        self.format = format
+        self.file = None
+        self.lock = threading.Lock()
+
+    def write(self, key, result, error):
+        error = None if error is None else repr(error)
+        with self.lock:
+            if self.file is None:
+                self.file = open(self.path, 'ab')
+            if self.format == 'jsonl':
+                data = json.dumps({'key': key, 'result': result,
+                                   'error': error}, default=str)
+                self.file.write(data.encode() + b'\n')
+            else:
+                try:
+                    data = pickle.dumps((key, result, error))
+                except Exception:
+                    data = pickle.dumps((key, repr(result), error))
+                self.file.write(data)
+
+    def close(self):
+        with self.lock:
+            if self.file is not None:
+                self.file.close()
+                self.file = None
+
+    @classmethod
+    def read(cls, path, format='jsonl'):
+        """ Yield `(key, result, error)` from spool file. """
+        with open(path, 'rb') as file:
+            if format == 'jsonl':
+                for line in file:
+                    if line.strip():
+                        data = json.loads(line)
+                        yield data['key'], data['result'], data['error']
+                return
+            while True:
+                try:
+                    yield pickle.load(file)
+                except EOFError:
+                    return
+
+
+def get_sink(sink):
+    """
+    Return ``Sink`` for provided value: sink instance, file path
+    (``SpoolSink``), queue (object with ``put`` method), or callable.
+    """
+    if sink is None or isinstance(sink, Sink):
+        return sink
+    if isinstance(sink, str):
+        return SpoolSink(sink)
+    if hasattr(sink, 'put'):
+        return QueueSink(sink)
+    if callable(sink):
+        return CallbackSink(sink)
+    raise TypeError('invalid sink: {}'.format(sink))
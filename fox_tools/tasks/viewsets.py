@@ -1,34 +1,117 @@
+from django.http import HttpResponse
 from rest_framework.decorators import action
+from rest_framework.pagination import LimitOffsetPagination
 from rest_framework import viewsets
 from rest_framework.response import Response
+from .metrics import Metrics
 from .pool import Pool
 
 
-__all__ = ('PoolViewSet',)
+__all__ = ('TasksPagination', 'PoolViewSet',)
+
+
+class TasksPagination(LimitOffsetPagination):
+    default_limit = 100
+    max_limit = 1000
 
 
 class PoolViewSet(viewsets.ViewSet):
     pool = None
     max_workers = 4
+    pagination_class = TasksPagination
+    """ Tasks list pagination (status's ``tasks`` mode). """
 
     def get_pool(self, create=False):
         if self.pool is None and create:
-            self.pool = Pool(max_workers=self.max_workers)
+            self.pool = Pool(max_workers=self.max_workers,
+                             instruments=[Metrics()])
         return self.pool
 
     @action(detail=False)
     def status(self, request):
+        """
+        Return pool's status and progress counters. Tasks are listed when
+        ``mode=tasks`` is provided as query parameter, paginated using
+        ``limit`` and ``offset``.
+        """
         pool = self.get_pool()
         status = {
-            'is_running': pool.is_running,
+            'is_running': bool(pool and pool.is_running),
         }
+        if not pool:
+            return Response(status)
+
+        status['paused'] = pool.paused
+        status['draining'] = pool.draining
+
+        status['tasks_count'] = len(pool.tasks)
+        status['progress'] = pool.progress.snapshot()
+        if request.query_params.get('mode') != 'tasks':
+            return Response(status)
 
-        if pool:
-            status['tasks'] = {
-                key: { 'done': task.done,
-                       'scheduled': task.scheduled,
-                       'futures': [(f.task_key, f.done()) for f in task.futures] }
-                for key, task in self.pool.tasks.items()
-            }
+        paginator = self.pagination_class()
+        tasks = paginator.paginate_queryset(list(pool.tasks.values()),
+                                            request, view=self)
+        status['tasks'] = {
+            task.key: { 'done': task.done,
+                        'scheduled': task.scheduled,
+                        'futures': [(f.task_key, f.done())
+                                    for f in task.futures] }
+            for task in tasks
+        }
+        status['next'] = paginator.get_next_link()
+        status['previous'] = paginator.get_previous_link()
         return Response(status)
 
+    @action(detail=False, methods=['post'])
+    def pause(self, request):
+        """ Pause pool: submitted tasks are not started until resumed. """
+        return self.control(request, lambda pool: pool.pause())
+
+    @action(detail=False, methods=['post'])
+    def resume(self, request):
+        """ Resume paused pool. """
+        return self.control(request, lambda pool: pool.resume())
+
+    @action(detail=False, methods=['post'])
+    def drain(self, request):
+        """
+        Stop submitting new tasks and let submitted ones complete. Run is
+        cancelled after ``timeout`` seconds, if provided.
+        """
+        timeout = request.data.get('timeout')
+        try:
+            timeout = None if timeout in (None, '') else float(timeout)
+        except (TypeError, ValueError):
+            return Response({'timeout': 'invalid value'}, status=400)
+        return self.control(request,
+                            lambda pool: pool.drain(timeout, wait=False))
+
+    @action(detail=False, methods=['post'])
+    def cancel(self, request):
+        """ Cancel current run. """
+        return self.control(request, lambda pool: pool.cancel())
+
+    def control(self, request, func):
+        """ Call ``func(pool)`` and return pool's state. """
+        pool = self.get_pool()
+        if pool is None:
+            return Response({'detail': 'no pool'}, status=404)
+        func(pool)
+        return Response({'is_running': pool.is_running,
+                         'paused': pool.paused,
+                         'draining': pool.draining,
+                         'cancelled': pool.cancel_token.cancelled})
+
+    @action(detail=False)
+    def metrics(self, request):
+        """
+        Return pool's metrics as JSON, or Prometheus text format when
+        ``export=prometheus`` is provided as query parameter.
+        """
+        pool = self.get_pool()
+        metrics = pool and pool.get_instrument(Metrics)
+        if request.query_params.get('export') == 'prometheus':
+            return HttpResponse(metrics.to_prometheus() if metrics else '',
+                                content_type='text/plain; version=0.0.4')
+        return Response(metrics.to_json() if metrics else [])
@@ -1,3 +1,4 @@
+from collections.abc import Mapping
 from itertools import islice
 import glob
 import os
@@ -6,8 +7,11 @@ import traceback
 
 from django import test
 
+from . import jsonlines
 
-__all__ = ('TestError', 'for_each_sample', 'SamplesTestCase', 'SerializerTestCase')
+
+__all__ = ('TestError', 'for_each_sample', 'SampleFiles', 'SamplesTestCase',
+           'SerializerTestCase')
 
 
 class TestError(Exception):
@@ -81,16 +85,50 @@ def for_each_sample(func):
     return wrapper
 
 
+class SampleFiles(Mapping):
+    """
+    Samples data by path, loaded on access using provided function (not
+    kept in memory).
+    """
+    def __init__(self, paths, load):
+        self.paths = paths
+        self.load = load
+
+    def __getitem__(self, path):
+        if path not in self.paths:
+            raise KeyError(path)
+        return self.load(path)
+
+    def __iter__(self):
+        return iter(self.paths)
+
+    def __len__(self):
+        return len(self.paths)
+
+
 class SamplesTestCase(test.TestCase):
     """
-    Read data samples from file once at test class setup.
+    Read data samples from file once at test class setup, or on access
+    when ``lazy``.
     """
     data_path = None
     """ Glob search string to data (excluding `data_dir`) """
     data_parser = None
     """ Function parsing data if required. For example: `json.loads`. """
+    data_format = None
+    """
+    If provided and no ``data_parser`` is, parse files using
+    ``jsonlines``: ``'json'`` files give a value, ``'jsonl'`` and
+    ``'concat'`` files a list of values.
+    """
     reader = None
     """ If provided use reader instance for data got from files. """
+    lazy = False
+    """
+    If True, samples are read each time they are accessed, values of
+    JSON Lines and concatenated files being streamed (see
+    ``load_data_file``).
+    """
 
     def setUp(self):
         pass
@@ -102,22 +140,43 @@ class SamplesTestCase(test.TestCase):
         super().setUpClass()
 
     @classmethod
-    def get_data_files(cls, path=None, reader=None):
+    def get_data_files(cls, path=None, reader=None, lazy=None):
         if reader is None:
             reader = cls.reader
+        if lazy is None:
+            lazy = cls.lazy
 
         path = os.path.abspath(path or cls.data_path)
-        paths = glob.glob(path) 
-        files = {}
-        for path in paths:
+        paths = glob.glob(path)
+        load = lambda path: cls.load_data_file(path, reader, stream=lazy)
+        if lazy:
+            return SampleFiles(paths, load)
+        return {path: load(path) for path in paths}
+
+    @classmethod
+    def load_data_file(cls, path, reader=None, stream=False):
+        """
+        Read and return content of sample file.
+
+        :param bool stream: if True, values of ``'jsonl'`` and \
+            ``'concat'`` files are returned as an iterator (parsing the \
+            file as it is consumed), unless a reader is provided.
+        """
+        if cls.data_parser is None and cls.data_format:
+            content = jsonlines.iter_file(path, cls.data_format)
+            if cls.data_format == 'json':
+                content = next(content)
+            elif not stream or reader:
+                content = list(content)
+        else:
             with open(path, 'r') as file:
                 content = file.read()
-                if cls.data_parser:
-                    content = cls.data_parser(content)
-                    if reader:
-                        content = cls.reader.read(content, force_data=True)
-                files[path] = content
-        return files
+            if not cls.data_parser:
+                return content
+            content = cls.data_parser(content)
+        if reader:
+            content = reader.read(content, force_data=True)
+        return content
 
     def zip_test(self, datas, results, test, many=False):
         """
@@ -1,7 +1,7 @@
 from django.db import models
 
 
-__all__ = ('NameValue',)
+__all__ = ('NameValue', 'UniqueNameValue', 'NameValueItem')
 
 
 class NameValue(models.Model):
@@ -9,3 +9,12 @@ class NameValue(models.Model):
     value = models.IntegerField()
 
 
+class UniqueNameValue(models.Model):
+    name = models.CharField(max_length=32, unique=True)
+    value = models.IntegerField()
+
+
+class NameValueItem(models.Model):
+    parent = models.ForeignKey(NameValue, models.DO_NOTHING,
+                               db_constraint=False)
+    value = models.IntegerField()
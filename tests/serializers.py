@@ -1,9 +1,12 @@
 from rest_framework import serializers
 
+from fox_tools.serializers import ModelListSerializer
+
 from . import models
 
 
-__all__ = ('TestSerializer', 'NameValueSerializer')
+__all__ = ('TestSerializer', 'NameValueSerializer', 'NameValueListSerializer',
+           'NameValueItemListSerializer')
 
 
 class TestSerializer(serializers.Serializer):
@@ -17,3 +20,17 @@ class NameValueSerializer(serializers.ModelSerializer):
         fields = ('name','value')
 
 
+class NameValueListSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = models.NameValue
+        fields = ('name','value')
+        list_serializer_class = ModelListSerializer
+        pk_field = 'name'
+
+
+class NameValueItemListSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = models.NameValueItem
+        fields = ('parent', 'value')
+        list_serializer_class = ModelListSerializer
+        pk_field = 'value'
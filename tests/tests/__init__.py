@@ -3,3 +3,7 @@ from .data import *
 from .serializers import *
 from .tasks import *
 
+from .sketches import *
+from .jsonlines import *
+from .data_summary import *
+from .http_scan import *
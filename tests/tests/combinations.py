@@ -68,6 +68,27 @@ class CombinationsTestCase(TestCase):
         combine = Combinations(input, vars, {'const': 'const'})
         results = list(combine.iter())
         self.assertEquals(results, expected)
+        self.assertEquals(len(combine), len(expected))
+
+    def test_iter_no_variables(self):
+        combine = Combinations(['/a/{c}', '/b/{c}'], consts={'c': 1})
+        self.assertEquals(list(combine.iter()), ['/a/1', '/b/1'])
+        self.assertEquals(len(combine), 2)
+
+    def test_count(self):
+        vars = [Variable('a', ['0', '10', '3'], 'range'),
+                Variable('b', ['2020-01-01', '2020-01-10', '2'], 'date_range')]
+        combine = Combinations('{a}/{b}', vars)
+        self.assertEquals([v.count() for v in vars], [4, 5])
+        self.assertEquals(len(combine), len(list(combine.iter())))
+
+        class Unknown(Variable):
+            def get(self):
+                return iter(self.args)
+        combine = Combinations('{a}', [Unknown('a', [1], 'get')])
+        self.assertIsNone(combine.count())
+        with self.assertRaises(TypeError):
+            len(combine)
 
 
 class FunctionsTestCase(TestCase):
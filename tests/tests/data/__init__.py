@@ -1,7 +1,9 @@
 from .pool import *
 from .reader import *
+from .record import *
 from .readers import *
 from .record_set import *
 from .relation import *
 from .model_record_set import *
+from .column_record_set import *
 
@@ -0,0 +1,143 @@
+from datetime import date, datetime, timedelta, timezone
+import warnings
+
+from django.test import TestCase
+
+from fox_tools.data import ColumnRecord, ColumnRecordSet
+from fox_tools.data.column_record_set import as_array
+from . import samples
+
+
+__all__ = ('ColumnRecordSetTestCase',)
+
+
+class ColumnRecordSetTestCase(TestCase):
+    values = samples.name_values
+
+    def setUp(self):
+        self.records = ColumnRecordSet('name', records=self.values[0])
+
+    def test_get(self):
+        for values in self.values[0]:
+            result = self.records.get(values['name'])
+            self.assertIsInstance(result, ColumnRecord)
+            self.assertEquals(result.data, values)
+            self.assertEquals(result.value, values['value'])
+
+    def test_commit_returns_view(self):
+        record = self.records.commit({'name': 'z', 'value': 0})
+        self.assertIsInstance(record, ColumnRecord)
+        record.value = 10
+        self.assertEquals(self.records['z'].value, 10)
+
+        record = self.records.commit({'name': 'a', 'value': 5}, override=True)
+        self.assertIsInstance(record, ColumnRecord)
+        record.value = 11
+        self.assertEquals(self.records['a'].value, 11)
+
+    def test_commit_update(self):
+        self.records.update(self.values[1])
+        self.assertEquals(len(self.values[1]), len(self.records))
+        for values in self.values[1]:
+            result = self.records.get(values['name'])
+            self.assertEquals(result.data, values)
+        self.assertTrue(self.records.is_updated('a'))
+        self.assertFalse(self.records.is_updated('d'))
+
+    def test_remove(self):
+        self.records.remove({'name': 'a'})
+        self.assertNotIn('a', self.records)
+        self.assertEquals(len(self.values[0]) - 1, len(self.records))
+        self.assertEquals(list(self.records.array('value')), [2, 3])
+
+    def test_array(self):
+        result = self.records.array('value')
+        self.assertEquals(result.dtype.kind, 'i')
+        self.assertEquals(list(result), [v['value'] for v in self.values[0]])
+
+    def test_filter(self):
+        result = self.records.filter(lambda r: r.array('value') >= 2)
+        self.assertEquals(list(result.keys()), ['b', 'c'])
+        result = self.records.filter(name='a')
+        self.assertEquals(list(result.keys()), ['a'])
+        self.assertEquals(result['a'].data, self.values[0][0])
+
+    def test_select(self):
+        result = self.records.select('name')
+        self.assertEquals(list(result.columns), ['name'])
+        self.assertEquals(len(result), len(self.records))
+
+    def test_diff(self):
+        other = self.records.clone()
+        other.update(self.values[1][:1])
+        other.remove({'name': 'c'})
+        other.commit({'name': 'z', 'value': 0})
+        created, updated, deleted = other.diff(self.records)
+        self.assertEquals(created, ['z'])
+        self.assertEquals(updated, ['a'])
+        self.assertEquals(deleted, ['c'])
+
+    def test_operators(self):
+        other = ColumnRecordSet('name', records=self.values[1][2:])
+        self.assertEquals(set((self.records | other).keys()),
+                          {'a', 'b', 'c', 'd', 'v'})
+        self.assertEquals(set((self.records & other).keys()), {'c'})
+        self.assertEquals(set((self.records - other).keys()), {'a', 'b'})
+        result = self.records + other
+        self.assertEquals(result['c'].value, 13)
+        self.assertEquals(self.records['c'].value, 3)
+
+    def test_clone_copy_on_write(self):
+        columns = self.records.records.columns
+        clone = self.records.clone()
+        self.assertIs(clone.records.columns['value'], columns['value'])
+        self.assertIs(clone.records.rows, self.records.records.rows)
+
+        clone['a'].value = 10
+        self.assertIsNot(clone.records.columns['value'], columns['value'])
+        self.assertIs(clone.records.columns['name'], columns['name'])
+        clone.commit({'name': 'z', 'value': 0})
+        self.assertEquals(self.records['a'].value, 1)
+        self.assertNotIn('z', self.records)
+        self.assertFalse(self.records.is_updated('a'))
+
+        self.records.commit({'name': 'b', 'value': 20})
+        self.assertEquals(clone['b'].value, 2)
+        self.assertEquals(self.records['b'].value, 20)
+        self.assertEquals(clone['a'].value, 10)
+
+    def test_diff_missing_values(self):
+        items = [{'name': 'a', 'date': None, 'time': None, 'value': 1.0},
+                 {'name': 'b', 'date': date(2020, 1, 1),
+                  'time': datetime(2020, 1, 1), 'value': float('nan')}]
+        records = ColumnRecordSet('name', records=items)
+        other = ColumnRecordSet('name', records=items)
+        self.assertEquals(records.diff(other), ([], [], []))
+
+        other.commit({'name': 'a', 'date': date(2020, 1, 2)})
+        other.commit({'name': 'b', 'value': 2.0})
+        self.assertEquals(records.diff(other), ([], ['a', 'b'], []))
+
+    def test_typed_columns(self):
+        items = [{'name': 'a', 'value': 1, 'date': date(2020, 1, 1)},
+                 {'name': 'b', 'value': 2, 'date': None}]
+        records = ColumnRecordSet('name', records=items)
+        columns = records.records.columns
+        self.assertEquals(columns['value'].dtype, 'int64')
+        self.assertEquals(columns['date'].dtype, 'datetime64[D]')
+        self.assertEquals(records['a'].data, items[0])
+        self.assertEquals(records['b'].data, items[1])
+
+        records.commit({'name': 'b', 'value': 'x'})
+        self.assertEquals(columns['value'].dtype, object)
+        self.assertEquals(records['a'].value, 1)
+        self.assertEquals(records['b'].value, 'x')
+
+    def test_as_array_aware_datetimes(self):
+        tz = timezone(timedelta(hours=2))
+        values = [datetime(2020, 1, 1, 12, tzinfo=tz), None]
+        with warnings.catch_warnings():
+            warnings.simplefilter('error')
+            array = as_array(values)
+        self.assertEquals(array.dtype, 'datetime64[us]')
+        self.assertEquals(array[0].item(), datetime(2020, 1, 1, 10))
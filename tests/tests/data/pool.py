@@ -36,3 +36,20 @@ class PoolTestCase(TestCase):
             for index, record in records.items():
                 result = self.pool.get(key, index)
                 self.assertEquals(record.data, result.data)
+
+    def test_clone(self):
+        for key, records in enumerate(self.records):
+            self.pool.register(key, records)
+        clone = self.pool.clone()
+        for key, records in enumerate(self.records):
+            result = clone.get(key)
+            self.assertIsNot(records, result)
+            self.assertEquals(set(records.keys()), set(result.keys()))
+
+    def test_concurrent(self):
+        pool = Pool({0: self.records[0]}, concurrent=True)
+        self.assertIsNotNone(self.records[0].locks)
+        records = RecordSet('name')
+        self.assertIs(records, pool.setdefault(1, records))
+        self.assertIs(records, pool.setdefault(1, RecordSet('name')))
+        self.assertIsNotNone(records.locks)
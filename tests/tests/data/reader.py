@@ -81,4 +81,64 @@ class ReaderTestCase(TestCase):
             self.assertIsNotNone(serializer)
             self.assertTrue(serializer.many)
 
-
+    def test_get_serializer_fields(self):
+        serializer = self.reader.get_serializer({'name': 'a', 'value': 1})
+        other = self.reader.get_serializer({'name': 'b', 'value': 2})
+        plan = self.reader.get_field_plan(NameValueSerializer)
+        self.assertEquals(list(serializer.fields), list(plan))
+        for name, field in serializer.fields.items():
+            self.assertIs(field.parent, serializer)
+            self.assertIsNot(field, plan[name])
+            self.assertIsNot(field, other.fields[name])
+        self.assertTrue(serializer.is_valid())
+        self.assertEquals(serializer.validated_data, {'name': 'a', 'value': 1})
+
+    def test_get_serializer_many_fields(self):
+        serializer = self.reader.get_serializer([{'name': 'a', 'value': 1}],
+                                                many=True)
+        self.assertIs(serializer.child.fields['name'].parent, serializer.child)
+        self.assertTrue(serializer.is_valid())
+
+    def test_get_serializer_context_fields(self):
+        class ContextSerializer(serializers.Serializer):
+            name = serializers.CharField()
+
+            def get_fields(self):
+                fields = super().get_fields()
+                if self.context.get('with_value'):
+                    fields['value'] = serializers.IntegerField()
+                return fields
+
+        reader = Reader(serializer_class=ContextSerializer)
+        self.assertFalse(reader.is_cacheable(ContextSerializer))
+        self.assertTrue(reader.is_cacheable(NameValueSerializer))
+        data = {'name': 'a', 'value': 1}
+        serializer = reader.get_serializer(data, context={'with_value': True})
+        self.assertEquals(list(serializer.fields), ['name', 'value'])
+        serializer = reader.get_serializer(data)
+        self.assertEquals(list(serializer.fields), ['name'])
+        self.assertNotIn(ContextSerializer, Reader.field_plans)
+
+        reader.cache_fields = True
+        self.assertTrue(reader.is_cacheable(ContextSerializer))
+
+    def test_get_serializer_children_fields(self):
+        class TagsSerializer(serializers.Serializer):
+            tags = serializers.ListField(child=serializers.CharField())
+            scores = serializers.DictField(
+                child=serializers.ListField(child=serializers.IntegerField()))
+
+        reader = Reader(serializer_class=TagsSerializer,
+                        context={'key': 'value'})
+        serializer = reader.get_serializer({'tags': ['a'],
+                                            'scores': {'a': ['1']}})
+        plan = reader.get_field_plan(TagsSerializer)
+        self.assertIsNot(plan, Reader.field_plans.get(TagsSerializer))
+        tags, scores = serializer.fields['tags'], serializer.fields['scores']
+        self.assertIsNot(tags.child, plan['tags'].child)
+        self.assertIs(tags.child.parent, tags)
+        self.assertIs(scores.child.child.parent, scores.child)
+        self.assertEquals(scores.child.child.context, {'key': 'value'})
+        self.assertTrue(serializer.is_valid())
+        self.assertEquals(serializer.validated_data,
+                          {'tags': ['a'], 'scores': {'a': [1]}})
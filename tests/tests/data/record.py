@@ -0,0 +1,72 @@
+from django.test import TestCase
+
+from fox_tools.data import Record, CompactRecord, RecordSet
+from . import samples
+
+
+__all__ = ('RecordTestCase', 'CompactRecordTestCase')
+
+
+class RecordTestCase(TestCase):
+    def test_getattr(self):
+        record = Record(name='a', value=1)
+        self.assertEquals(record.name, 'a')
+        self.assertEquals(record.value, 1)
+
+    def test_setattr(self):
+        record = Record(name='a', value=1)
+        record.value = 2
+        self.assertEquals(record.data, {'name': 'a', 'value': 2})
+        self.assertNotIn('value', getattr(record, '__dict__', {}))
+
+    def test_clone(self):
+        record = Record(name='a', value=1)
+        clone = record.clone()
+        self.assertIsNot(record.data, clone.data)
+        self.assertEquals(record.data, clone.data)
+
+
+class CompactRecordTestCase(TestCase):
+    fields = ('name', 'value')
+
+    def setUp(self):
+        self.record_class = Record.compact(self.fields)
+
+    def test_compact_cached(self):
+        self.assertIs(self.record_class, Record.compact(self.fields))
+        self.assertTrue(issubclass(self.record_class, CompactRecord))
+
+    def test_data(self):
+        for values in samples.name_values[0]:
+            record = self.record_class(**values)
+            self.assertEquals(record.data, values)
+            self.assertEquals(record.name, values['name'])
+
+    def test_reserved_field(self):
+        for field in ('data', 'save', '_extra', '_pool_updated'):
+            with self.assertRaisesRegex(ValueError, field):
+                Record.compact(('name', field))
+
+    def test_unknown_field(self):
+        record = self.record_class(name='a', value=1, extra=2)
+        self.assertEquals(record.extra, 2)
+        self.assertEquals(record.data, {'name': 'a', 'value': 1, 'extra': 2})
+
+    def test_missing_field(self):
+        record = self.record_class(name='a')
+        self.assertEquals(record.data, {'name': 'a'})
+        self.assertIsNone(getattr(record, 'value', None))
+
+    def test_record_set(self):
+        record_set = RecordSet('name', fields=self.fields)
+        record_set.update(samples.name_values[0])
+        record_set.update(samples.name_values[1])
+        for values in samples.name_values[1]:
+            result = record_set.get(values['name'])
+            self.assertIsInstance(result, self.record_class)
+            self.assertEquals(result.data, values)
+
+    def test_no_instance_dict(self):
+        record = self.record_class(name='a', value=1, extra=2)
+        self.assertEquals(record.data, {'name': 'a', 'value': 1, 'extra': 2})
+        self.assertFalse(hasattr(record, '__dict__'))
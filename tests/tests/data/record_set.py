@@ -1,6 +1,9 @@
+from concurrent.futures import ThreadPoolExecutor
+
 from django.test import TestCase
 
-from fox_tools.data import Record, RecordSet
+from fox_tools.data import Index, Record, RecordSet
+from fox_tools.data.index import key_getter
 from . import samples
 
 
@@ -41,6 +44,23 @@ class RecordSetTestCase(TestCase):
             index = self.records.index_of(record)
             self.assertEquals(index, record.value)
 
+    def test_index_of_index_callable_dict(self):
+        self.records.index = lambda r: r.value
+        for record in self.values[0]:
+            index = self.records.index_of(record.data)
+            self.assertEquals(index, record.value)
+
+    def test_index_of_composite(self):
+        self.records.index = ('name', 'value')
+        for record in self.values[0]:
+            expected = (record.name, record.value)
+            self.assertEquals(expected, self.records.index_of(record))
+            self.assertEquals(expected, self.records.index_of(record.data))
+
+    def test_index_of_none(self):
+        self.records.index = None
+        self.assertIsNone(self.records.index_of(self.values[0][0]))
+
     def test_commit_new_record(self):
         record = Record(name='a2', value=3)
         result = self.records.commit(record)
@@ -116,3 +136,182 @@ class RecordSetTestCase(TestCase):
             self.assertTrue(record.name in self.records)
             self.assertFalse(record.value in self.records)
             self.assertTrue(record in self.records)
+
+    def test_clone(self):
+        clone = self.records.clone()
+        clone.remove(self.values[0][0])
+        self.assertIn(self.values[0][0], self.records)
+        self.assertEquals(len(self.records) - 1, len(clone))
+
+    def test_clone_copy_on_write(self):
+        records = self.records.records
+        clone = self.records.clone()
+        self.assertIs(records, self.records.records)
+        self.assertIs(records, clone.records.base)
+        for record in self.records:
+            self.assertIs(record, clone.records[record.name])
+
+        record = self.values[1][0]
+        result = clone.commit(record.data)
+        self.assertEquals(record.data, result.data)
+        self.assertIsNot(self.records[record.name], result)
+        self.assertEquals(self.values[0][0].data,
+                          self.records[record.name].data)
+
+        self.records.remove(self.values[0][1])
+        self.assertIn(self.values[0][1], clone)
+        clone.commit({'name': 'z', 'value': 0})
+        self.assertNotIn('z', self.records)
+        self.assertEquals(len(self.values[0]) + 1, len(clone))
+        self.assertEquals(len(self.values[0]) - 1, len(self.records))
+
+    def test_clone_get_copy_on_write(self):
+        for record in self.records:
+            record._pool_updated = True
+        clone = self.records.clone()
+        name = self.values[0][0].name
+        record = clone[name]
+        self.assertIsNot(self.records.records[name], record)
+        self.assertIs(record, clone.get(name))
+        record.value = -1
+        self.assertEquals(self.values[0][0].value, self.records[name].value)
+
+        clone.save()
+        self.assertTrue(all(r._pool_updated for r in self.records))
+        self.assertFalse(any(r._pool_updated for r in clone))
+
+        # parent updates do not leak into the clone either
+        self.records.commit({'name': name, 'value': -2})
+        self.assertEquals(-1, clone[name].value)
+        self.assertEquals(-2, self.records[name].value)
+
+    def test_or(self):
+        other = RecordSet('name', records=self.values[1])
+        result = self.records | other
+        self.assertEquals(len(self.values[1]), len(result))
+        for record in self.values[1]:
+            self.assertIs(record, result[record.name])
+
+    def test_and(self):
+        other = RecordSet('name', records=self.values[1][:2])
+        result = self.records & other
+        self.assertEquals(set(result.keys()), {'a', 'b'})
+        self.assertIs(self.records['a'], result['a'])
+
+    def test_sub(self):
+        other = RecordSet('name', records=self.values[1][:2])
+        result = self.records - other
+        self.assertEquals(set(result.keys()), {'c'})
+
+    def test_add(self):
+        other = RecordSet('name', records=self.values[1])
+        result = self.records + other
+        for record in self.values[1]:
+            self.assertEquals(record.data, result[record.name].data)
+        for record in self.values[0]:
+            self.assertEquals(record.data, self.records[record.name].data)
+
+
+class RecordSetIndexesTestCase(TestCase):
+    values = RecordSetTestCase.values
+
+    def setUp(self):
+        self.records = RecordSet('name', indexes={
+            'value': 'value',
+            'pair': ('name', 'value'),
+            'parity': Index(lambda r: r.value % 2, unique=False),
+        }, records=(r.clone() for r in self.values[0]))
+
+    def test_key_getter_callable(self):
+        records = []
+        get = key_getter(lambda r: records.append(r) or r.value % 2)
+        self.assertEquals([get({'value': 1}), get({'value': 2})], [1, 0])
+        self.assertIs(records[0], records[1])
+        self.assertIsNone(records[0].data)
+        self.assertEquals(get(Record(value=3)), 1)
+
+    def test_get_by(self):
+        for record in self.values[0]:
+            self.assertEquals(record.data,
+                              self.records.get_by('value', record.value).data)
+            result = self.records.get_by('pair', (record.name, record.value))
+            self.assertEquals(record.data, result.data)
+        self.assertIsNone(self.records.get_by('value', -1))
+
+    def test_get_by_not_unique(self):
+        result = self.records.get_by('parity', 1)
+        self.assertEquals(sorted(r.name for r in result), ['a', 'c'])
+        self.assertEquals(self.records.get_by('parity', 3), [])
+
+    def test_commit_update(self):
+        self.records.update(r.clone() for r in self.values[1])
+        for record in self.values[0]:
+            self.assertIsNone(self.records.get_by('value', record.value))
+        for record in self.values[1]:
+            result = self.records.get_by('value', record.value)
+            self.assertEquals(record.data, result.data)
+        result = self.records.get_by('parity', 1)
+        self.assertEquals(sorted(r.name for r in result), ['a', 'c', 'v'])
+
+    def test_remove(self):
+        record = self.values[0][0]
+        self.records.remove(record)
+        self.assertIsNone(self.records.get_by('value', record.value))
+        result = self.records.get_by('parity', 1)
+        self.assertEquals([r.name for r in result], ['c'])
+
+    def test_setitem_delitem(self):
+        self.records['a'] = Record(name='a', value=100)
+        self.assertIsNone(self.records.get_by('value', 1))
+        self.assertEquals(self.records.get_by('value', 100).name, 'a')
+        del self.records['a']
+        self.assertIsNone(self.records.get_by('value', 100))
+
+    def test_clone(self):
+        clone = self.records.clone()
+        clone.remove(self.values[0][0])
+        self.assertIsNone(clone.get_by('value', 1))
+        self.assertIsNotNone(self.records.get_by('value', 1))
+
+    def test_clone_not_unique(self):
+        clone = self.records.clone()
+        clone.commit({'name': 'e', 'value': 5})
+        clone.remove(self.values[0][0])
+        self.assertEquals([r.name for r in clone.get_by('parity', 1)],
+                          ['c', 'e'])
+        self.assertEquals([r.name for r in self.records.get_by('parity', 1)],
+                          ['a', 'c'])
+
+
+class ConcurrentRecordSetTestCase(TestCase):
+    def setUp(self):
+        self.records = RecordSet('name', concurrent=4,
+                                 indexes={'value': 'value'})
+
+    def test_commit(self):
+        def commit(i):
+            for j in range(100):
+                self.records.commit({'name': j, 'value': j})
+                self.records.commit({'name': j, 'value': j})
+
+        with ThreadPoolExecutor(max_workers=4) as executor:
+            list(executor.map(commit, range(8)))
+        self.assertEquals(len(self.records), 100)
+        for j in range(100):
+            self.assertEquals(self.records.get_by('value', j).name, j)
+
+    def test_get_or_create(self):
+        def get_or_create(i):
+            return self.records.get_or_create({'name': 'a', 'value': i})
+
+        with ThreadPoolExecutor(max_workers=4) as executor:
+            results = list(executor.map(get_or_create, range(16)))
+        self.assertEquals(sum(created for _, created in results), 1)
+        record = self.records['a']
+        self.assertTrue(all(r is record for r, _ in results))
+
+    def test_clone(self):
+        self.records.commit({'name': 'a', 'value': 1})
+        clone = self.records.clone()
+        self.assertIsNotNone(clone.locks)
+        self.assertIsNot(clone.locks, self.records.locks)
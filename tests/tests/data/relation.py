@@ -20,7 +20,7 @@ class RelationTestCase(TestCase):
     
     def setUp(self):
         self.pool = Pool()
-        self.pool.register(0, RecordSet('name'))
+        self.pool.register(0, RecordSet('name', indexes={'value': 'value'}))
         self.pool.update(0, self.records)
 
     def test_get_reference_data(self):
@@ -36,7 +36,13 @@ class RelationTestCase(TestCase):
             expected = self.pool.get(0, value['nested']['rel'])
             result = relation.resolve(self.pool, value)
             self.assertEquals(expected, result)
-    
-
 
+    def test_resolve_index(self):
+        relation = Relation(0, 'rel', '$.nested', index='value')
+        for record in self.records:
+            expected = self.pool.get(0, record.name)
+            result = relation.resolve(self.pool, {'nested': {'rel': record.value}})
+            self.assertIs(expected, result)
 
+        with self.assertRaises(KeyError):
+            relation.resolve(self.pool, {'nested': {'rel': -1}})
@@ -0,0 +1,102 @@
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+import json
+import os
+import tempfile
+import threading
+
+from django.test import TestCase
+
+from fox_tools.data import Reader
+from fox_tools.management.commands.data_summary import Summary, \
+    SummaryPool, init_process
+
+
+__all__ = ('SummaryTestCase',)
+
+
+class SummaryTestCase(TestCase):
+    def setUp(self):
+        self.dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.dir.cleanup)
+        # root/{0..2}.json, root/sub/{0..2}.json, root/sub/deep/{0..2}.json
+        path = self.dir.name
+        for depth, name in enumerate(('', 'sub', 'deep')):
+            path = os.path.join(path, name)
+            os.makedirs(path, exist_ok=True)
+            for i in range(3):
+                self.write(os.path.join(path, '{}.json'.format(i)),
+                           {'name': 'n{}'.format(i), 'depth': depth,
+                            'tags': ['a', 'b']})
+
+    def write(self, path, data):
+        with open(path, 'w') as file:
+            json.dump(data, file)
+
+    def get_task(self, files, keys=('$.name', '$.depth'), **kwargs):
+        readers = {k: Reader(k, many=True) for k in keys}
+        return Summary(None, files=files, readers=readers, chunk_size=2,
+                       **kwargs)
+
+    def assertCounters(self, counters):
+        self.assertEqual(counters['$.name'],
+                         Counter({'n0': 3, 'n1': 3, 'n2': 3}))
+        self.assertEqual(counters['$.depth'], Counter({0: 3, 1: 3, 2: 3}))
+
+    def test_run(self):
+        self.assertCounters(self.get_task([self.dir.name]).run())
+
+    def test_run_unhashable(self):
+        counters = self.get_task([self.dir.name], keys=('$.tags',)).run()
+        self.assertEqual(counters['$.tags'], Counter({'["a", "b"]': 9}))
+
+    def test_pool(self):
+        pool = SummaryPool(max_workers=2)
+        pool.submit(self.get_task([self.dir.name]).clone('root',
+                                                         [self.dir.name]))
+        pool.run()
+        self.assertCounters(pool.results)
+        # directories and chunks of 2 files: root, sub, deep and 6 chunks
+        self.assertEqual(pool.progress.done_count, 9)
+        self.assertEqual(pool.tasks, {})
+
+    def test_pool_submit_dir(self):
+        # reading a root file waits for a file of a sub-sub-directory to be
+        # read: this requires sub-directories' tasks to start without
+        # waiting for other running tasks to complete.
+        deep_read = threading.Event()
+        waited = []
+
+        class WaitSummary(Summary):
+            def read_file(self, path, counters):
+                if os.sep + 'deep' + os.sep in path:
+                    deep_read.set()
+                elif os.path.dirname(path) == root:
+                    waited.append(deep_read.wait(5))
+                super().read_file(path, counters)
+
+        root = self.dir.name
+        pool = SummaryPool(max_workers=4)
+        readers = {'$.name': Reader('$.name', many=True)}
+        pool.submit(WaitSummary('root', files=[root], readers=readers,
+                                chunk_size=2))
+        pool.run()
+        self.assertEqual(waited, [True] * 3)
+
+    def test_pool_approx(self):
+        pool = SummaryPool(max_workers=2)
+        task = self.get_task([self.dir.name],
+                             approx={'k': 10, 'sample': 2, 'p': 8})
+        pool.submit(task.clone('root', [self.dir.name]))
+        pool.run()
+        summary = pool.results['$.depth'].summary(3)
+        self.assertEqual(summary['count'], 9)
+        self.assertEqual(summary['distinct'], 3)
+
+    def test_processes(self):
+        with ProcessPoolExecutor(2, initializer=init_process) as processes:
+            pool = SummaryPool(max_workers=2)
+            task = self.get_task([self.dir.name], processes=processes)
+            pool.submit(task.clone('root', [self.dir.name]))
+            pool.run()
+        self.assertCounters(pool.results)
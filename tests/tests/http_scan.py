@@ -0,0 +1,26 @@
+import os
+import tempfile
+
+from django.test import TestCase
+
+from fox_tools.combinations import Combinations, Variable
+from fox_tools.management.commands.http_scan import Command
+from fox_tools.tasks import Pool
+
+
+__all__ = ('HttpScanTestCase',)
+
+
+class HttpScanTestCase(TestCase):
+    def test_skip_total(self):
+        urls = ['http://host/{n}']
+        variables = [Variable.parse('n:ints=1,2,3')]
+        with tempfile.TemporaryDirectory() as directory:
+            open(os.path.join(directory, 'host_2'), 'w').close()
+            command = Command()
+            command.pool = Pool()
+            command.pool.progress.total = Combinations(urls, variables).count()
+            requests = list(command.iter(urls, variables, directory,
+                                         skip=True))
+        self.assertEqual(len(requests), 2)
+        self.assertEqual(command.pool.progress.total, 2)
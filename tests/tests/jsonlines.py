@@ -0,0 +1,98 @@
+from collections.abc import Iterator
+import json
+import os
+import tempfile
+
+from django.test import TestCase
+
+from fox_tools import jsonlines
+from fox_tools.test import SampleFiles, SamplesTestCase
+
+
+__all__ = ('JSONLinesTestCase', 'SampleFilesTestCase')
+
+
+class TempFilesMixin:
+    def write(self, name, content):
+        path = os.path.join(self.dir.name, name)
+        with open(path, 'w') as file:
+            file.write(content)
+        return path
+
+    def setUp(self):
+        self.dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.dir.cleanup)
+
+
+class JSONLinesTestCase(TempFilesMixin, TestCase):
+    values = [{'a': 1}, [1, 2], 'b', 12.5, None]
+
+    def tearDown(self):
+        jsonlines.set_backend()
+
+    def test_iter_jsonl(self):
+        content = '\n'.join(json.dumps(v) for v in self.values) + '\n\n'
+        path = self.write('values.jsonl', content)
+        for backend in ('json', 'orjson'):
+            if backend == 'orjson' and jsonlines.orjson is None:
+                continue
+            jsonlines.set_backend(backend)
+            self.assertEqual(jsonlines.get_backend(), backend)
+            self.assertEqual(list(jsonlines.iter_file(path, 'jsonl')),
+                             self.values)
+
+    def test_iter_empty(self):
+        path = self.write('empty.jsonl', '')
+        self.assertEqual(list(jsonlines.iter_jsonl(path)), [])
+
+    def test_iter_concatenated(self):
+        content = ' '.join(json.dumps(v) for v in self.values) + ' 123'
+        path = self.write('values.json', content)
+        self.assertEqual(list(jsonlines.iter_concatenated(path, chunk_size=3)),
+                         self.values + [123])
+
+    def test_iter_concatenated_chunks(self):
+        values = [{'a': i, 'b': 'x' * (i % 7)} for i in range(200)]
+        path = self.write('values.json',
+                          '\n'.join(json.dumps(v) for v in values))
+        for chunk_size in (1, 10, 64, 1 << 20):
+            self.assertEqual(list(jsonlines.iter_concatenated(
+                path, chunk_size=chunk_size)), values)
+
+    def test_iter_concatenated_invalid(self):
+        path = self.write('values.json', '{"a": 1} {"a"')
+        with self.assertRaises(ValueError):
+            list(jsonlines.iter_concatenated(path))
+
+    def test_iter_json(self):
+        path = self.write('values.json', json.dumps(self.values))
+        self.assertEqual(list(jsonlines.iter_file(path)), [self.values])
+
+    def test_invalid(self):
+        with self.assertRaises(ValueError):
+            jsonlines.set_backend('yaml')
+        with self.assertRaises(ValueError):
+            jsonlines.iter_file('path', 'yaml')
+
+
+class SampleFilesTestCase(TempFilesMixin, TestCase):
+    class Samples(SamplesTestCase):
+        data_format = 'jsonl'
+
+    def test_get_data_files(self):
+        path = self.write('a.jsonl', '{"a": 1}\n{"a": 2}\n')
+        files = self.Samples.get_data_files(os.path.join(self.dir.name,
+                                                         '*.jsonl'))
+        self.assertEqual(files, {path: [{'a': 1}, {'a': 2}]})
+
+    def test_get_data_files_lazy(self):
+        path = self.write('a.jsonl', '{"a": 1}\n')
+        files = self.Samples.get_data_files(
+            os.path.join(self.dir.name, '*.jsonl'), lazy=True)
+        self.assertIsInstance(files, SampleFiles)
+        self.assertEqual(list(files), [path])
+        self.write('a.jsonl', '{"a": 2}\n{"a": 3}\n')
+        values = files[path]
+        self.assertIsInstance(values, Iterator)
+        self.assertEqual(next(values), {'a': 2})
+        self.assertEqual(list(values), [{'a': 3}])
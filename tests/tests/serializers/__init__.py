@@ -1,3 +1,3 @@
 from .fields import *
-# from .model_list import *
+from .model_list import *
 
@@ -1,5 +1,8 @@
+import copy
+
 from django.test import TestCase
-from fox_tools.serializers import Unsafe, MapField #, NestedField
+from fox_tools.serializers import Unsafe, MapField, MapTable, \
+    TimerField #, NestedField
 
 
 class MapFieldTestCase(TestCase):
@@ -32,6 +35,54 @@ class MapFieldTestCase(TestCase):
         self.assertEquals(field.to_internal_value(1), 'a')
         self.assertEquals(field.to_internal_value(-1), Unsafe(-1)) 
 
+    def test_deepcopy_shares_table(self):
+        field = MapField(map=self.map)
+        field_copy = copy.deepcopy(field)
+        self.assertIs(field_copy.table, field.table)
+        self.assertEquals(field_copy.to_internal_value(2), 'b')
+
+    def test_class_map(self):
+        class Field(MapField):
+            map = {'x': 'X'}
+
+        field, other = Field(), Field()
+        self.assertIs(field.table, other.table)
+        self.assertEquals(field.to_representation('x'), 'X')
+        self.assertEquals(copy.deepcopy(field).to_internal_value('X'), 'x')
+
+    def test_case_insensitive(self):
+        field = MapField(map={'Yes': True, 'No': False}, case_insensitive=True)
+        self.assertEquals(field.to_representation('YES'), True)
+        self.assertEquals(field.to_internal_value(False), 'No')
+        field_copy = copy.deepcopy(field)
+        self.assertIs(field_copy.table, field.table)
+        self.assertEquals(field_copy.to_representation('no'), False)
+
+    def test_table_normalize(self):
+        table = MapTable({'a': 'A'}, normalize=str.strip)
+        self.assertEquals(table.get(' a '), 'A')
+        self.assertEquals(table.get_reverse('A '), 'a')
+        self.assertIsNone(table.get('b'))
+
+
+class TimerFieldTestCase(TestCase):
+    def test_to_internal_value(self):
+        field = TimerField()
+        self.assertEquals(field.to_internal_value("1'02\"30"), 62030)
+        self.assertEquals(field.to_internal_value(1200), 1200)
+        self.assertIsNone(field.to_internal_value('x'))
+
+    def test_to_internal_values(self):
+        values = ["1'02\"30", "0'00\"05", "12'3\"400"]
+        array = TimerField().to_internal_values(values)
+        self.assertEquals(array.dtype, 'int64')
+        self.assertEquals(array.tolist(), [62030, 5, 723400])
+
+    def test_to_internal_values_invalid(self):
+        array = TimerField().to_internal_values(
+            ["1'02\"30", 'x', "1'2", 1200, None])
+        self.assertEquals(array.tolist(), [62030, None, None, 1200, None])
+
 
 # class NestedFieldTestCase(TestCase):
 #     def setUp():
@@ -0,0 +1,84 @@
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+
+from tests.models import NameValue, NameValueItem
+from tests.serializers import NameValueListSerializer, \
+    NameValueItemListSerializer
+
+
+__all__ = ('ModelListSerializerTestCase',)
+
+
+class ModelListSerializerTestCase(TestCase):
+    def setUp(self):
+        NameValue.objects.bulk_create(NameValue(name=str(i), value=i)
+                                      for i in range(10))
+
+    def save(self, data, instance=None, **meta):
+        serializer = NameValueListSerializer(instance, data=data, many=True)
+        serializer.__dict__.update(meta)
+        serializer.is_valid(raise_exception=True)
+        return serializer.save()
+
+    def test_create(self):
+        objs = self.save([{'name': 'a', 'value': 1}, {'name': 'b', 'value': 2}])
+        self.assertEqual(len(objs), 2)
+        self.assertEqual(NameValue.objects.count(), 12)
+
+    def test_create_batches(self):
+        data = [{'name': 'n{}'.format(i), 'value': i} for i in range(10)]
+        with CaptureQueriesContext(connection) as queries:
+            pks = self.save(data, batch_size=4, returns='pks')
+        self.assertEqual(len(queries.captured_queries), 3)
+        self.assertEqual(len(pks), 10)
+        self.assertEqual(NameValue.objects.filter(pk__in=pks).count(), 10)
+
+    def test_create_count(self):
+        data = [{'name': 'n{}'.format(i), 'value': i} for i in range(5)]
+        self.assertEqual(self.save(data, returns='count'), 5)
+
+    def test_update(self):
+        data = [{'name': str(i), 'value': i * 10} for i in range(2, 8)] + \
+               [{'name': 'new', 'value': -1}]
+        with CaptureQueriesContext(connection) as queries:
+            objs = self.save(data, NameValue.objects.all())
+        # select, insert, update, delete
+        self.assertEqual(len([q for q in queries.captured_queries
+                              if 'SAVEPOINT' not in q['sql']]), 4)
+        self.assertEqual([o.name for o in objs],
+                         [d['name'] for d in data])
+        values = dict(NameValue.objects.values_list('name', 'value'))
+        self.assertEqual(values, {d['name']: d['value'] for d in data})
+
+    def test_update_unchanged(self):
+        data = [{'name': str(i), 'value': i} for i in range(10)]
+        with CaptureQueriesContext(connection) as queries:
+            self.save(data, NameValue.objects.all())
+        self.assertEqual(len(queries.captured_queries), 1)
+
+    def test_update_delete_scope(self):
+        # same name as a deleted object, but out of updated queryset
+        other = NameValue.objects.create(name='7', value=100)
+        data = [{'name': str(i), 'value': i} for i in range(5)]
+        self.save(data, NameValue.objects.filter(value__lt=10))
+        self.assertEqual(NameValue.objects.count(), 6)
+        self.assertTrue(NameValue.objects.filter(pk=other.pk).exists())
+
+    def test_update_foreign_key(self):
+        parents = list(NameValue.objects.order_by('pk')[:2])
+        NameValueItem.objects.bulk_create(
+            NameValueItem(parent=parents[0], value=i) for i in range(3))
+        data = [{'parent': parents[i % 2].pk, 'value': i} for i in range(3)]
+        serializer = NameValueItemListSerializer(
+            NameValueItem.objects.all(), data=data, many=True)
+        serializer.is_valid(raise_exception=True)
+        with CaptureQueriesContext(connection) as queries:
+            serializer.save()
+        # select and update, related objects are not fetched
+        self.assertEqual(len([q for q in queries.captured_queries
+                              if 'SAVEPOINT' not in q['sql']]), 2)
+        self.assertEqual(
+            list(NameValueItem.objects.order_by('value')
+                                      .values_list('parent', flat=True)),
+            [parents[0].pk, parents[1].pk, parents[0].pk])
@@ -0,0 +1,120 @@
+import pickle
+
+from django.test import TestCase
+
+from fox_tools.sketches import HyperLogLog, SpaceSaving, Reservoir, \
+    NumericStats, ValueSketch
+
+
+__all__ = ('HyperLogLogTestCase', 'SpaceSavingTestCase',
+           'ReservoirTestCase', 'NumericStatsTestCase', 'ValueSketchTestCase')
+
+
+class HyperLogLogTestCase(TestCase):
+    def test_count(self):
+        for count in (10, 1000, 50000):
+            hll = HyperLogLog(12)
+            hll.update(range(count))
+            hll.update(range(count))
+            self.assertAlmostEqual(hll.count(), count, delta=count * 0.05)
+
+    def test_merge(self):
+        a, b = HyperLogLog(12), HyperLogLog(12)
+        a.update(range(0, 6000))
+        b.update(range(4000, 10000))
+        a.merge(b)
+        self.assertAlmostEqual(a.count(), 10000, delta=500)
+
+    def test_merge_precision(self):
+        with self.assertRaises(ValueError):
+            HyperLogLog(10).merge(HyperLogLog(12))
+
+    def test_pickle(self):
+        hll = HyperLogLog(8)
+        hll.update('abc')
+        self.assertEqual(pickle.loads(pickle.dumps(hll)).count(), hll.count())
+
+
+class SpaceSavingTestCase(TestCase):
+    def get_values(self):
+        values = [i for i in range(1000)]
+        values += ['a'] * 500 + ['b'] * 300 + ['c'] * 200
+        return values
+
+    def test_top(self):
+        sketch = SpaceSaving(20)
+        sketch.update(self.get_values())
+        self.assertEqual([v for v, _ in sketch.top(3)], ['a', 'b', 'c'])
+        self.assertLessEqual(len(sketch.counts), 20)
+        for value, count in sketch.top(3):
+            self.assertGreaterEqual(count, {'a': 500, 'b': 300, 'c': 200}[value])
+
+    def test_merge(self):
+        a, b = SpaceSaving(20), SpaceSaving(20)
+        a.update(self.get_values())
+        b.update(['b'] * 400)
+        a.merge(b)
+        self.assertEqual([v for v, _ in a.top(2)], ['b', 'a'])
+
+
+class ReservoirTestCase(TestCase):
+    def test_sample(self):
+        sample = Reservoir(10, seed=1)
+        sample.update(range(1000))
+        self.assertEqual(len(sample.items), 10)
+        self.assertEqual(sample.count, 1000)
+        self.assertTrue(all(0 <= v < 1000 for v in sample.items))
+
+    def test_merge(self):
+        a, b = Reservoir(10, seed=1), Reservoir(10, seed=2)
+        a.update(range(5))
+        b.update(range(100, 200))
+        a.merge(b)
+        self.assertEqual(len(a.items), 10)
+        self.assertEqual(a.count, 105)
+
+
+class NumericStatsTestCase(TestCase):
+    def test_stats(self):
+        stats = NumericStats()
+        stats.update([1, 2, 3, 4, float('nan')])
+        self.assertEqual((stats.count, stats.min, stats.max), (4, 1, 4))
+        self.assertAlmostEqual(stats.mean, 2.5)
+        self.assertAlmostEqual(stats.variance, 1.25)
+        self.assertEqual(stats.histogram, {(1, 1): 1, (1, 2): 2, (1, 3): 1})
+
+    def test_out_of_range(self):
+        stats = NumericStats()
+        stats.update([1, 10 ** 400, -10 ** 400, float('inf')])
+        self.assertEqual((stats.count, stats.ignored), (1, 3))
+        self.assertEqual((stats.min, stats.max), (1, 1))
+        other = NumericStats()
+        other.add(10 ** 400)
+        stats.merge(other)
+        self.assertEqual(stats.summary()['ignored'], 4)
+
+    def test_merge(self):
+        a, b, c = NumericStats(), NumericStats(), NumericStats()
+        a.update([1, 2, 3])
+        b.update([10, 20])
+        c.update([1, 2, 3, 10, 20])
+        a.merge(b)
+        self.assertEqual((a.count, a.min, a.max), (c.count, c.min, c.max))
+        self.assertAlmostEqual(a.mean, c.mean)
+        self.assertAlmostEqual(a.variance, c.variance)
+        self.assertEqual(a.histogram, c.histogram)
+
+
+class ValueSketchTestCase(TestCase):
+    def test_summary(self):
+        a, b = ValueSketch(p=10, k=10, sample=5), ValueSketch(p=10, k=10,
+                                                              sample=5)
+        a.update(['x', 'y', 1, 2])
+        b.update(['x', 3.5])
+        a.merge(b)
+        summary = a.summary(top=1)
+        self.assertEqual(summary['count'], 6)
+        self.assertEqual(summary['distinct'], 5)
+        self.assertEqual(summary['top'], [('x', 2)])
+        self.assertEqual(len(summary['sample']), 5)
+        self.assertEqual(summary['numeric']['count'], 3)
@@ -2,3 +2,7 @@ from .pool import *
 from .http_request import *
 from .iter import *
 
+from .import_model import *
+from .metrics import *
+from .progress import *
+from .retention import *
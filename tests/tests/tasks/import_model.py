@@ -0,0 +1,285 @@
+import os
+import tempfile
+import threading
+from unittest import skipUnless
+
+from django.db import connection, connections
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+
+from fox_tools.data import Record
+from fox_tools.tasks import bulk_load
+from fox_tools.tasks.import_model import ImportModel, ImportModels, \
+    import_model
+from tests.models import NameValue, UniqueNameValue
+
+
+__all__ = ('ImportModelTestCase',)
+
+
+class NameValuesImport(ImportModels):
+    @import_model(NameValue, 'name', 'name')
+    def name_values(self, source, target=None, **kwargs):
+        if target is None:
+            target = NameValue(name=source.name)
+        target.value = source.value
+        return target
+
+
+class ValueImport(ImportModels):
+    @import_model(NameValue, 'value', 'value')
+    def name_values(self, source, target=None, **kwargs):
+        return target or NameValue(name=source.name, value=source.value)
+
+
+class UpsertImport(ImportModels):
+    @import_model(UniqueNameValue, 'name', 'name', upsert=True)
+    def name_values(self, source, target=None, **kwargs):
+        return UniqueNameValue(name=source.name, value=source.value)
+
+
+class SQLImport(ImportModels):
+    @import_model(UniqueNameValue, 'name', 'name', bulk_backend='sql')
+    def name_values(self, source, target=None, **kwargs):
+        return UniqueNameValue(name=source.name, value=source.value)
+
+
+class FixtureImport(ImportModels):
+    @import_model(UniqueNameValue, lambda source, context: source.object.name,
+                  'name')
+    def name_values(self, source, target=None, **kwargs):
+        if target is None:
+            target = UniqueNameValue(name=source.object.name)
+        target.value = source.object.value
+        return target
+
+
+class ImportModelTestCase(TestCase):
+    def get_dataset(self, count, value=0):
+        return [Record(name='item-{}'.format(i), value=i + value)
+                for i in range(count)]
+
+    def test_run_create_update(self):
+        NameValuesImport('import', self.get_dataset(8)).run(dataset=None)
+        self.assertEqual(NameValue.objects.count(), 8)
+
+        results = NameValuesImport('import', self.get_dataset(10, 100)) \
+                        .run(dataset=None)
+        self.assertEqual(len(results['name_values']), 10)
+        self.assertEqual(NameValue.objects.count(), 10)
+        self.assertEqual(NameValue.objects.get(name='item-3').value, 103)
+
+    def test_lock_shared_by_model(self):
+        a = NameValuesImport('a').tasks[0]
+        b = NameValuesImport('b').tasks[0]
+        self.assertIs(a.lock, b.lock)
+        self.assertIs(a.lock, ImportModel.locks[NameValue])
+
+    def test_lock_released(self):
+        task = NameValuesImport('import', self.get_dataset(4)).tasks[0]
+        task.run(self.get_dataset(4), {})
+        for lock in task.lock.locks:
+            self.assertTrue(lock.acquire(blocking=False))
+            lock.release()
+
+    def test_lock_disjoint_chunks(self):
+        a = ValueImport('a').tasks[0]
+        b = ValueImport('b').tasks[0]
+        chunks = [self.get_dataset(64, 1), self.get_dataset(64, 65)]
+        self.assertFalse(set(a.lock.stripes(range(1, 65))) &
+                         set(a.lock.stripes(range(65, 129))))
+
+        # both imports must hold their locks at the same time
+        barrier = threading.Barrier(2, timeout=5)
+        errors = []
+
+        def run_import(items, ids, results, **kwargs):
+            barrier.wait()
+            return {}
+
+        def run(task, dataset):
+            try:
+                task.run_import = run_import
+                task.run(dataset, {})
+            except Exception as err:
+                errors.append(err)
+            finally:
+                connections.close_all()
+
+        threads = [threading.Thread(target=run, args=args)
+                   for args in zip((a, b), chunks)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(errors, [])
+
+    def test_lock_mode_none(self):
+        task = NameValuesImport('import').tasks[0]
+        task.lock_mode = None
+        task.run(self.get_dataset(4), {})
+        self.assertEqual(NameValue.objects.count(), 4)
+
+    def test_run_pks(self):
+        results = NameValuesImport('import', self.get_dataset(4)) \
+                        .run(dataset=None)
+        objs = results['name_values']
+        self.assertTrue(all(obj.pk for obj in objs.values()))
+
+    def test_keep_objects(self):
+        task = NameValuesImport('import').tasks[0]
+        task.keep_objects = 'pk'
+        results = {}
+        task.run(self.get_dataset(4), results)
+        self.assertEqual(results['name_values'], dict(
+            NameValue.objects.values_list('name', 'pk')))
+
+        task.keep_objects = False
+        results = {}
+        result = task.run(self.get_dataset(6), results)
+        self.assertEqual(results, {})
+        self.assertEqual(len(result), 6)
+
+    def test_run_bulk_update(self):
+        NameValuesImport('import', self.get_dataset(8)).run(dataset=None)
+        task = NameValuesImport('import').tasks[0]
+        with CaptureQueriesContext(connection) as queries:
+            task.run(self.get_dataset(8, 10), {})
+        # select and bulk update
+        self.assertEqual(len([q for q in queries.captured_queries
+                                  if 'SAVEPOINT' not in q['sql']]), 2)
+        self.assertEqual(NameValue.objects.get(name='item-2').value, 12)
+
+    def test_run_upsert(self):
+        UpsertImport('import', self.get_dataset(4)).run(dataset=None)
+        task = UpsertImport('import').tasks[0]
+        with CaptureQueriesContext(connection) as queries:
+            result = task.run(self.get_dataset(8, 10), {})
+        self.assertEqual(len([q for q in queries.captured_queries
+                              if 'SAVEPOINT' not in q['sql']]), 2)
+        self.assertEqual(UniqueNameValue.objects.count(), 8)
+        self.assertEqual(UniqueNameValue.objects.get(name='item-2').value, 12)
+        self.assertEqual({obj.pk for obj in result.values()},
+                         set(UniqueNameValue.objects.values_list('pk', flat=True)))
+
+    def test_split_queryset(self):
+        NameValue.objects.bulk_create(NameValue(name=str(i), value=i)
+                                      for i in range(10))
+        tasks = list(NameValuesImport.split('import', NameValue.objects.all(),
+                                            chunk_size=4))
+        self.assertEqual([t.key for t in tasks],
+                         ['import.0', 'import.4', 'import.8'])
+        self.assertEqual([[o.value for o in t.dataset] for t in tasks],
+                         [[0, 1, 2, 3], [4, 5, 6, 7], [8, 9]])
+        for task in tasks:
+            self.assertNotIn('OFFSET', str(task.dataset.query))
+
+    def test_split_queryset_count_range(self):
+        objs = NameValue.objects.bulk_create(NameValue(name=str(i), value=i)
+                                             for i in range(10))
+        tasks = NameValuesImport.split('import', NameValue.objects.all(),
+                                       chunk_size=4, count=5,
+                                       key_range=(objs[2].pk, None))
+        self.assertEqual([[o.value for o in t.dataset] for t in tasks],
+                         [[2, 3, 4, 5], [6]])
+
+    def test_split_data_range(self):
+        NameValue.objects.bulk_create(NameValue(name=str(i), value=i)
+                                      for i in range(10))
+        tasks = NameValuesImport.split('import', NameValue.objects.all(),
+                                       chunk_size=4, data_range=(3, 8))
+        self.assertEqual([[o.value for o in t.dataset] for t in tasks],
+                         [[3, 4, 5, 6], [7]])
+        dataset = [Record(name=str(i), value=i) for i in range(10)]
+        tasks = NameValuesImport.split('import', dataset, chunk_size=4,
+                                       data_range=(3, 8))
+        self.assertEqual([[o.value for o in t.dataset] for t in tasks],
+                         [[3, 4, 5, 6], [7]])
+        with self.assertRaises(ValueError):
+            list(NameValuesImport.split('import', dataset, key_range=(0, 1)))
+
+    def test_split_queryset_exact(self):
+        NameValue.objects.bulk_create(NameValue(name=str(i), value=i)
+                                      for i in range(8))
+        tasks = NameValuesImport.split('import', NameValue.objects.all(),
+                                       chunk_size=4)
+        self.assertEqual(len(list(tasks)), 2)
+
+    def test_split_iterable(self):
+        dataset = (Record(name=str(i), value=i) for i in range(10))
+        tasks = list(NameValuesImport.split('import', dataset, chunk_size=4,
+                                            count=9))
+        self.assertEqual([len(t.dataset) for t in tasks], [4, 4, 1])
+
+    def test_dumpdata_load_split(self):
+        NameValue.objects.bulk_create(NameValue(name=str(i), value=i)
+                                      for i in range(10))
+        fd, path = tempfile.mkstemp(suffix='.jsonl')
+        os.close(fd)
+        self.addCleanup(os.remove, path)
+
+        NameValuesImport('dump', NameValue.objects.order_by('pk')) \
+            .dumpdata(path, format='jsonl', count=8, chunk_size=3)
+        with open(path) as stream:
+            self.assertEqual(len(stream.readlines()), 8)
+
+        reports = []
+        tasks = FixtureImport.load_split(
+            'load', path, chunk_size=3,
+            report=lambda task, duration: reports.append(task.key))
+        for task in tasks:
+            task.run(dataset=None)
+        self.assertEqual(reports, ['load.0', 'load.3', 'load.6'])
+        self.assertEqual(UniqueNameValue.objects.count(), 8)
+        self.assertEqual(UniqueNameValue.objects.get(name='5').value, 5)
+
+    def test_run_bulk_load(self):
+        SQLImport('import', self.get_dataset(4)).run(dataset=None)
+        task = SQLImport('import').tasks[0]
+        with CaptureQueriesContext(connection) as queries:
+            result = task.run(self.get_dataset(8, 10), {})
+        self.assertEqual(len([q for q in queries.captured_queries
+                              if 'SAVEPOINT' not in q['sql']]), 2)
+        self.assertEqual(UniqueNameValue.objects.count(), 8)
+        self.assertEqual(UniqueNameValue.objects.get(name='item-2').value, 12)
+        self.assertEqual({obj.pk for obj in result.values()},
+                         set(UniqueNameValue.objects.values_list('pk', flat=True)))
+
+    def test_bulk_load_to_csv(self):
+        stream = bulk_load.to_csv([[1, None, ''], ['a"b', True, b'\x01']])
+        self.assertEqual(stream.read(),
+                         '"1",,""\n"a""b","t","\\x01"\n')
+
+    def test_bulk_load_to_csv_json_array(self):
+        stream = bulk_load.to_csv([[{'a': 'b"c'}, ['a', 'b"c', None, [1]]]])
+        self.assertEqual(stream.read(),
+                         '"{""a"": ""b\\""c""}",'
+                         '"{""a"",""b\\""c"",NULL,{""1""}}"\n')
+
+    def test_bulk_load_csv_stream(self):
+        rows = [[i, 'item-{}'.format(i)] for i in range(100)]
+        expected = bulk_load.to_csv(rows).read()
+        stream = bulk_load.CSVStream(iter(rows))
+        self.assertEqual(stream.readline(), '"0","item-0"\n')
+        chunks = iter(lambda: stream.read(64), '')
+        self.assertEqual('"0","item-0"\n' + ''.join(chunks), expected)
+
+    @skipUnless(connection.vendor == 'postgresql', 'PostgreSQL COPY')
+    def test_bulk_load_copy(self):
+        from psycopg2.extras import Json
+
+        rows = [[Json({'a': 'b"c', 'n': None}), ['a', 'b"c', 'd\\e', None]]]
+        with connection.cursor() as cursor:
+            cursor.execute('CREATE TEMPORARY TABLE _bulk_load_test '
+                           '(data jsonb, tags text[])')
+            cursor.copy_expert('COPY _bulk_load_test FROM STDIN '
+                               'WITH (FORMAT csv)', bulk_load.CSVStream(rows))
+            cursor.execute('SELECT data, tags FROM _bulk_load_test')
+            self.assertEqual(cursor.fetchall(), [
+                ({'a': 'b"c', 'n': None}, ['a', 'b"c', 'd\\e', None])])
+
+        SQLImport('import', self.get_dataset(4)).run(dataset=None)
+        task = SQLImport('import').tasks[0]
+        task.run(self.get_dataset(8, 10), {})
+        self.assertEqual(UniqueNameValue.objects.count(), 8)
+        self.assertEqual(UniqueNameValue.objects.get(name='item-2').value, 12)
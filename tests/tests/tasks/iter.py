@@ -1,3 +1,6 @@
+import threading
+import time
+
 from django.test import TestCase
 
 from fox_tools.tasks import Task, Pool
@@ -7,14 +10,24 @@ from fox_tools.tasks.iter import IterTaskSet
 class IterTaskSetTestCase(TestCase):
     def setUp(self):
         self.values = list(range(0,10))
-        self.tasks = [Task(v, func=lambda *a, **kw: v)
+        self.tasks = [Task(v, func=lambda *a, v=v, **kw: v)
                         for v in self.values]
         self.object = IterTaskSet('test', chunk_size=2, iter=iter(self.tasks))
 
     def test_submit_from_pool(self):
         pool = Pool()
         pool.submit(self.object)
-        pool.run(keep_alive=True)
+        thread = threading.Thread(target=pool.run, kwargs={'keep_alive': True})
+        thread.start()
+        end = time.monotonic() + 5
+        while not (self.object.scheduled and self.object.done) and \
+                time.monotonic() < end:
+            time.sleep(0.005)
+        self.assertTrue(pool.drain(timeout=5))
+        thread.join(5)
+        self.assertFalse(thread.is_alive())
+        self.assertTrue(self.object.stream.result())
+        self.assertEqual(pool.progress.done_count, len(self.values))
 
     def test_get_tasks(self):
         n = 0
@@ -23,5 +36,65 @@ class IterTaskSetTestCase(TestCase):
             expected = self.values[n:n+2]
             self.assertEquals(result, expected)
             n += 2
+        self.assertEquals(self.object.get_tasks(), [])
+        self.assertTrue(self.object.exhausted)
+
+    def run_stream(self, count=200, **kwargs):
+        running, max_running, lock = [0], [0], threading.Lock()
+
+        def run(n, **kw):
+            with lock:
+                running[0] += 1
+                max_running[0] = max(max_running[0], running[0])
+            time.sleep(0.001)
+            with lock:
+                running[0] -= 1
+            return n
+
+        results = []
+        task_set = IterTaskSet('stream', (Task(i, run, {'n': i})
+                                          for i in range(count)), **kwargs)
+        pool = Pool(max_workers=4)
+        pool.completed = lambda future: results.append(future.result())
+        pool.submit(task_set)
+        pool.run()
+        return task_set, results, max_running[0]
+
+    def test_stream(self):
+        task_set, results, _ = self.run_stream(prefetch=3)
+        self.assertTrue(task_set.exhausted)
+        self.assertTrue(task_set.stream.result())
+        # streamed tasks' futures are handled by the pool
+        self.assertEqual(sorted(r for r in results if r is not True),
+                         list(range(200)))
 
+    def test_stream_prefetch(self):
+        _, _, max_running = self.run_stream(prefetch=2)
+        self.assertLessEqual(max_running, 2)
 
+    def test_stream_background(self):
+        task_set, results, _ = self.run_stream(prefetch=8, background=True)
+        self.assertTrue(task_set.stream.result())
+        self.assertEqual(len(results), 201)
+
+    def test_stream_immediate(self):
+        # tasks completing before their callback is added must not recurse
+        task_set = IterTaskSet('stream', (Task(i, lambda **kw: None)
+                                          for i in range(5000)), prefetch=1)
+        pool = Pool(max_workers=1, keep_results=False)
+        pool.submit(task_set)
+        pool.run()
+        self.assertTrue(task_set.stream.result())
+        self.assertEqual(task_set.done_count, 5001)
+
+    def test_stream_error(self):
+        def values():
+            yield Task('a', lambda **kw: None)
+            raise ValueError('iterator error')
+
+        pool = Pool()
+        task_set = IterTaskSet('stream', values())
+        pool.submit(task_set)
+        with self.assertRaises(ValueError):
+            pool.run()
+        self.assertIsInstance(task_set.stream.exception(), ValueError)
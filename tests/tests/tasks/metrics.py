@@ -0,0 +1,131 @@
+from django.test import TestCase
+
+from fox_tools.tasks import Pool, Task
+from fox_tools.tasks.metrics import Histogram, Metrics, Tracer, result_size
+
+
+__all__ = ('HistogramTestCase', 'MetricsTestCase')
+
+
+def fail(n, **kwargs):
+    raise ValueError('failed')
+
+
+class HistogramTestCase(TestCase):
+    def test_observe(self):
+        histogram = Histogram((1, 10, 100))
+        for value in (0.5, 1, 5, 50, 500):
+            histogram.observe(value)
+        self.assertEqual(histogram.counts, [2, 1, 1, 1])
+        self.assertEqual(histogram.count, 5)
+        self.assertEqual(histogram.sum, 556.5)
+        self.assertEqual(histogram.quantile(0.5), 10)
+        self.assertEqual(histogram.quantile(1), float('inf'))
+        self.assertEqual(list(histogram.cumulative()),
+                         [(1, 2), (10, 3), (100, 4), (float('inf'), 5)])
+
+    def test_merge(self):
+        a, b = Histogram((1, 10)), Histogram((1, 10))
+        a.observe(0.5)
+        b.observe(5)
+        a.merge(b)
+        self.assertEqual(a.counts, [1, 1, 0])
+        with self.assertRaises(ValueError):
+            a.merge(Histogram((1,)))
+
+
+class FakeSpan:
+    def __init__(self, name, attributes):
+        self.name, self.attributes = name, dict(attributes)
+        self.exception, self.ended = None, False
+
+    def set_attribute(self, key, value):
+        self.attributes[key] = value
+
+    def record_exception(self, exception):
+        self.exception = exception
+
+    def end(self):
+        self.ended = True
+
+
+class FakeTracer:
+    def __init__(self):
+        self.spans = []
+
+    def start_span(self, name, attributes=None):
+        span = FakeSpan(name, attributes or {})
+        self.spans.append(span)
+        return span
+
+
+class MetricsTestCase(TestCase):
+    def run_pool(self, *instruments):
+        pool = Pool(instruments=instruments)
+        pool.submit(Task('a.{}'.format(i), lambda n, **kw: 'x' * n, {'n': i})
+                    for i in range(1, 5))
+        pool.submit(Task('b', fail, {'n': 1}))
+        with self.assertRaises(ValueError):
+            pool.run()
+        return pool
+
+    def test_metrics(self):
+        metrics = Metrics()
+        pool = self.run_pool(metrics)
+        self.assertIs(pool.get_instrument(Metrics), metrics)
+
+        a = metrics.groups[('Task', 'a')]
+        self.assertEqual((a.queued, a.started, a.finished, a.errors),
+                         (4, 4, 4, 0))
+        self.assertEqual(a.size.sum, 10)
+        self.assertEqual(a.run_time.count, 4)
+        self.assertEqual(a.wait_time.count, 4)
+
+        b = metrics.groups[('Task', '')]
+        self.assertEqual((b.finished, b.errors, b.size.count), (1, 1, 0))
+
+        # retry
+        pool.submit(Task('b', fail, {'n': 1}))
+        pool.tasks['b'].scheduled = False
+        with self.assertRaises(ValueError):
+            pool.run()
+        self.assertEqual(b.retries, 1)
+
+    def test_export(self):
+        metrics = Metrics()
+        self.run_pool(metrics)
+        data = metrics.to_json()
+        self.assertEqual([(d['task'], d['prefix']) for d in data],
+                         [('Task', ''), ('Task', 'a')])
+        self.assertEqual(data[1]['size']['buckets']['+Inf'], 4)
+
+        text = metrics.to_prometheus()
+        self.assertIn('# TYPE fox_tasks_run_time_seconds histogram', text)
+        self.assertIn('fox_tasks_errors_total{task="Task",prefix=""} 1', text)
+        self.assertIn('fox_tasks_size_bytes_bucket{task="Task",prefix="a",'
+                      'le="+Inf"} 4', text)
+        self.assertIn('fox_tasks_size_bytes_count{task="Task",prefix="a"} 4',
+                      text)
+
+    def test_max_groups(self):
+        metrics = Metrics(max_groups=1)
+        pool = Pool(instruments=[metrics])
+        pool.submit(Task('{}.x'.format(i), lambda **kw: None)
+                    for i in range(3))
+        pool.run()
+        self.assertEqual(sorted(metrics.groups), [('Task', '*'), ('Task', '0')])
+        self.assertEqual(metrics.groups[('Task', '*')].finished, 2)
+
+    def test_tracer(self):
+        tracer = FakeTracer()
+        self.run_pool(Tracer(tracer))
+        self.assertEqual(len(tracer.spans), 5)
+        spans = {s.attributes['task.key']: s for s in tracer.spans}
+        self.assertTrue(all(s.ended for s in tracer.spans))
+        self.assertIsInstance(spans['b'].exception, ValueError)
+        self.assertEqual(spans['a.3'].attributes['task.result_size'], 3)
+
+    def test_result_size(self):
+        self.assertEqual(result_size(b'abc'), 3)
+        self.assertEqual(result_size({'a': 1}), 1)
+        self.assertIsNone(result_size(12))
@@ -1,10 +1,15 @@
+import threading
 import time
 from django.test import TestCase
+from rest_framework.test import APIRequestFactory
 
-from fox_tools.tasks import BaseTask, Pool, Task, TaskSet, task
+from fox_tools.tasks import BaseTask, CancelToken, Pool, Task, TaskSet, \
+    task, wait
+from fox_tools.tasks.viewsets import PoolViewSet
 
 
-__all__ = ('slow_fib', 'Base', 'TaskTestCase', 'TaskSetTestCase')
+__all__ = ('slow_fib', 'Base', 'TaskTestCase', 'TaskSetTestCase',
+           'TaskSetDependsTestCase', 'PoolControlTestCase')
 
 
 # Pool
@@ -39,7 +44,7 @@ class Base:
                         "task.scheduled is not True after Task.submit")
                     self.assertTrue(len(task.futures) > 0,
                         "task.futures is empty")
-                    future = task.futures[0]
+                    future = next(iter(task.futures))
                     self.assertIsNotNone(getattr(future, 'task_key', None),
                         "future misses 'task_key' attribute")
                     expected_count += len(task.futures)
@@ -203,3 +208,164 @@ class TaskSetTestCase(Base.PoolTestCase):
                     "invalid result for task {} ({} != {})".format(
                         task_.key, result, expected))
 
+
+class TaskSetDependsTestCase(TestCase):
+    class TestSet(TaskSet):
+        def log(self, key, duration=0):
+            self.events.append((key, 'start'))
+            time.sleep(duration)
+            self.events.append((key, 'end'))
+            return key
+
+        @task(depends=('trainers', 'stables'))
+        def horses(self, **kwargs):
+            return self.log('horses')
+
+        @task()
+        def trainers(self, **kwargs):
+            return self.log('trainers', 0.1)
+
+        @task(priority=1)
+        def stables(self, **kwargs):
+            return self.log('stables', 0.1)
+
+        @wait('horses')
+        @task()
+        def races(self, **kwargs):
+            return self.log('races')
+
+    def get_set(self):
+        task_set = self.TestSet(0)
+        task_set.events = []
+        return task_set
+
+    def test_sorted_tasks(self):
+        keys = [t.key for t in self.get_set().get_sorted_tasks()]
+        self.assertEqual(keys, ['trainers', 'stables', 'horses', 'races'])
+
+    def test_sorted_tasks_errors(self):
+        task_set = TaskSet(0, [Task('a', depends='b'), Task('b', depends='a')])
+        self.assertRaises(ValueError, task_set.get_sorted_tasks)
+        task_set = TaskSet(0, [Task('a', depends='c')])
+        self.assertRaises(ValueError, task_set.get_sorted_tasks)
+
+    def test_run(self):
+        task_set = self.get_set()
+        results = task_set.run()
+        self.assertEqual(list(results), ['trainers', 'stables', 'horses',
+                                         'races'])
+
+    def test_submit(self):
+        task_set = self.get_set()
+        pool = Pool()
+        pool.submit(task_set)
+        pool.run()
+
+        events = task_set.events
+        # independent tasks run concurrently
+        self.assertEqual({e[0] for e in events[:2]}, {'trainers', 'stables'})
+        self.assertLess(events.index(('trainers', 'end')),
+                        events.index(('horses', 'start')))
+        self.assertLess(events.index(('stables', 'end')),
+                        events.index(('horses', 'start')))
+        self.assertLess(events.index(('horses', 'end')),
+                        events.index(('races', 'start')))
+        self.assertTrue(task_set.done)
+        results = {k: r for k, f, r in task_set.results()}
+        self.assertEqual(results['horses'], 'horses')
+
+    def test_submit_dependency_failed(self):
+        def fail(**kwargs):
+            raise ValueError('failed')
+        called = []
+        task_set = TaskSet(0, [Task('a', fail),
+                               Task('b', lambda **kw: called.append(1),
+                                    depends='a')])
+        pool = Pool()
+        pool.submit(task_set)
+        self.assertRaises(ValueError, pool.run)
+        self.assertEqual(called, [])
+
+
+class PoolControlTestCase(TestCase):
+    def run_thread(self, pool, **kwargs):
+        thread = threading.Thread(target=pool.run, kwargs=kwargs)
+        thread.start()
+        self.addCleanup(thread.join, 5)
+        return thread
+
+    def wait_for(self, func, timeout=5):
+        end = time.monotonic() + timeout
+        while not func():
+            if time.monotonic() > end:
+                self.fail('timeout')
+            time.sleep(0.005)
+
+    def test_cancel_token(self):
+        tokens = []
+        pool = Pool()
+        pool.submit(Task('a', lambda cancel, **kw: tokens.append(cancel)))
+        pool.run()
+        self.assertIsInstance(tokens[0], CancelToken)
+        self.assertIs(tokens[0], pool.cancel_token)
+
+    def test_pause_resume(self):
+        pool = Pool()
+        pool.pause()
+        pool.submit(Task(i, slow_fib, {'n': 1}) for i in range(4))
+        thread = self.run_thread(pool)
+        self.wait_for(lambda: pool.progress.queued_count == 4)
+        time.sleep(0.05)
+        self.assertEqual(pool.progress.started_count, 0)
+        pool.resume()
+        thread.join(5)
+        self.assertEqual(pool.progress.done_count, 4)
+
+    def test_drain(self):
+        pool = Pool()
+        pool.submit(Task(i, slow_fib, {'n': 2}) for i in range(4))
+        thread = self.run_thread(pool, keep_alive=True)
+        self.wait_for(lambda: pool.progress.started_count)
+        self.assertTrue(pool.drain())
+        self.assertFalse(thread.is_alive())
+        self.assertEqual(pool.progress.done_count, 4)
+
+    def test_drain_timeout(self):
+        def run(cancel, **kwargs):
+            cancel.wait(5)
+            cancel.raise_if_cancelled()
+
+        pool = Pool(max_workers=2)
+        pool.submit(Task(i, run) for i in range(6))
+        thread = self.run_thread(pool, keep_alive=True)
+        self.wait_for(lambda: pool.progress.started_count == 2)
+        self.assertFalse(pool.drain(timeout=0.05))
+        self.assertFalse(thread.is_alive())
+        self.assertEqual(pool.progress.cancelled_count, 6)
+        self.assertEqual(pool.progress.failed_count, 0)
+
+    def test_fail_fast(self):
+        def fail(**kwargs):
+            raise ValueError('failed')
+
+        pool = Pool(fail_fast=False)
+        pool.submit(Task(i, slow_fib, {'n': 1}) for i in range(3))
+        pool.submit(Task('fail', fail))
+        pool.run()
+        self.assertEqual(pool.progress.done_count, 3)
+        self.assertEqual(pool.progress.failed_count, 1)
+
+    def test_viewset(self):
+        pool = Pool()
+        factory = APIRequestFactory()
+        view = PoolViewSet.as_view({'post': 'pause'}, pool=pool)
+        response = view(factory.post('/pause/'))
+        self.assertTrue(response.data['paused'])
+        self.assertTrue(pool.paused)
+
+        view = PoolViewSet.as_view({'post': 'resume'}, pool=pool)
+        self.assertFalse(view(factory.post('/resume/')).data['paused'])
+
+        view = PoolViewSet.as_view({'post': 'drain'}, pool=pool)
+        response = view(factory.post('/drain/', {'timeout': 'a'}))
+        self.assertEqual(response.status_code, 400)
@@ -0,0 +1,125 @@
+import io
+
+from django.test import TestCase
+from rest_framework.test import APIRequestFactory
+
+from fox_tools.tasks import Pool, Task
+from fox_tools.tasks.metrics import TaskEvent
+from fox_tools.tasks.progress import Progress, ProgressDisplay
+from fox_tools.tasks.viewsets import PoolViewSet
+
+
+__all__ = ('ProgressTestCase', 'ProgressDisplayTestCase',
+           'PoolViewSetStatusTestCase')
+
+
+def fail(**kwargs):
+    raise ValueError('failed')
+
+
+class Clock:
+    def __init__(self, now=1000.0):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+
+class ProgressTestCase(TestCase):
+    def finish(self, progress, count, error=None, result=b''):
+        for i in range(count):
+            event = TaskEvent(None, i)
+            event.error, event.result = error, result
+            progress.queued(event)
+            progress.started(event)
+            progress.finished(event)
+
+    def test_pool_progress(self):
+        pool = Pool()
+        pool.submit(Task(i, lambda **kw: b'abc') for i in range(5))
+        pool.submit(Task('fail', fail))
+        with self.assertRaises(ValueError):
+            pool.run()
+        progress = pool.progress
+        self.assertIs(pool.instruments[0], progress)
+        # pool stops on the first error, all tasks have been queued
+        self.assertEqual(progress.queued_count, 6)
+        self.assertEqual(progress.failed_count, 1)
+        self.assertEqual(progress.bytes, 3 * progress.done_count)
+
+    def test_rate_eta(self):
+        clock = Clock()
+        progress = Progress(total=100, window=10, clock=clock)
+        clock.now += 1
+        self.finish(progress, 10)
+        clock.now += 1
+        self.finish(progress, 10, error=ValueError())
+        self.assertEqual(progress.finished_count, 20)
+        self.assertEqual(progress.rate(2), 10)
+        self.assertEqual(progress.eta(), 8)
+
+        # counts older than the window are dropped
+        clock.now += 20
+        self.assertEqual(progress.rate(10), 0)
+        self.assertIsNone(progress.eta())
+
+        snapshot = progress.snapshot()
+        self.assertEqual((snapshot['done'], snapshot['failed'],
+                          snapshot['in_flight'], snapshot['total']),
+                         (10, 10, 0, 100))
+
+    def test_window_reuse(self):
+        clock = Clock()
+        progress = Progress(window=5, clock=clock)
+        for _ in range(12):
+            clock.now += 1
+            self.finish(progress, 1)
+        self.assertEqual(progress.rate(5), 1)
+
+
+class ProgressDisplayTestCase(TestCase):
+    def test_update(self):
+        clock = Clock()
+        progress = Progress(total=10, clock=clock)
+        stream = io.StringIO()
+        display = ProgressDisplay(progress, stream, interval=1, clock=clock)
+        display.update()
+        display.update()
+        self.assertEqual(len(stream.getvalue().splitlines()), 1)
+        clock.now += 1
+        display.update()
+        display.close()
+        lines = stream.getvalue().splitlines()
+        self.assertEqual(len(lines), 3)
+        self.assertTrue(lines[0].startswith('0/10 (0.0%) | failed 0'))
+
+    def test_format(self):
+        display = ProgressDisplay(Progress(), io.StringIO())
+        line = display.format({'done': 5, 'failed': 1, 'in_flight': 2,
+                               'total': 12, 'bytes': 2048,
+                               'rates': {10: 2.0, 60: 1.0}, 'eta': 3})
+        self.assertEqual(line, '6/12 (50.0%) | failed 1 | in-flight 2 | '
+                               '2.0/s | 2.0 kB | ETA 0:00:03')
+
+
+class PoolViewSetStatusTestCase(TestCase):
+    def setUp(self):
+        self.pool = Pool()
+        self.pool.submit(Task(i, lambda **kw: i) for i in range(5))
+        self.pool.run()
+        self.view = PoolViewSet.as_view({'get': 'status'}, pool=self.pool)
+        self.factory = APIRequestFactory()
+
+    def test_summary(self):
+        response = self.view(self.factory.get('/status/'))
+        self.assertFalse(response.data['is_running'])
+        self.assertEqual(response.data['tasks_count'], 5)
+        self.assertEqual(response.data['progress']['done'], 5)
+        self.assertNotIn('tasks', response.data)
+
+    def test_tasks(self):
+        response = self.view(self.factory.get(
+            '/status/', {'mode': 'tasks', 'limit': 2, 'offset': 1}))
+        self.assertEqual(list(response.data['tasks']), [1, 2])
+        self.assertIsNotNone(response.data['next'])
+        self.assertIsNotNone(response.data['previous'])
@@ -0,0 +1,119 @@
+from concurrent.futures import Future
+import os
+import queue
+import tempfile
+
+from django.test import TestCase
+
+from fox_tools.tasks import Pool, Task, TaskSet
+from fox_tools.tasks.sinks import CallbackSink, QueueSink, SpoolSink, \
+    get_sink
+
+
+__all__ = ('RetentionTestCase', 'SinkTestCase')
+
+
+def fail(**kwargs):
+    raise ValueError('failed')
+
+
+class RetentionTestCase(TestCase):
+    def get_tasks(self, count=5):
+        return [Task(i, lambda n, **kw: n * 2, {'n': i}) for i in range(count)]
+
+    def test_keep_results(self):
+        tasks = self.get_tasks()
+        pool = Pool()
+        pool.submit(tasks)
+        pool.run()
+        self.assertTrue(all(len(t.futures) == 1 for t in tasks))
+        self.assertEqual(len(pool.tasks), 5)
+
+    def test_forget(self):
+        tasks = self.get_tasks()
+        results = []
+        pool = Pool(keep_results=False,
+                    sink=lambda key, result, error: results.append(result))
+        pool.submit(tasks)
+        pool.run()
+        self.assertEqual(sorted(results), [0, 2, 4, 6, 8])
+        for task in tasks:
+            self.assertEqual(task.futures, {})
+            self.assertEqual(task.done_count, 1)
+            self.assertTrue(task.done)
+
+    def test_pending_futures(self):
+        task = Task('a')
+        futs = [Future(), Future()]
+        for future in futs:
+            task.add_future(future)
+        self.assertFalse(task.done)
+        self.assertEqual(list(task.results()), [])
+
+        futs[0].set_result(1)
+        self.assertFalse(task.done)
+        self.assertEqual([r[2] for r in task.results()], [1])
+        futs[1].set_exception(ValueError())
+        self.assertTrue(task.done)
+
+        task.forget(futs[0])
+        task.forget(futs[0])
+        self.assertEqual(list(task.futures), futs[1:])
+        self.assertEqual((task.done_count, task.failed_count), (1, 0))
+
+    def test_forget_task_set(self):
+        task_set = TaskSet('set', [Task('a', lambda **kw: 1),
+                                   Task('b', fail)])
+        pool = Pool(keep_results=False, fail_fast=False)
+        pool.submit(task_set)
+        pool.run()
+        self.assertEqual(task_set.futures, {})
+        self.assertEqual((task_set.done_count, task_set.failed_count), (1, 1))
+        self.assertEqual(task_set.get_task('a').done_count, 1)
+        self.assertEqual(task_set.get_task('b').failed_count, 1)
+
+    def test_max_done_tasks(self):
+        pool = Pool(keep_results=False, max_done_tasks=2)
+        pool.submit(self.get_tasks())
+        pool.run()
+        self.assertEqual(len(pool.tasks), 2)
+
+    def test_done_tasks_ttl(self):
+        pool = Pool(done_tasks_ttl=0)
+        pool.submit(self.get_tasks())
+        pool.run()
+        self.assertEqual(len(pool.tasks), 0)
+
+
+class SinkTestCase(TestCase):
+    def test_get_sink(self):
+        self.assertIsNone(get_sink(None))
+        self.assertIsInstance(get_sink(queue.Queue()), QueueSink)
+        self.assertIsInstance(get_sink(print), CallbackSink)
+        self.assertIsInstance(get_sink('/tmp/spool'), SpoolSink)
+        with self.assertRaises(TypeError):
+            get_sink(12)
+
+    def test_queue(self):
+        results = queue.Queue()
+        pool = Pool(sink=results, fail_fast=False)
+        pool.submit([Task('a', lambda **kw: 1), Task('b', fail)])
+        pool.run()
+        items = sorted((results.get() for _ in range(2)),
+                       key=lambda item: item[0])
+        self.assertEqual(items[0], ('a', 1, None))
+        self.assertIsInstance(items[1][2], ValueError)
+
+    def test_spool(self):
+        for format in SpoolSink.formats:
+            with tempfile.TemporaryDirectory() as path:
+                path = os.path.join(path, 'spool')
+                pool = Pool(sink=SpoolSink(path, format), fail_fast=False,
+                            max_workers=1)
+                pool.submit([Task('a', lambda **kw: {'a': 1}),
+                             Task('b', fail)])
+                pool.run()
+                items = sorted(SpoolSink.read(path, format))
+                self.assertEqual(items[0], ('a', {'a': 1}, None))
+                self.assertEqual(items[1][:2], ('b', None))
+                self.assertIn('failed', items[1][2])